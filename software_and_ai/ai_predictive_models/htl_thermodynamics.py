@@ -1,10 +1,22 @@
 import math
+import sys
+import time
+from pathlib import Path
+
 import numpy as np
 
+try:
+    import water_properties
+except ImportError:
+    # Shared property tables from the digital twin (NumPy only)
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'digital_twin' / '04_FIRE_Simulations'))
+    import water_properties
+
 # Physical constants
 epsilon_0 = 8.854e-12 # Vacuum permittivity
 k_B = 1.38e-23        # Boltzmann constant
 R = 8.314             # Ideal gas constant (J/(mol*K))
+CRITICAL_TEMP_C = 373.946  # Critical point of water
 
 class SubcriticalHTLThermodynamics:
     """
@@ -20,26 +32,18 @@ class SubcriticalHTLThermodynamics:
         self.P = pressure_mpa
         
         # Verify subcritical liquid state
-        critical_T = 373.946 + 273.15
+        critical_T = CRITICAL_TEMP_C + 273.15
         if self.T >= critical_T:
             raise ValueError("[DANGER] State is Supercritical. Boiler failure imminent. Reduce Temp!")
             
     def calculate_dielectric_constant(self) -> float:
         """
-        Calculates the approximate static relative permittivity (dielectric constant) of 
+        Calculates the static relative permittivity (dielectric constant) of
         subcritical water. Standard water has epsilon_r = 78 at 25C.
         Subcritical water drops drastically, acting as a non-polar solvent.
-        (Uematsu & Franck empirical approximation)
+        (Uematsu & Franck, via the shared tables in digital_twin/04_FIRE_Simulations/water_properties.py)
         """
-        # Simplified polynomial for illustrative purposes in this manuscript
-        # Emulating the drop from ~80 to ~20 at 300C
-        t_reduced = self.T / 298.15
-        epsilon_r = 87.74 - 40.0 * (t_reduced - 1) + 9.39 * (t_reduced - 1)**2 - 1.41 * (t_reduced - 1)**3
-        
-        # Guard rails for empirical fit
-        if epsilon_r < 15: epsilon_r = 15.0 
-        
-        return epsilon_r
+        return float(water_properties.dielectric_constant(self.T - 273.15, self.P))
 
     def calculate_reaction_rate(self, activation_energy_kj: float = 120.0, arrhenius_A: float = 1e11) -> float:
         """
@@ -61,7 +65,103 @@ class SubcriticalHTLThermodynamics:
         hhv = 0.338 * carbon_pct + 1.428 * (hydrogen_pct - (oxygen_pct / 8)) + 0.095 * 0 
         return hhv
 
-if __name__ == "__main__":
+def screen_trajectory(temp_c, pressure_mpa, activation_energy_kj: float = 120.0,
+                      arrhenius_A: float = 1e11, max_temp_c: float = CRITICAL_TEMP_C,
+                      min_subcooling_mpa: float = 0.0) -> dict:
+    """
+    Array counterpart of SubcriticalHTLThermodynamics for whole (T, P) time
+    series (e.g. controller setpoint trajectories or logged autoclave data).
+    Never raises on unsafe states; instead every sample is classified:
+
+      temp_margin_c       max_temp_c - T (negative: supercritical)
+      pressure_margin_mpa P - P_sat(T) - min_subcooling_mpa (negative: flashing)
+      safe                both margins positive / zero
+
+    Returns a dict of per-sample arrays ('dielectric', 'rate_constant',
+    'temp_margin_c', 'pressure_margin_mpa', 'safe') plus 'first_violation'
+    (index of the first unsafe sample, or None) and 'n_violations'.
+    Dielectric values of unsafe samples are clamped to the liquid tables.
+    """
+    T = np.asarray(temp_c, dtype=float)
+    P = np.asarray(pressure_mpa, dtype=float)
+    temp_margin = max_temp_c - T
+    pressure_margin = P - water_properties.saturation_pressure(np.minimum(T, CRITICAL_TEMP_C)) \
+        - min_subcooling_mpa
+    safe = (temp_margin > 0) & (pressure_margin >= 0)
+    unsafe = np.flatnonzero(~safe)
+    return {
+        'dielectric': water_properties.dielectric_constant(T, P),
+        'rate_constant': arrhenius_A * np.exp(-activation_energy_kj * 1000 / (R * (T + 273.15))),
+        'temp_margin_c': temp_margin,
+        'pressure_margin_mpa': pressure_margin,
+        'safe': safe,
+        'first_violation': int(unsafe[0]) if unsafe.size else None,
+        'n_violations': int(unsafe.size),
+    }
+
+
+def screen_log(chunks, **limits) -> dict:
+    """
+    Screens a long log delivered as an iterable of (temp_c, pressure_mpa)
+    array chunks, keeping only running aggregates so memory does not grow
+    with the log length. Returns 'n_samples', 'n_violations',
+    'first_violation' (global sample index or None) and the minimum
+    temperature and pressure margins with their sample indices.
+    """
+    summary = {'n_samples': 0, 'n_violations': 0, 'first_violation': None,
+               'min_temp_margin_c': np.inf, 'min_temp_margin_index': None,
+               'min_pressure_margin_mpa': np.inf, 'min_pressure_margin_index': None}
+    for temp_c, pressure_mpa in chunks:
+        result = screen_trajectory(temp_c, pressure_mpa, **limits)
+        offset = summary['n_samples']
+        if summary['first_violation'] is None and result['first_violation'] is not None:
+            summary['first_violation'] = offset + result['first_violation']
+        summary['n_violations'] += result['n_violations']
+        for key, index_key in (('temp_margin_c', 'min_temp_margin_index'),
+                               ('pressure_margin_mpa', 'min_pressure_margin_index')):
+            i = int(np.argmin(result[key]))
+            if result[key][i] < summary[f'min_{key}']:
+                summary[f'min_{key}'] = float(result[key][i])
+                summary[index_key] = offset + i
+        summary['n_samples'] += len(result['safe'])
+    return summary
+
+
+def synthetic_autoclave_log(days: float = 90.0, dt_s: float = 1.0, chunk_rows: int = 1_000_000,
+                            seed: int = 0):
+    """
+    Yields (temp_c, pressure_mpa) chunks of a synthetic autoclave log: 2 h
+    batches (45 min ramp to 300C, hold, cool) at 15 MPa with sensor noise,
+    plus one temperature overshoot and one pressure dip during late holds.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(days * 86400 / dt_s)
+    batch = int(7200.0 / dt_s)
+    overshoot, dip = ((int(f * n) // batch) * batch + int(4000.0 / dt_s) for f in (0.8, 0.9))
+    for start in range(0, n, chunk_rows):
+        t = (np.arange(start, min(start + chunk_rows, n)) * dt_s) % 7200.0
+        temp = np.interp(t, [0, 2700, 5400, 7200], [25.0, 300.0, 300.0, 60.0])
+        temp += rng.normal(0.0, 0.5, len(t))
+        pressure = 15.0 + rng.normal(0.0, 0.05, len(t))
+        idx = np.arange(start, start + len(t))
+        temp[(idx >= overshoot) & (idx < overshoot + 30)] = 376.0
+        pressure[(idx >= dip) & (idx < dip + 30)] = 5.0
+        yield temp, pressure
+
+
+if __name__ == "__main__" and '--screen' in sys.argv:
+    print("--- [MODULE IV] HTL Autoclave Log Screening ---")
+    start = time.perf_counter()
+    summary = screen_log(synthetic_autoclave_log(), min_subcooling_mpa=0.5)
+    elapsed = time.perf_counter() - start
+    print(f"Screened {summary['n_samples']:,} samples (90 days @ 1 Hz) in {elapsed:.2f} s")
+    print(f"Unsafe samples: {summary['n_violations']:,} (first at index {summary['first_violation']})")
+    print(f"Min margin to critical point: {summary['min_temp_margin_c']:.2f} C "
+          f"(index {summary['min_temp_margin_index']})")
+    print(f"Min subcooling margin: {summary['min_pressure_margin_mpa']:.2f} MPa "
+          f"(index {summary['min_pressure_margin_index']})")
+
+elif __name__ == "__main__":
     print("--- [MODULE IV] HTL Thermodynamic Predictor ---")
     
     # Standard Operating Procedure parameterization
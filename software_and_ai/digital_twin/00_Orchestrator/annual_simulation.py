@@ -0,0 +1,335 @@
+"""
+Symbiotic Factory Digital Twin — Annual Weather-Driven Simulation
+==================================================================
+Module: 00_Orchestrator / annual_simulation.py
+License: GNU GPLv3
+
+Drives the recycle-converged master flowsheet (idaes_master_flowsheet.py)
+with a TMY-style weather file instead of a constant 800 W/m² sun: global
+horizontal irradiance feeds the SUN evaporator and the ambient temperature
+sets the FIRE slurry feed temperature.
+
+The file is streamed in chunks of whole days and every chunk is balanced as
+one batch of operating points, so memory stays constant whatever the length
+or resolution of the file (multi-year, minute data for fleet studies).
+The run accumulates:
+  - annual totals: insolation, freshwater, biochar, bio-crude, ethanol, energy
+  - seasonal (monthly) energy balance and EROI
+  - the diurnal freshwater buffer tank needed to deliver each day's SUN
+    output as a steady feed to WATER
+  - percentiles of irradiance, freshwater rate, EROI and daily freshwater,
+    from streaming histograms (streaming_stats.py)
+
+Weather file: CSV with a header row containing an irradiance column (ghi,
+GHI, ...), optionally an air temperature column (temp_air, ...) and an
+ISO 8601 timestamp column (timestamp, time, ...); quoted fields may
+contain commas. Without timestamps the series is assumed to start on
+1 January at 00:00 with a step of `step_hours`. Metadata lines above the
+header (as in TMY3/EPW exports) are skipped with skip_rows / --skip-rows.
+
+Usage:
+    python annual_simulation.py [weather.csv] [--chunk-rows N] [--skip-rows N]
+    (without a file, a synthetic one-year hourly TMY is written and used)
+"""
+
+import csv
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from idaes_master_flowsheet import solve_flowsheet
+from streaming_stats import StreamingStats
+from cli_options import cli_option
+
+
+GHI_COLUMNS = ('ghi', 'ghi_w_m2', 'ghi (w/m^2)', 'g(h)', 'global_horizontal')
+TEMP_COLUMNS = ('temp_air', 'temperature', 'temp_air_c', 'dry-bulb (c)', 't2m', 'dry_bulb')
+TIME_COLUMNS = ('timestamp', 'time', 'datetime', 'date_time', 'time(utc)')
+
+MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+_MONTH_START_DAY = np.cumsum([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30])
+
+DEFAULT_AMBIENT_C = 25.0
+
+
+# =============================================================================
+# Weather File Streaming
+# =============================================================================
+def _find_column(header, aliases, explicit=None):
+    names = [h.strip().lower() for h in header]
+    for name in ((explicit,) if explicit else aliases):
+        if name and name.lower() in names:
+            return names.index(name.lower())
+    if explicit:
+        raise KeyError(f"Column '{explicit}' not found in weather file header {header}")
+    return None
+
+
+def _parse_timestamps(values):
+    return np.array([v.strip()[:19].replace(' ', 'T') for v in values], dtype='datetime64[s]')
+
+
+class WeatherFile:
+    """
+    A TMY-style CSV read lazily in chunks.
+
+    Columns are located by name (see GHI_COLUMNS / TEMP_COLUMNS /
+    TIME_COLUMNS, or pass the names explicitly). The time step is taken from
+    the first two timestamps when there is a timestamp column, otherwise
+    from step_hours (default 1 h).
+    """
+
+    def __init__(self, path, ghi_column=None, temp_column=None, time_column=None,
+                 step_hours=None, skip_rows=0):
+        self.path = Path(path)
+        self.skip_rows = skip_rows
+        with open(self.path, newline='') as f:
+            reader = self._reader(f)
+            header = next(reader)
+            first_rows = list(islice(reader, 2))
+
+        self.ghi_idx = _find_column(header, GHI_COLUMNS, ghi_column)
+        if self.ghi_idx is None:
+            raise KeyError(f"No irradiance column in weather file header {header}")
+        self.temp_idx = _find_column(header, TEMP_COLUMNS, temp_column)
+        self.time_idx = _find_column(header, TIME_COLUMNS, time_column)
+
+        if self.time_idx is not None and len(first_rows) == 2:
+            stamps = _parse_timestamps([r[self.time_idx] for r in first_rows])
+            step_hours = (stamps[1] - stamps[0]) / np.timedelta64(1, 'h')
+        self.step_hours = float(step_hours) if step_hours else 1.0
+        self.steps_per_day = max(int(round(24.0 / self.step_hours)), 1)
+
+    def _reader(self, f):
+        """csv.reader over f, positioned at the header row."""
+        for _ in range(self.skip_rows):
+            next(f)
+        return csv.reader(f)
+
+    def chunks(self, rows=100_000):
+        """
+        Yields (ghi_W_m2, temp_C, month) arrays of at most `rows` steps,
+        rounded to whole days; month is 0..11.
+        """
+        rows = max(rows // self.steps_per_day, 1) * self.steps_per_day
+        elapsed = 0
+        with open(self.path, newline='') as f:
+            reader = self._reader(f)
+            next(reader)
+            while True:
+                records = [r for r in islice(reader, rows) if any(v.strip() for v in r)]
+                if not records:
+                    return
+                ghi = np.array([r[self.ghi_idx] for r in records], dtype=float)
+                if self.temp_idx is not None:
+                    temp = np.array([r[self.temp_idx] for r in records], dtype=float)
+                else:
+                    temp = np.full(len(records), DEFAULT_AMBIENT_C)
+
+                if self.time_idx is not None:
+                    stamps = _parse_timestamps([r[self.time_idx] for r in records])
+                    month = stamps.astype('datetime64[M]').astype(np.int64) % 12
+                else:
+                    hours = (elapsed + np.arange(len(records))) * self.step_hours
+                    day_of_year = (hours // 24).astype(np.int64) % 365
+                    month = np.searchsorted(_MONTH_START_DAY, day_of_year, side='right') - 1
+                elapsed += len(records)
+                yield np.maximum(ghi, 0.0), temp, month
+
+
+def write_synthetic_tmy(path, years=1, step_minutes=60, latitude_deg=43.3, seed=0):
+    """
+    Writes a synthetic TMY-style CSV (timestamp, ghi, temp_air): Haurwitz
+    clear-sky irradiance scaled by a random daily clearness index, and a
+    seasonal + diurnal air temperature. Meant for demos and smoke tests.
+    """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2023-01-01T00:00')
+    steps_per_day = 24 * 60 // step_minutes
+    lat = np.radians(latitude_deg)
+    with open(path, 'w') as f:
+        f.write("timestamp,ghi,temp_air\n")
+        for day in range(365 * years):
+            doy = day % 365 + 1
+            hour = np.arange(steps_per_day) * step_minutes / 60.0 + step_minutes / 120.0
+            decl = np.radians(23.45) * np.sin(2 * np.pi * (284 + doy) / 365)
+            cos_z = (np.sin(lat) * np.sin(decl)
+                     + np.cos(lat) * np.cos(decl) * np.cos(np.radians(15.0 * (hour - 12.0))))
+            clear = np.where(cos_z > 0, 1098.0 * cos_z * np.exp(-0.057 / np.maximum(cos_z, 1e-3)), 0.0)
+            ghi = clear * rng.beta(5.0, 2.0)
+            temp = (14.0 - 8.0 * np.cos(2 * np.pi * (doy - 15) / 365)
+                    + 5.0 * np.sin(2 * np.pi * (hour - 9.0) / 24.0) + rng.normal(0, 1.0, steps_per_day))
+            stamps = start + np.timedelta64(day * 24 * 60, 'm') + np.arange(steps_per_day) * step_minutes
+            f.writelines(f"{str(t).replace('T', ' ')},{g:.1f},{c:.1f}\n"
+                         for t, g, c in zip(stamps, ghi, temp))
+    return Path(path)
+
+
+# =============================================================================
+# Streaming Accumulation
+# =============================================================================
+def diurnal_buffer_kg(rate_kg_h, step_hours):
+    """
+    Storage needed to turn each day's production profile into a steady feed
+    at that day's mean rate: the range of the cumulative deviation from the
+    mean. rate_kg_h has shape (n_days, steps_per_day); returns kg per day.
+    """
+    deviation = rate_kg_h - rate_kg_h.mean(axis=1, keepdims=True)
+    cumulative = np.cumsum(deviation * step_hours, axis=1)
+    return np.maximum(cumulative.max(axis=1), 0.0) - np.minimum(cumulative.min(axis=1), 0.0)
+
+
+class AnnualAccumulator:
+    """Running totals, monthly balances and percentile sketches of a run."""
+
+    TOTALS = ('hours', 'insolation_kWh_m2', 'freshwater_kg', 'biochar_kg',
+              'biocrude_kg', 'ethanol_kg', 'energy_in_kWh', 'energy_out_kWh')
+
+    def __init__(self, step_hours, steps_per_day):
+        self.step_hours = step_hours
+        self.steps_per_day = steps_per_day
+        self.totals = dict.fromkeys(self.TOTALS, 0.0)
+        self.monthly = {k: np.zeros(12) for k in ('freshwater_kg', 'energy_in_kWh',
+                                                  'energy_out_kWh')}
+        self.stats = {k: StreamingStats() for k in ('ghi_W_m2', 'freshwater_kg_h', 'eroi',
+                                                    'daily_freshwater_kg')}
+        self.buffer_kg = 0.0
+
+    def update(self, ghi, month, units, summary):
+        dt = self.step_hours
+        sun = units[0]
+        fw_kg_h = sun.mass_out['freshwater'] * 3600.0
+        e_in_kWh = sum(m.energy_in_W for m in units) * dt / 1000.0
+        e_out_kWh = sum(m.energy_out_W for m in units) * dt / 1000.0
+
+        t = self.totals
+        t['hours'] += len(ghi) * dt
+        t['insolation_kWh_m2'] += ghi.sum() * dt / 1000.0
+        t['freshwater_kg'] += fw_kg_h.sum() * dt
+        for name in ('biochar', 'biocrude', 'ethanol'):
+            t[f'{name}_kg'] += summary[f'{name}_kg_s'].sum() * 3600.0 * dt
+        t['energy_in_kWh'] += e_in_kWh.sum()
+        t['energy_out_kWh'] += e_out_kWh.sum()
+
+        self.monthly['freshwater_kg'] += np.bincount(month, fw_kg_h * dt, minlength=12)
+        self.monthly['energy_in_kWh'] += np.bincount(month, e_in_kWh, minlength=12)
+        self.monthly['energy_out_kWh'] += np.bincount(month, e_out_kWh, minlength=12)
+
+        self.stats['ghi_W_m2'].update(ghi)
+        self.stats['freshwater_kg_h'].update(fw_kg_h)
+        self.stats['eroi'].update(summary['eroi'])
+
+        # Chunks hold whole days; a trailing partial day is treated as a day.
+        spd = self.steps_per_day
+        n_full = len(fw_kg_h) // spd * spd
+        days = [fw_kg_h[:n_full].reshape(-1, spd)]
+        if n_full < len(fw_kg_h):
+            days.append(fw_kg_h[n_full:].reshape(1, -1))
+        for block in days:
+            if block.size:
+                self.stats['daily_freshwater_kg'].update(block.sum(axis=1) * dt)
+                self.buffer_kg = max(self.buffer_kg, float(diurnal_buffer_kg(block, dt).max()))
+
+    def results(self):
+        years = self.totals['hours'] / 8760.0
+        m = self.monthly
+        monthly_eroi = np.divide(m['energy_out_kWh'], m['energy_in_kWh'],
+                                 out=np.zeros(12), where=m['energy_in_kWh'] > 0)
+        t = self.totals
+        return {
+            'years': years,
+            'totals': dict(t),
+            'per_year': {k: v / years for k, v in t.items() if k != 'hours'} if years else {},
+            'eroi': t['energy_out_kWh'] / t['energy_in_kWh'] if t['energy_in_kWh'] else 0.0,
+            'monthly': {**{k: v.copy() for k, v in m.items()}, 'eroi': monthly_eroi},
+            'freshwater_buffer_kg': self.buffer_kg,
+            'stats': {k: s.summary() for k, s in self.stats.items()},
+        }
+
+
+# =============================================================================
+# Annual Run
+# =============================================================================
+def run_annual_simulation(weather_csv=None, chunk_rows=100_000, membrane_area_m2=2.0,
+                          volume_m3=0.1, co2_rate_kg_s=0.005, htl_temp_C=300.0,
+                          pyro_temp_C=500.0, step_hours=None, skip_rows=0, report=True):
+    """
+    Streams `weather_csv` through the master flowsheet and returns the
+    accumulated results (see AnnualAccumulator.results). Without a file a
+    synthetic one-year hourly TMY is written to the working directory.
+    Also writes annual_monthly_summary.csv.
+    """
+    if weather_csv is None:
+        weather_csv = write_synthetic_tmy("synthetic_tmy.csv")
+    weather = WeatherFile(weather_csv, step_hours=step_hours, skip_rows=skip_rows)
+    acc = AnnualAccumulator(weather.step_hours, weather.steps_per_day)
+
+    start = time.perf_counter()
+    n_steps = 0
+    for ghi, temp, month in weather.chunks(chunk_rows):
+        units, summary, _ = solve_flowsheet(
+            membrane_area_m2=membrane_area_m2, ghi_W_m2=ghi, volume_m3=volume_m3,
+            co2_rate_kg_s=co2_rate_kg_s, htl_temp_C=htl_temp_C, pyro_temp_C=pyro_temp_C,
+            feed_temp_C=temp)
+        acc.update(ghi, month, units, summary)
+        n_steps += len(ghi)
+    elapsed = time.perf_counter() - start
+    results = acc.results()
+
+    m = results['monthly']
+    with open("annual_monthly_summary.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["month", "freshwater_kg", "energy_in_kWh", "energy_out_kWh", "eroi"])
+        for i, name in enumerate(MONTH_NAMES):
+            writer.writerow([name, f"{m['freshwater_kg'][i]:.6g}", f"{m['energy_in_kWh'][i]:.6g}",
+                             f"{m['energy_out_kWh'][i]:.6g}", f"{m['eroi'][i]:.6g}"])
+
+    if report:
+        py, stats = results['per_year'], results['stats']
+        print("=" * 70)
+        print("  SYMBIOTIC FACTORY — ANNUAL WEATHER-DRIVEN SIMULATION")
+        print(f"  Weather: {Path(weather_csv).name} "
+              f"({n_steps:,} steps of {weather.step_hours*60:g} min, {results['years']:.2f} yr)")
+        print("=" * 70)
+        print(f"\n  ── ANNUAL YIELD (per year) ──")
+        print(f"  Insolation:            {py['insolation_kWh_m2']:10.1f} kWh/m²")
+        print(f"  Freshwater:            {py['freshwater_kg']/1000:10.2f} m³")
+        print(f"  Biochar Carbon Sink:   {py['biochar_kg']:10.1f} kg")
+        print(f"  Bio-Crude:             {py['biocrude_kg']:10.1f} kg")
+        print(f"  Ethanol:               {py['ethanol_kg']:10.1f} kg")
+        print(f"  Annual EROI:           {results['eroi']:10.2f}")
+        print(f"  Freshwater buffer:     {results['freshwater_buffer_kg']:10.1f} kg "
+              f"(diurnal tank)")
+
+        print(f"\n  ── SEASONAL BALANCE ──")
+        print(f"  {'Month':5s} {'Water (kg)':>12s} {'E_in (kWh)':>12s} {'E_out (kWh)':>12s} {'EROI':>6s}")
+        for i, name in enumerate(MONTH_NAMES):
+            print(f"  {name:5s} {m['freshwater_kg'][i]:12.1f} {m['energy_in_kWh'][i]:12.1f} "
+                  f"{m['energy_out_kWh'][i]:12.1f} {m['eroi'][i]:6.2f}")
+
+        print(f"\n  ── DISTRIBUTIONS (p5 / p50 / p95) ──")
+        for name, label in (('ghi_W_m2', 'GHI (W/m²)'), ('freshwater_kg_h', 'Freshwater (kg/h)'),
+                            ('daily_freshwater_kg', 'Daily water (kg)'), ('eroi', 'Step EROI')):
+            s = stats[name]
+            print(f"  {label:22s} {s['p5']:9.3f} / {s['p50']:9.3f} / {s['p95']:9.3f}")
+        print(f"\n  Throughput: {n_steps/elapsed:,.0f} steps/s ({elapsed:.2f} s)")
+        print(f"  ✅ Monthly summary saved: annual_monthly_summary.csv")
+        print("=" * 70)
+
+    return results
+
+
+if __name__ == '__main__':
+    options = ('--chunk-rows', '--skip-rows')
+    args = sys.argv[1:]
+    paths = [arg for prev, arg in zip([None] + args, args)
+             if not arg.startswith('--') and prev not in options]
+    run_annual_simulation(paths[0] if paths else None,
+                          chunk_rows=cli_option('--chunk-rows', 100_000),
+                          skip_rows=cli_option('--skip-rows', 0))
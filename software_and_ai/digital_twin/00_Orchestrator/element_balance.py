@@ -0,0 +1,249 @@
+"""
+Symbiotic Factory — Elemental (C/H/O/N/P/S/Ash) Balance Engine
+================================================================
+Module: 00_Orchestrator / element_balance.py
+License: GNU GPLv3
+
+Checks element conservation across the unit blocks of the master flowsheet
+(idaes_master_flowsheet.py) for whole batches of operating points.
+
+Every flowsheet stream is described as a mix of species (STREAM_SPECIES),
+and every species by its elemental mass fractions (SPECIES). Their product
+is the stream × element composition matrix. ElementBalance stacks the
+signed composition of every unit inlet and outlet into one block matrix, so
+the element residuals (in − out) and inflows of all units at all points
+come from a single matrix product  F[points × streams] @ B.
+
+Usage:
+    python element_balance.py [--points N]   # closure report of a random batch
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from idaes_master_flowsheet import (
+    ALGAE_COMPOSITION, AQUEOUS_PHASE_COMPOSITION, BIOCHAR_COMPOSITION,
+    BIOCRUDE_COMPOSITION, HYDROCHAR_COMPOSITION, solve_flowsheet,
+)
+from cli_options import cli_option
+
+
+ELEMENTS = ('C', 'H', 'O', 'N', 'P', 'S', 'Ash')
+ATOMIC_MASS = {'C': 12.011, 'H': 1.008, 'O': 15.999, 'N': 14.007, 'P': 30.974, 'S': 32.06}
+
+
+def formula_fractions(formula):
+    """Elemental mass fractions of a molecule, e.g. {'C': 2, 'H': 6, 'O': 1}."""
+    masses = {el: n * ATOMIC_MASS[el] for el, n in formula.items()}
+    total = sum(masses.values())
+    return {el: m / total for el, m in masses.items()}
+
+
+def molar_mixture(components):
+    """Elemental mass fractions of a gas mix given [(mole fraction, formula)]."""
+    masses = {}
+    for mole_frac, formula in components:
+        for el, n in formula.items():
+            masses[el] = masses.get(el, 0.0) + mole_frac * n * ATOMIC_MASS[el]
+    total = sum(masses.values())
+    return {el: m / total for el, m in masses.items()}
+
+
+# =============================================================================
+# Species × Element and Stream × Species Definitions
+# =============================================================================
+SPECIES = {
+    'H2O': formula_fractions({'H': 2, 'O': 1}),
+    'CO2': formula_fractions({'C': 1, 'O': 2}),
+    'ethanol': formula_fractions({'C': 2, 'H': 6, 'O': 1}),
+    'salt': {'Ash': 1.0},            # sea salts reported as ash
+    'nitrogen': {'N': 1.0},          # nutrient flows are expressed as kg N ...
+    'phosphorus': {'P': 1.0},        # ... and kg P
+    'algae': {el: f for el, f in ALGAE_COMPOSITION.items() if el != 'moisture'},
+    'biocrude': BIOCRUDE_COMPOSITION,
+    'aqueous_phase': AQUEOUS_PHASE_COMPOSITION,
+    'hydrochar': HYDROCHAR_COMPOSITION,
+    'biochar': BIOCHAR_COMPOSITION,
+    'syngas': molar_mixture([(0.35, {'C': 1, 'O': 1}), (0.30, {'H': 2}),
+                             (0.15, {'C': 1, 'H': 4}), (0.20, {'C': 1, 'O': 2})]),
+}
+
+_MOISTURE = ALGAE_COMPOSITION['moisture']
+STREAM_SPECIES = {
+    'saltwater': {'H2O': 0.965, 'salt': 0.035},
+    'freshwater': {'H2O': 1.0},
+    'brine_reject': {'salt': 1.0},
+    'biochar_makeup': {'biochar': 1.0},
+    'spent_membrane': {'biochar': 1.0},
+    'CO2': {'CO2': 1.0},
+    'CO2_exhaust': {'CO2': 1.0},
+    'N_nutrient': {'nitrogen': 1.0},
+    'P_nutrient': {'phosphorus': 1.0},
+    'aqueous_recycle': {'aqueous_phase': 1.0},
+    'wet_biomass': {'algae': 1.0 - _MOISTURE, 'H2O': _MOISTURE},
+    'biocrude': {'biocrude': 1.0},
+    'ethanol': {'ethanol': 1.0},
+    'hydrochar': {'hydrochar': 1.0},
+    'htl_gas': {'CO2': 1.0},
+    'biochar_PAC': {'biochar': 1.0},
+    'syngas': {'syngas': 1.0},
+    # Nutrient tracers: their N and P travel inside aqueous_recycle
+    'N_recycle': None, 'P_recycle': None, 'N_recycled': None, 'P_recycled': None,
+}
+
+
+def species_matrix():
+    """Returns (species names, matrix [species × ELEMENTS] of mass fractions)."""
+    names = list(SPECIES)
+    M = np.array([[SPECIES[s].get(el, 0.0) for el in ELEMENTS] for s in names])
+    return names, M
+
+
+def stream_element_matrix():
+    """Returns (stream names, matrix [streams × ELEMENTS]); tracer rows are zero."""
+    species, M = species_matrix()
+    streams = list(STREAM_SPECIES)
+    S = np.array([[(STREAM_SPECIES[st] or {}).get(sp, 0.0) for sp in species]
+                  for st in streams])
+    return streams, S @ M
+
+
+# =============================================================================
+# Balance Engine
+# =============================================================================
+class ElementBalance:
+    """
+    Element residuals of a list of unit blocks (see UnitBlock).
+
+    The columns are every (unit, inlet/outlet, stream) of the units; B maps
+    the column flows to [residual, inflow] per unit and element, with inlets
+    counted positive and outlets negative in the residual.
+    """
+
+    def __init__(self, units):
+        streams, A = stream_element_matrix()
+        composition = dict(zip(streams, A))
+        self.unit_names = [u.name for u in units]
+        self.columns = []
+        for i, unit in enumerate(units):
+            self.columns += [(i, 'in', s) for s in unit.STREAMS_IN]
+            self.columns += [(i, 'out', s) for s in unit.STREAMS_OUT]
+        missing = sorted({s for _, _, s in self.columns} - set(composition))
+        if missing:
+            raise KeyError(f"Streams without a composition in STREAM_SPECIES: {missing}")
+
+        n_units, n_el = len(units), len(ELEMENTS)
+        B = np.zeros((len(self.columns), 2, n_units, n_el))
+        for k, (i, direction, stream) in enumerate(self.columns):
+            comp = composition[stream]
+            if direction == 'in':
+                B[k, 0, i] = comp
+                B[k, 1, i] = comp
+            else:
+                B[k, 0, i] = -comp
+        self.B = B.reshape(len(self.columns), -1)
+        self.composition = composition
+
+    def flows(self, units, rows=slice(None)):
+        """Column flow matrix [points × columns] (kg/s) for a slice of points."""
+        return np.column_stack([(units[i].mass_in if d == 'in' else units[i].mass_out)[s][rows]
+                                for i, d, s in self.columns])
+
+    def residuals(self, units, block_rows=250_000):
+        """
+        Returns (residual, inflow), each [points × units × ELEMENTS] in kg/s.
+        Points are processed in blocks of block_rows to bound memory.
+        """
+        n = units[0].n_points
+        out = np.empty((n, self.B.shape[1]))
+        for start in range(0, n, block_rows):
+            rows = slice(start, min(start + block_rows, n))
+            out[rows] = self.flows(units, rows) @ self.B
+        out = out.reshape(n, 2, len(self.unit_names), len(ELEMENTS))
+        return out[:, 0], out[:, 1]
+
+    def closure_report(self, units, rtol=1e-3):
+        """
+        Element closure of every unit at every point.
+
+        relative = (in − out) / max(in, out) per unit and element, so +1 means
+        the element vanishes in the unit and −1 that it appears from nothing.
+        Returns a dict with 'residual_kg_s', 'relative', 'violations'
+        (|relative| > rtol), per unit × element 'violation_rate' and
+        'worst_relative', 'closed' (no violation at that point) and the
+        element-based N and P 'recycle_recovery_pct' (nutrient returned to
+        WATER in the aqueous phase over nutrient leaving in the biomass).
+        """
+        residual, inflow = self.residuals(units)
+        scale = np.maximum(inflow, inflow - residual)
+        relative = np.divide(residual, scale, out=np.zeros_like(residual), where=scale > 0)
+        violations = np.abs(relative) > rtol
+        worst_idx = np.abs(relative).argmax(axis=0)
+        worst = np.take_along_axis(relative, worst_idx[None], axis=0)[0]
+
+        water = units[self.unit_names.index('WATER')]
+        recovery = {}
+        for el in ('N', 'P'):
+            j = ELEMENTS.index(el)
+            returned = water.mass_in['aqueous_recycle'] * self.composition['aqueous_recycle'][j]
+            uptake = water.mass_out['wet_biomass'] * self.composition['wet_biomass'][j]
+            recovery[el] = np.divide(returned * 100, uptake, out=np.zeros_like(uptake),
+                                     where=uptake > 0)
+
+        return {
+            'units': self.unit_names,
+            'elements': ELEMENTS,
+            'rtol': rtol,
+            'residual_kg_s': residual,
+            'relative': relative,
+            'violations': violations,
+            'violation_rate': violations.mean(axis=0),
+            'worst_relative': worst,
+            'closed': ~violations.any(axis=(1, 2)),
+            'recycle_recovery_pct': recovery,
+        }
+
+
+def print_closure_report(report):
+    """Prints the per-unit, per-element closure table of a batch."""
+    n = len(report['closed'])
+    header = "".join(f"{el:>9s}" for el in report['elements'])
+    print(f"\n  ── WORST RELATIVE RESIDUAL (in − out)/max(in, out) ──")
+    print(f"  {'Unit':6s}{header}")
+    for i, unit in enumerate(report['units']):
+        row = "".join(f"{v*100:8.1f}%" for v in report['worst_relative'][i])
+        print(f"  {unit:6s}{row}")
+    print(f"\n  ── POINTS VIOLATING |residual| > {report['rtol']:g} ──")
+    print(f"  {'Unit':6s}{header}")
+    for i, unit in enumerate(report['units']):
+        row = "".join(f"{v*100:8.1f}%" for v in report['violation_rate'][i])
+        print(f"  {unit:6s}{row}")
+    rec = report['recycle_recovery_pct']
+    print(f"\n  Points fully closed:   {report['closed'].sum():,} / {n:,}")
+    print(f"  N recovered to WATER:  {rec['N'].mean():.1f}% of biomass N (mean)")
+    print(f"  P recovered to WATER:  {rec['P'].mean():.1f}% of biomass P (mean)")
+
+
+if __name__ == '__main__':
+    n = cli_option('--points', 1_000_000)
+    rng = np.random.default_rng(0)
+    units, summary, _ = solve_flowsheet(
+        membrane_area_m2=rng.uniform(1.0, 5.0, n), ghi_W_m2=rng.uniform(0.0, 1000.0, n),
+        co2_rate_kg_s=rng.uniform(0.001, 0.01, n), htl_temp_C=rng.uniform(250.0, 350.0, n),
+        pyro_temp_C=rng.uniform(400.0, 800.0, n))
+
+    start = time.perf_counter()
+    report = ElementBalance(units).closure_report(units)
+    elapsed = time.perf_counter() - start
+
+    print("=" * 70)
+    print("  SYMBIOTIC FACTORY — ELEMENTAL BALANCE CLOSURE")
+    print(f"  Operating points: {n:,}   ({elapsed:.2f} s, {n/elapsed/1e6:.1f} M points/s)")
+    print("=" * 70)
+    print_closure_report(report)
+    print("=" * 70)
@@ -0,0 +1,227 @@
+"""
+Symbiotic Factory Digital Twin — Pure-NumPy Fast-Path Factory Evaluator
+=======================================================================
+Module: 00_Orchestrator / factory_fast_model.py
+License: GNU GPLv3
+
+A framework-free, vectorized re-implementation of the OpenMDAO factory model
+in factory_mdo_model.py (SUNModule → WATERModule → FIREModule → TERREModule →
+EROICalculator). It computes exactly the same outputs, but over whole arrays
+of operating points with plain NumPy, so screening sweeps and dashboards can
+run millions of evaluations per second without importing openmdao.
+
+verify_against_openmdao() checks the two implementations agree to numerical
+precision (including the clipped yield branches); keep them in step when
+either one changes.
+
+Usage:
+    python factory_fast_model.py            # benchmark + equivalence check
+    python factory_fast_model.py --verify   # equivalence check only (needs openmdao)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+# Input values used when an input is not given: the component defaults of
+# factory_mdo_model.py overridden by its NOMINAL_CONDITIONS.
+DEFAULT_INPUTS = {
+    # SUN
+    'solar_irradiance': 800.0,          # W/m²
+    'membrane_area': 1.0,               # m²
+    'lspr_efficiency': 0.92,
+    'enthalpy_vap_effective': 1250.0,   # kJ/kg
+    # WATER
+    'co2_flow_rate': 0.005,             # kg/s
+    'kla': 0.05,                        # 1/s
+    'led_frequency': 25.0,              # Hz
+    'reactor_volume': 0.100,            # m³
+    # FIRE
+    'htl_temp': 573.15,                 # K
+    'htl_pressure': 15e6,               # Pa
+    'htl_hold_time': 1800.0,            # s
+    # TERRE
+    'pyrolysis_temp': 773.15,           # K
+    'hold_time': 3600.0,                # s
+    # Parasitic loads
+    'pump_power': 150.0,                # W
+    'led_power': 50.0,                  # W
+}
+
+ETHANOL_HHV = 29.7e6  # J/kg
+
+# Empirical constants hard-coded in the OpenMDAO components, at their values
+# there. They can be overridden (e.g. for sensitivity studies); only the
+# nominal values reproduce factory_mdo_model.py.
+COEFFICIENTS = {
+    # WATERModule
+    'water.flash_rate': 0.08,           # 1/Hz, flashing-light response
+    'water.absorption_eff': 0.85,
+    'water.biomass_per_co2': 1.8,       # kg biomass per kg CO2 absorbed
+    # FIREModule
+    'fire.dry_fraction': 0.15,
+    'fire.crude_yield_base': 0.25,      # at 250 °C
+    'fire.crude_yield_slope': 0.001,    # 1/°C
+    'fire.hhv_base': 35.0,              # MJ/kg at 250 °C
+    'fire.hhv_slope': 0.02,             # MJ/kg/°C
+    'fire.solid_fraction': 0.6,
+    'fire.co_conversion': 0.30,
+    'fire.ethanol_yield': 0.27,
+    'fire.slurry_moisture': 0.85,
+    'fire.water_cp': 4200.0,            # J/kg/K
+    # TERREModule
+    'terre.char_yield_base': 0.60,
+    'terre.char_yield_slope': 0.00075,  # 1/°C
+    'terre.syngas_hhv': 10e6,           # J/kg
+    'terre.oc_base': 0.45,
+    'terre.oc_slope': 0.0008,           # 1/°C
+    # EROICalculator
+    'eroi.ethanol_hhv': ETHANOL_HHV,
+}
+
+
+def evaluate_factory(coefficients=None, **inputs):
+    """
+    Evaluates the factory model for arrays of operating points.
+
+    Keyword arguments are the promoted input names of the OpenMDAO model
+    (see DEFAULT_INPUTS, same units) as scalars or arrays; they are broadcast
+    against each other, so grids work too. `coefficients` overrides entries
+    of COEFFICIENTS (scalars or arrays broadcasting with the inputs).
+    Returns {output name: array} with the same keys as
+    factory_mdo_model.FACTORY_OUTPUTS.
+    """
+    unknown = set(inputs) - set(DEFAULT_INPUTS)
+    if unknown:
+        raise KeyError(f"Unknown factory inputs: {sorted(unknown)}")
+    unknown = set(coefficients or {}) - set(COEFFICIENTS)
+    if unknown:
+        raise KeyError(f"Unknown factory coefficients: {sorted(unknown)}")
+    c = {**COEFFICIENTS, **(coefficients or {})}
+    names = list(DEFAULT_INPUTS)
+    arrays = np.broadcast_arrays(*(np.asarray(inputs.get(n, DEFAULT_INPUTS[n]), dtype=float)
+                                   for n in names))
+    x = dict(zip(names, arrays))
+
+    # --- SUN ---
+    sun_thermal_power = x['solar_irradiance'] * x['membrane_area'] * x['lspr_efficiency']
+    freshwater_rate = sun_thermal_power / (x['enthalpy_vap_effective'] * 1000.0)
+
+    # --- WATER ---
+    co2_dissolved = x['kla'] * x['reactor_volume'] * x['co2_flow_rate']
+    flash_eff = 1.0 - np.exp(-c['water.flash_rate'] * x['led_frequency'])
+    co2_absorbed = co2_dissolved * flash_eff * c['water.absorption_eff']
+    co2_exhaust = x['co2_flow_rate'] - co2_absorbed
+    biomass_rate = co2_absorbed * c['water.biomass_per_co2']
+
+    # --- FIRE ---
+    htl_celsius = x['htl_temp'] - 273.15
+    dry_biomass = biomass_rate * c['fire.dry_fraction']
+    crude_yield_frac = np.clip(c['fire.crude_yield_base']
+                               + c['fire.crude_yield_slope'] * (htl_celsius - 250), 0.15, 0.45)
+    biocrude_rate = dry_biomass * crude_yield_frac
+    biocrude_hhv = (c['fire.hhv_base'] + c['fire.hhv_slope'] * (htl_celsius - 250)) * 1e6
+    solid_waste_rate = dry_biomass * (1.0 - crude_yield_frac) * c['fire.solid_fraction']
+    ethanol_rate = co2_exhaust * c['fire.co_conversion'] * c['fire.ethanol_yield']
+    htl_energy_required = (biomass_rate * c['fire.slurry_moisture'] * c['fire.water_cp']
+                           * (htl_celsius - 25.0))
+
+    # --- TERRE ---
+    pyro_celsius = x['pyrolysis_temp'] - 273.15
+    char_yield = np.maximum(c['terre.char_yield_base'] - c['terre.char_yield_slope'] * pyro_celsius,
+                            0.20)
+    biochar_rate = solid_waste_rate * char_yield
+    syngas_energy = solid_waste_rate * (1.0 - char_yield) * c['terre.syngas_hhv']
+    oc_ratio = np.maximum(0.05, c['terre.oc_base'] - c['terre.oc_slope'] * pyro_celsius)
+
+    # --- EROI ---
+    energy_out = biocrude_rate * biocrude_hhv + ethanol_rate * c['eroi.ethanol_hhv'] + syngas_energy
+    energy_in = htl_energy_required + x['pump_power'] + x['led_power']
+    positive = energy_in > 0
+    eroi = np.where(positive, energy_out / np.where(positive, energy_in, 1.0), 0.0)
+
+    return {
+        'freshwater_rate': freshwater_rate,
+        'sun_thermal_power': sun_thermal_power,
+        'biomass_rate': biomass_rate,
+        'co2_absorbed': co2_absorbed,
+        'co2_exhaust': co2_exhaust,
+        'biocrude_rate': biocrude_rate,
+        'biocrude_hhv': biocrude_hhv,
+        'ethanol_rate': ethanol_rate,
+        'solid_waste_rate': solid_waste_rate,
+        'htl_energy_required': htl_energy_required,
+        'biochar_rate': biochar_rate,
+        'syngas_energy': syngas_energy,
+        'oc_ratio': oc_ratio,
+        'eroi': eroi,
+    }
+
+
+# Ranges sampled by verify_against_openmdao; wider than the MDO bounds so
+# that every clipped branch is exercised.
+VERIFY_RANGES = {
+    'solar_irradiance': (0.0, 1200.0),
+    'membrane_area': (0.5, 10.0),
+    'co2_flow_rate': (0.0, 0.02),
+    'led_frequency': (1.0, 100.0),
+    'htl_temp': (373.15, 773.15),
+    'pyrolysis_temp': (573.15, 973.15),
+}
+
+
+def verify_against_openmdao(n_points=2000, seed=0, rtol=1e-12):
+    """
+    Evaluates random operating points with both this module and the OpenMDAO
+    model (factory_mdo_model.evaluate_scenarios) and checks that every output
+    agrees to `rtol`; raises RuntimeError listing the outputs that do not.
+    Returns the worst relative difference.
+    """
+    sys.path.insert(0, str(Path(__file__).parent))
+    from factory_mdo_model import FACTORY_OUTPUTS, evaluate_scenarios
+
+    rng = np.random.default_rng(seed)
+    points = {name: rng.uniform(lo, hi, n_points) for name, (lo, hi) in VERIFY_RANGES.items()}
+
+    reference = evaluate_scenarios(**points)
+    fast = evaluate_factory(**points)
+
+    worst = 0.0
+    mismatches = []
+    for name in FACTORY_OUTPUTS:
+        scale = np.maximum(np.abs(reference[name]), 1e-300)
+        rel = float(np.max(np.abs(fast[name] - reference[name]) / scale))
+        worst = max(worst, rel)
+        if not rel <= rtol:
+            mismatches.append(f"{name} (rel err {rel:.2e})")
+    if mismatches:
+        raise RuntimeError("Fast path differs from the OpenMDAO model: " + "; ".join(mismatches))
+    return worst
+
+
+if __name__ == '__main__' and '--verify' in sys.argv:
+    print(f"Fast path matches OpenMDAO model (worst relative difference "
+          f"{verify_against_openmdao():.1e})")
+elif __name__ == '__main__':
+    n = 1_000_000
+    rng = np.random.default_rng(0)
+    sweep = {name: rng.uniform(lo, hi, n) for name, (lo, hi) in VERIFY_RANGES.items()}
+    start = time.perf_counter()
+    evaluate_factory(**sweep)
+    elapsed = time.perf_counter() - start
+
+    print("=" * 70)
+    print("  SYMBIOTIC FACTORY DIGITAL TWIN — NumPy Fast-Path Evaluator")
+    print("=" * 70)
+    print(f"  Operating points:       {n:,}")
+    print(f"  Wall time:              {elapsed*1000:.1f} ms")
+    print(f"  Throughput:             {n/elapsed/1e6:.1f} M evaluations/s")
+    try:
+        worst = verify_against_openmdao()
+        print(f"  Matches OpenMDAO model: ✅ (worst relative difference {worst:.1e})")
+    except ImportError:
+        print("  Matches OpenMDAO model: ⏭ openmdao not installed, check skipped")
+    print("=" * 70)
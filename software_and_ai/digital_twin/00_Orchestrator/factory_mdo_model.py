@@ -9,18 +9,59 @@ Multidisciplinary Design Optimization (MDO) across all four modules of the
 Symbiotic Factory. It wires the thermodynamic outputs of each module into a
 unified optimization problem that maximizes the Energy Return on Investment (EROI).
 
+Every component provides analytic partial derivatives, so SLSQP receives
+exact gradients instead of finite differences. Every component also accepts
+a `vec_size` option: with vec_size=N each variable is a length-N vector and
+one run_model() evaluates N independent operating points (see
+evaluate_scenarios), with diagonal sparse partials.
+
+Because the clipped yield models make SLSQP start-dependent, run_multistart
+seeds many starts from a Latin-hypercube or full-factorial DOE, runs them in a
+process pool and reports every distinct local optimum.
+
 Usage:
     python factory_mdo_model.py
+    python factory_mdo_model.py --check-partials   # verify analytic derivatives
+    python factory_mdo_model.py --multistart 64 [--design lhs|factorial] [--levels 3] [--jobs N]
 """
 
+import sys
+from pathlib import Path
+
 import openmdao.api as om
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from cli_options import cli_option
+
+
+class VectorizedComponent(om.ExplicitComponent):
+    """
+    ExplicitComponent whose variables are all vectors of length `vec_size`.
+    Operating points never interact, so every Jacobian block is diagonal.
+    """
+
+    def initialize(self):
+        self.options.declare('vec_size', types=int, default=1,
+                             desc='Number of operating points evaluated at once')
+
+    def add_input(self, name, val=1.0, **kwargs):
+        return super().add_input(name, val=val, shape=(self.options['vec_size'],), **kwargs)
+
+    def add_output(self, name, val=1.0, **kwargs):
+        return super().add_output(name, val=val, shape=(self.options['vec_size'],), **kwargs)
+
+    def declare_diagonal_partials(self, of, wrt, val=None):
+        """Declares d(of)/d(wrt) as a sparse diagonal for every wrt in the list."""
+        diag = np.arange(self.options['vec_size'])
+        for name in ([wrt] if isinstance(wrt, str) else wrt):
+            self.declare_partials(of, name, rows=diag, cols=diag, val=val)
+
 
 # =============================================================================
 # Module I: SUN — Plasmonic Interfacial Solar Steam Generator
 # =============================================================================
-class SUNModule(om.ExplicitComponent):
+class SUNModule(VectorizedComponent):
     """
     Calculates freshwater production rate based on solar irradiance,
     membrane area, and the LSPR-enhanced evaporation efficiency.
@@ -43,6 +84,12 @@ class SUNModule(om.ExplicitComponent):
         self.add_output('sun_thermal_power', val=0.0, units='W',
                          desc='Thermal power absorbed by the membrane')
 
+        self.declare_diagonal_partials('sun_thermal_power',
+                                       ['solar_irradiance', 'membrane_area', 'lspr_efficiency'])
+        self.declare_diagonal_partials('freshwater_rate',
+                                       ['solar_irradiance', 'membrane_area', 'lspr_efficiency',
+                                        'enthalpy_vap_effective'])
+
     def compute(self, inputs, outputs):
         q_solar = inputs['solar_irradiance'] * inputs['membrane_area']
         q_absorbed = q_solar * inputs['lspr_efficiency']
@@ -50,11 +97,27 @@ class SUNModule(om.ExplicitComponent):
         # kg/s = W / (kJ/kg * 1000 J/kJ)
         outputs['freshwater_rate'] = q_absorbed / (inputs['enthalpy_vap_effective'] * 1000.0)
 
+    def compute_partials(self, inputs, partials):
+        ghi = inputs['solar_irradiance']
+        area = inputs['membrane_area']
+        eta = inputs['lspr_efficiency']
+        h_vap = inputs['enthalpy_vap_effective'] * 1000.0
+
+        partials['sun_thermal_power', 'solar_irradiance'] = area * eta
+        partials['sun_thermal_power', 'membrane_area'] = ghi * eta
+        partials['sun_thermal_power', 'lspr_efficiency'] = ghi * area
+
+        partials['freshwater_rate', 'solar_irradiance'] = area * eta / h_vap
+        partials['freshwater_rate', 'membrane_area'] = ghi * eta / h_vap
+        partials['freshwater_rate', 'lspr_efficiency'] = ghi * area / h_vap
+        partials['freshwater_rate', 'enthalpy_vap_effective'] = \
+            -ghi * area * eta * 1000.0 / h_vap**2
+
 
 # =============================================================================
 # Module II: WATER — Nano-Bubbling Algal Cycloreactor
 # =============================================================================
-class WATERModule(om.ExplicitComponent):
+class WATERModule(VectorizedComponent):
     """
     Calculates algal biomass production rate from CO2 mass-transfer,
     light/dark cycling frequency, and freshwater availability.
@@ -81,6 +144,12 @@ class WATERModule(om.ExplicitComponent):
         self.add_output('co2_exhaust', val=0.0, units='kg/s',
                          desc='Unabsorbed CO2 vented to FIRE Z-scheme')
 
+        # freshwater_rate is a coupling input only: it does not limit growth here
+        wrt = ['kla', 'reactor_volume', 'co2_flow_rate', 'led_frequency']
+        self.declare_diagonal_partials('co2_absorbed', wrt)
+        self.declare_diagonal_partials('co2_exhaust', wrt)
+        self.declare_diagonal_partials('biomass_rate', wrt)
+
     def compute(self, inputs, outputs):
         # CO2 dissolution rate (Henry's Law + Laplace enhancement)
         co2_dissolved = inputs['kla'] * inputs['reactor_volume'] * inputs['co2_flow_rate']
@@ -94,11 +163,31 @@ class WATERModule(om.ExplicitComponent):
         outputs['co2_exhaust'] = inputs['co2_flow_rate'] - co2_fixed
         outputs['biomass_rate'] = co2_fixed * 1.8  # stoichiometric ratio
 
+    def compute_partials(self, inputs, partials):
+        kla = inputs['kla']
+        volume = inputs['reactor_volume']
+        co2_flow = inputs['co2_flow_rate']
+        decay = np.exp(-0.08 * inputs['led_frequency'])
+        flash_eff = 1.0 - decay
+
+        # d(co2_fixed)/d(input)
+        d_fixed = {
+            'kla': volume * co2_flow * flash_eff * 0.85,
+            'reactor_volume': kla * co2_flow * flash_eff * 0.85,
+            'co2_flow_rate': kla * volume * flash_eff * 0.85,
+            'led_frequency': kla * volume * co2_flow * 0.08 * decay * 0.85,
+        }
+        for name, d in d_fixed.items():
+            partials['co2_absorbed', name] = d
+            partials['co2_exhaust', name] = -d
+            partials['biomass_rate', name] = d * 1.8
+        partials['co2_exhaust', 'co2_flow_rate'] = 1.0 - d_fixed['co2_flow_rate']
+
 
 # =============================================================================
 # Module III: TERRE — TLUD Anaerobic Pyrolyzer
 # =============================================================================
-class TERREModule(om.ExplicitComponent):
+class TERREModule(VectorizedComponent):
     """
     Calculates PAC biochar yield and syngas energy from solid waste pyrolysis.
     """
@@ -120,12 +209,16 @@ class TERREModule(om.ExplicitComponent):
         self.add_output('oc_ratio', val=0.0,
                          desc='Oxygen:Carbon atomic ratio of the biochar')
 
+        self.declare_diagonal_partials('biochar_rate', ['solid_waste_rate', 'pyrolysis_temp'])
+        self.declare_diagonal_partials('syngas_energy', ['solid_waste_rate', 'pyrolysis_temp'])
+        self.declare_diagonal_partials('oc_ratio', 'pyrolysis_temp')
+
     def compute(self, inputs, outputs):
         # Biochar yield decreases with temperature (more volatiles driven off)
         t_celsius = inputs['pyrolysis_temp'] - 273.15
         # Empirical: yield drops from ~45% at 400°C to ~30% at 600°C
         char_yield = 0.60 - 0.00075 * t_celsius
-        char_yield = max(char_yield, 0.20)
+        char_yield = np.maximum(char_yield, 0.20)
 
         outputs['biochar_rate'] = inputs['solid_waste_rate'] * char_yield
 
@@ -134,13 +227,29 @@ class TERREModule(om.ExplicitComponent):
         outputs['syngas_energy'] = volatile_rate * 10e6  # W = kg/s * J/kg
 
         # O:C ratio decreases with temperature (more oxygen driven off)
-        outputs['oc_ratio'] = max(0.05, 0.45 - 0.0008 * t_celsius)
+        outputs['oc_ratio'] = np.maximum(0.05, 0.45 - 0.0008 * t_celsius)
+
+    def compute_partials(self, inputs, partials):
+        t_celsius = inputs['pyrolysis_temp'] - 273.15
+        waste = inputs['solid_waste_rate']
+
+        # On the clipped branches the output is pinned and its slope is zero
+        char_yield = 0.60 - 0.00075 * t_celsius
+        d_yield = np.where(char_yield > 0.20, -0.00075, 0.0)
+        char_yield = np.maximum(char_yield, 0.20)
+
+        partials['biochar_rate', 'solid_waste_rate'] = char_yield
+        partials['biochar_rate', 'pyrolysis_temp'] = waste * d_yield
+        partials['syngas_energy', 'solid_waste_rate'] = (1.0 - char_yield) * 10e6
+        partials['syngas_energy', 'pyrolysis_temp'] = -waste * d_yield * 10e6
+        partials['oc_ratio', 'pyrolysis_temp'] = \
+            np.where(0.45 - 0.0008 * t_celsius > 0.05, -0.0008, 0.0)
 
 
 # =============================================================================
 # Module IV: FIRE — HTL Autoclave & Z-Scheme Fermenter
 # =============================================================================
-class FIREModule(om.ExplicitComponent):
+class FIREModule(VectorizedComponent):
     """
     Calculates bio-crude yield from HTL and ethanol yield from Z-scheme
     CO-to-alcohol fermentation.
@@ -171,6 +280,12 @@ class FIREModule(om.ExplicitComponent):
         self.add_output('htl_energy_required', val=0.0, units='W',
                          desc='Thermal energy needed for HTL')
 
+        self.declare_diagonal_partials('biocrude_rate', ['biomass_rate', 'htl_temp'])
+        self.declare_diagonal_partials('biocrude_hhv', 'htl_temp', val=0.02e6)
+        self.declare_diagonal_partials('solid_waste_rate', ['biomass_rate', 'htl_temp'])
+        self.declare_diagonal_partials('ethanol_rate', 'co2_exhaust', val=0.30 * 0.27)
+        self.declare_diagonal_partials('htl_energy_required', ['biomass_rate', 'htl_temp'])
+
     def compute(self, inputs, outputs):
         t_celsius = inputs['htl_temp'] - 273.15
 
@@ -178,7 +293,7 @@ class FIREModule(om.ExplicitComponent):
         # Wet algae is ~85% water, so dry fraction = 0.15
         dry_biomass = inputs['biomass_rate'] * 0.15
         crude_yield_frac = 0.25 + 0.001 * (t_celsius - 250)
-        crude_yield_frac = min(max(crude_yield_frac, 0.15), 0.45)
+        crude_yield_frac = np.clip(crude_yield_frac, 0.15, 0.45)
 
         outputs['biocrude_rate'] = dry_biomass * crude_yield_frac
 
@@ -201,17 +316,37 @@ class FIREModule(om.ExplicitComponent):
         delta_t = t_celsius - 25.0
         outputs['htl_energy_required'] = water_mass_rate * cp_water * delta_t
 
+    def compute_partials(self, inputs, partials):
+        t_celsius = inputs['htl_temp'] - 273.15
+        biomass = inputs['biomass_rate']
+        dry_biomass = biomass * 0.15
+
+        crude_yield_frac = 0.25 + 0.001 * (t_celsius - 250)
+        d_yield = np.where((crude_yield_frac > 0.15) & (crude_yield_frac < 0.45), 0.001, 0.0)
+        crude_yield_frac = np.clip(crude_yield_frac, 0.15, 0.45)
+
+        partials['biocrude_rate', 'biomass_rate'] = 0.15 * crude_yield_frac
+        partials['biocrude_rate', 'htl_temp'] = dry_biomass * d_yield
+        partials['solid_waste_rate', 'biomass_rate'] = 0.15 * (1.0 - crude_yield_frac) * 0.6
+        partials['solid_waste_rate', 'htl_temp'] = -dry_biomass * d_yield * 0.6
+
+        cp_water = 4200.0
+        partials['htl_energy_required', 'biomass_rate'] = 0.85 * cp_water * (t_celsius - 25.0)
+        partials['htl_energy_required', 'htl_temp'] = biomass * 0.85 * cp_water
+
 
 # =============================================================================
 # EROI Calculator — The Systemic Objective Function
 # =============================================================================
-class EROICalculator(om.ExplicitComponent):
+class EROICalculator(VectorizedComponent):
     """
     Computes the Energy Return on Investment (EROI) for the entire
     Symbiotic Factory. EROI = Energy_Out / Energy_In.
     The optimization target is EROI > 3.5.
     """
 
+    ETHANOL_HHV = 29.7e6  # J/kg
+
     def setup(self):
         # Energy Outputs
         self.add_input('biocrude_rate', val=0.0, units='kg/s')
@@ -232,12 +367,14 @@ class EROICalculator(om.ExplicitComponent):
         # Output
         self.add_output('eroi', val=0.0, desc='Systemic EROI')
 
-    def compute(self, inputs, outputs):
-        ethanol_hhv = 29.7e6  # J/kg
+        self.declare_diagonal_partials('eroi', ['biocrude_rate', 'biocrude_hhv', 'ethanol_rate',
+                                                'syngas_energy', 'htl_energy_required',
+                                                'pump_power', 'led_power'])
 
+    def _energy_balance(self, inputs):
         energy_out = (
             inputs['biocrude_rate'] * inputs['biocrude_hhv'] +
-            inputs['ethanol_rate'] * ethanol_hhv +
+            inputs['ethanol_rate'] * self.ETHANOL_HHV +
             inputs['syngas_energy']
         )
 
@@ -246,40 +383,117 @@ class EROICalculator(om.ExplicitComponent):
             inputs['pump_power'] +
             inputs['led_power']
         )
+        return energy_out, energy_in
 
-        if energy_in > 0:
-            outputs['eroi'] = energy_out / energy_in
-        else:
-            outputs['eroi'] = 0.0
+    def compute(self, inputs, outputs):
+        energy_out, energy_in = self._energy_balance(inputs)
+
+        # EROI is defined as 0 for points with no energy investment
+        positive = energy_in > 0
+        safe_in = np.where(positive, energy_in, 1.0)
+        outputs['eroi'] = np.where(positive, energy_out / safe_in, 0.0)
+
+    def compute_partials(self, inputs, partials):
+        energy_out, energy_in = self._energy_balance(inputs)
+        positive = energy_in > 0
+        inv_in = np.where(positive, 1.0 / np.where(positive, energy_in, 1.0), 0.0)
+
+        partials['eroi', 'biocrude_rate'] = inputs['biocrude_hhv'] * inv_in
+        partials['eroi', 'biocrude_hhv'] = inputs['biocrude_rate'] * inv_in
+        partials['eroi', 'ethanol_rate'] = self.ETHANOL_HHV * inv_in
+        partials['eroi', 'syngas_energy'] = inv_in
+        d_in = -energy_out * inv_in**2
+        partials['eroi', 'htl_energy_required'] = d_in
+        partials['eroi', 'pump_power'] = d_in
+        partials['eroi', 'led_power'] = d_in
 
 
 # =============================================================================
 # MAIN: Build the MDO Problem & Run the Optimizer
 # =============================================================================
-def build_and_run():
-    prob = om.Problem()
-    model = prob.model
-
-    # --- Add Subsystems (The Four Elements) ---
-    model.add_subsystem('sun', SUNModule(), promotes=['*'])
-    model.add_subsystem('water', WATERModule(), promotes_inputs=['freshwater_rate'],
+def add_factory_subsystems(model, vec_size=1):
+    """Adds and connects the four modules and the EROI calculator to `model`."""
+    model.add_subsystem('sun', SUNModule(vec_size=vec_size), promotes=['*'])
+    model.add_subsystem('water', WATERModule(vec_size=vec_size),
+                         promotes_inputs=['freshwater_rate', 'co2_flow_rate', 'kla',
+                                          'led_frequency', 'reactor_volume'],
                          promotes_outputs=['biomass_rate', 'co2_absorbed', 'co2_exhaust'])
-    model.add_subsystem('fire', FIREModule(), promotes_inputs=['biomass_rate', 'co2_exhaust'],
+    model.add_subsystem('fire', FIREModule(vec_size=vec_size),
+                         promotes_inputs=['biomass_rate', 'co2_exhaust', 'htl_temp',
+                                          'htl_pressure', 'htl_hold_time'],
                          promotes_outputs=['biocrude_rate', 'biocrude_hhv', 'ethanol_rate',
                                            'solid_waste_rate', 'htl_energy_required'])
-    model.add_subsystem('terre', TERREModule(), promotes_inputs=['solid_waste_rate'],
+    model.add_subsystem('terre', TERREModule(vec_size=vec_size),
+                         promotes_inputs=['solid_waste_rate', 'pyrolysis_temp', 'hold_time'],
                          promotes_outputs=['biochar_rate', 'syngas_energy', 'oc_ratio'])
-    model.add_subsystem('eroi_calc', EROICalculator(),
+    model.add_subsystem('eroi_calc', EROICalculator(vec_size=vec_size),
                          promotes_inputs=['biocrude_rate', 'biocrude_hhv', 'ethanol_rate',
                                           'syngas_energy', 'htl_energy_required',
-                                          'sun_thermal_power'],
+                                          'sun_thermal_power', 'pump_power', 'led_power'],
                          promotes_outputs=['eroi'])
 
+
+# Operating point used by build_and_run (the component defaults elsewhere)
+NOMINAL_CONDITIONS = {
+    'solar_irradiance': 800.0,  # W/m² (typical mid-latitude)
+    'co2_flow_rate': 0.005,     # 5 g/s CO2 injection
+    'reactor_volume': 0.100,    # 100L photobioreactor
+}
+
+FACTORY_OUTPUTS = ['freshwater_rate', 'sun_thermal_power', 'biomass_rate', 'co2_absorbed',
+                   'co2_exhaust', 'biocrude_rate', 'biocrude_hhv', 'ethanol_rate',
+                   'solid_waste_rate', 'htl_energy_required', 'biochar_rate',
+                   'syngas_energy', 'oc_ratio', 'eroi']
+
+
+def evaluate_scenarios(**inputs):
+    """
+    Evaluates many operating points in a single vectorized run_model().
+
+    Keyword arguments are promoted input names (e.g. membrane_area=array,
+    htl_temp=array) given as arrays of a common length N or as scalars
+    broadcast to all points; unspecified inputs take NOMINAL_CONDITIONS or
+    the component defaults. Returns {output name: length-N array}.
+
+        evaluate_scenarios(solar_irradiance=np.linspace(200, 1000, 10_000))
+    """
+    values = {**NOMINAL_CONDITIONS, **inputs}
+    vec_size = max(np.size(v) for v in values.values())
+
+    prob = om.Problem(reports=False)
+    add_factory_subsystems(prob.model, vec_size=vec_size)
+    prob.setup(check=False)
+    for name, val in values.items():
+        prob.set_val(name, np.broadcast_to(val, (vec_size,)))
+    prob.run_model()
+
+    return {name: prob.get_val(name).copy() for name in FACTORY_OUTPUTS}
+
+
+# Design variables and their (lower, upper) bounds
+DESIGN_VARS = {
+    'membrane_area': (0.5, 10.0),
+    'led_frequency': (5.0, 100.0),
+    'htl_temp': (523.15, 623.15),        # 250°C - 350°C
+    'pyrolysis_temp': (673.15, 873.15),  # 400°C - 600°C
+}
+
+
+def build_problem(reports=None):
+    """
+    Assembles the four-module MDO problem with its design variables,
+    objective, constraint and SLSQP driver, set up at the nominal
+    operating point. Returns the om.Problem, ready for run_driver().
+    """
+    prob = om.Problem(reports=reports)
+    model = prob.model
+
+    # --- Add Subsystems (The Four Elements) ---
+    add_factory_subsystems(model)
+
     # --- Design Variables (What the optimizer can tweak) ---
-    model.add_design_var('membrane_area', lower=0.5, upper=10.0)
-    model.add_design_var('led_frequency', lower=5.0, upper=100.0)
-    model.add_design_var('htl_temp', lower=523.15, upper=623.15)  # 250°C - 350°C
-    model.add_design_var('pyrolysis_temp', lower=673.15, upper=873.15)  # 400°C - 600°C
+    for name, (lower, upper) in DESIGN_VARS.items():
+        model.add_design_var(name, lower=lower, upper=upper)
 
     # --- Objective: Maximize EROI ---
     model.add_objective('eroi', scaler=-1.0)  # Negative scaler for maximization
@@ -298,9 +512,214 @@ def build_and_run():
     prob.setup()
 
     # Set initial conditions
-    prob.set_val('solar_irradiance', 800.0)  # W/m² (typical mid-latitude)
-    prob.set_val('co2_flow_rate', 0.005)     # 5 g/s CO2 injection
-    prob.set_val('reactor_volume', 0.100)    # 100L photobioreactor
+    for name, val in NOMINAL_CONDITIONS.items():
+        prob.set_val(name, val)
+
+    return prob
+
+
+def check_partials(points=None, tol=1e-4):
+    """
+    Verifies every analytic partial against finite differences with
+    OpenMDAO's check_partials, at an interior operating point and at points
+    on the clipped yield / O:C branches (away from the kinks themselves,
+    where the one-sided slopes differ). Raises RuntimeError listing every
+    partial whose relative error reaches `tol`.
+
+    Returns the worst relative error found.
+    """
+    if points is None:
+        points = [
+            {'pyrolysis_temp': 723.15},                          # all branches interior
+            {'pyrolysis_temp': 873.15, 'htl_temp': 623.15},      # char yield & O:C clipped
+            {'htl_temp': 393.15, 'led_frequency': 5.0,           # crude yield clipped low
+             'pyrolysis_temp': 723.15},
+        ]
+
+    # All points go into one vectorized model, which also exercises the
+    # diagonal sparsity pattern with a different branch on each element.
+    vec_size = len(points)
+    prob = om.Problem(reports=False)
+    add_factory_subsystems(prob.model, vec_size=vec_size)
+    prob.setup(check=False)
+    for name, val in NOMINAL_CONDITIONS.items():
+        prob.set_val(name, np.full(vec_size, val))
+    for name in {name for point in points for name in point}:
+        current = prob.get_val(name).copy()
+        for i, point in enumerate(points):
+            current[i] = point.get(name, current[i])
+        prob.set_val(name, current)
+    prob.run_model()
+
+    data = prob.check_partials(out_stream=None, method='fd', form='central',
+                               step=1e-6, step_calc='rel_avg')
+    worst = 0.0
+    mismatches = []
+    for comp, comp_data in data.items():
+        for (of, wrt), err in comp_data.items():
+            fwd = np.asarray(err['J_fwd'])
+            fd = np.asarray(err['J_fd'])
+            scale = max(np.abs(fd).max(), 1e-12)
+            rel = np.abs(fwd - fd).max() / scale
+            worst = max(worst, rel)
+            if not rel < tol:
+                mismatches.append(f"{comp}: d{of}/d{wrt} (rel err {rel:.2e})")
+    if mismatches:
+        raise RuntimeError("Analytic partials disagree with finite differences: "
+                           + "; ".join(mismatches))
+    return worst
+
+
+# =============================================================================
+# Multi-Start Optimization from DOE Seeds
+# =============================================================================
+def doe_starts(n_starts=32, design='lhs', levels=3, seed=0):
+    """
+    Starting points for SLSQP over DESIGN_VARS, as an (n, 4) array.
+
+    design='lhs':       n_starts Latin-hypercube samples (seeded).
+    design='factorial': full factorial with `levels` evenly spaced levels per
+                        variable (levels**4 starts; n_starts is ignored).
+    """
+    lower, upper = np.array(list(DESIGN_VARS.values())).T
+    if design == 'lhs':
+        from scipy.stats import qmc
+        unit = qmc.LatinHypercube(d=len(DESIGN_VARS), seed=seed).random(n_starts)
+    elif design == 'factorial':
+        axes = [np.linspace(0.0, 1.0, levels)] * len(DESIGN_VARS)
+        unit = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, len(DESIGN_VARS))
+    else:
+        raise ValueError(f"Unknown DOE design '{design}' (use 'lhs' or 'factorial')")
+    return lower + unit * (upper - lower)
+
+
+def optimize_from(start):
+    """
+    Runs SLSQP once from `start` (a sequence ordered like DESIGN_VARS).
+    Module-level so that it can be dispatched to a process pool.
+    """
+    prob = build_problem(reports=False)
+    prob.driver.options['disp'] = False
+    for name, val in zip(DESIGN_VARS, start):
+        prob.set_val(name, val)
+    outcome = prob.run_driver()
+    # OpenMDAO < 3.31 returns a `failed` flag, later versions a DriverResult
+    success = getattr(outcome, 'success', not outcome)
+
+    # EROI and O:C gradients in the unit design box, for the KKT check
+    lower, upper = np.array(list(DESIGN_VARS.values())).T
+    totals = prob.compute_totals(of=['eroi', 'oc_ratio'], wrt=list(DESIGN_VARS))
+    gradient = np.array([totals['eroi', name][0, 0] for name in DESIGN_VARS]) * (upper - lower)
+    oc_gradient = np.array([totals['oc_ratio', name][0, 0] for name in DESIGN_VARS]) * (upper - lower)
+
+    design = np.array([prob.get_val(name)[0] for name in DESIGN_VARS])
+    unit = (design - lower) / (upper - lower)
+    eroi = float(prob.get_val('eroi')[0])
+    oc = float(prob.get_val('oc_ratio')[0])
+    return {
+        'start': np.asarray(start, dtype=float),
+        'design': design,
+        'unit_design': unit,
+        'eroi': eroi,
+        'oc_ratio': oc,
+        'gradient': gradient,
+        'kkt_residual': kkt_residual(unit, gradient, oc, oc_gradient) / max(abs(eroi), 1.0),
+        'success': bool(success),
+        'feasible': oc <= 0.2 + 1e-6,
+    }
+
+
+def kkt_residual(unit, gradient, oc, oc_gradient, active_tol=1e-6):
+    """
+    Norm of the projected EROI gradient at a design (all in the unit design
+    box): the O:C constraint's contribution is removed with a non-negative
+    multiplier when it is active, then components pushing out through an
+    active bound are zeroed. Zero at a KKT point of the maximization.
+    """
+    residual = np.array(gradient, dtype=float)
+    if oc >= 0.2 - active_tol and oc_gradient @ oc_gradient > 0.0:
+        multiplier = max(residual @ oc_gradient / (oc_gradient @ oc_gradient), 0.0)
+        residual -= multiplier * oc_gradient
+    residual[(unit <= active_tol) & (residual < 0.0)] = 0.0
+    residual[(unit >= 1.0 - active_tol) & (residual > 0.0)] = 0.0
+    return float(np.linalg.norm(residual))
+
+
+def is_converged(run, gtol=1e-6):
+    """SLSQP success, feasible, and a relative KKT residual below gtol."""
+    return run['success'] and run['feasible'] and run['kkt_residual'] <= gtol
+
+
+def distinct_optima(runs, xtol=0.05, etol=1e-4, gtol=1e-6):
+    """
+    Groups converged runs (is_converged) into distinct local optima,
+    best-first.
+
+    SLSQP reports success on the nearly flat pyrolysis-temperature direction
+    well before the optimum, so runs failing the KKT check are dropped
+    rather than counted as optima. Two converged runs are one optimum when
+    their EROI agree within a relative `etol` and their unit-box designs
+    agree within `xtol` in every variable EROI is sensitive to (relative
+    gradient above gtol) at either run; the variables it is flat in
+    (membrane_area, pyrolysis_temp once the char yield clips) span a
+    plateau, not separate optima. Each optimum keeps the design of its best
+    run, the number of starts that reached it and the per-variable design
+    spread across those starts.
+    """
+    optima = []
+    for run in sorted(runs, key=lambda r: -r['eroi']):
+        if not is_converged(run, gtol):
+            continue
+        for opt in optima:
+            scale = max(abs(opt['eroi']), 1.0)
+            sensitive = (np.abs(run['gradient']) > gtol * scale) | (np.abs(opt['gradient']) > gtol * scale)
+            if (abs(run['eroi'] - opt['eroi']) <= etol * scale
+                    and np.all(np.abs(run['unit_design'] - opt['unit_design'])[sensitive] <= xtol)):
+                opt['hits'] += 1
+                opt['spread'] = np.maximum(opt['spread'],
+                                           np.abs(run['design'] - opt['design']))
+                break
+        else:
+            optima.append({**run, 'hits': 1, 'spread': np.zeros_like(run['design'])})
+    return optima
+
+
+def run_multistart(n_starts=32, design='lhs', levels=3, seed=0, jobs=None,
+                   xtol=0.05, etol=1e-4, gtol=1e-6):
+    """
+    Seeds SLSQP from a DOE over the design variables, runs the starts across
+    a pool of `jobs` processes (default: all cores) and reports the best and
+    all distinct local optima (see distinct_optima for the tolerances).
+
+    Returns {'best': optimum or None, 'optima': [...], 'runs': [...]}.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    starts = doe_starts(n_starts, design=design, levels=levels, seed=seed)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        runs = list(pool.map(optimize_from, starts))
+
+    optima = distinct_optima(runs, xtol=xtol, etol=etol, gtol=gtol)
+
+    print("=" * 70)
+    print("  SYMBIOTIC FACTORY DIGITAL TWIN — Multi-Start MDO")
+    print("=" * 70)
+    print(f"  DOE:                     {design} ({len(starts)} starts)")
+    print(f"  SLSQP success, feasible: {sum(r['success'] and r['feasible'] for r in runs)}")
+    print(f"  Converged (KKT ≤ {gtol:.0e}):  {sum(is_converged(r, gtol) for r in runs)}")
+    print(f"  Distinct local optima:   {len(optima)}")
+    for rank, opt in enumerate(optima, 1):
+        area, freq, t_htl, t_pyro = opt['design']
+        print(f"  #{rank:<2d} EROI {opt['eroi']:9.4f} | A {area:5.2f} m² | LED {freq:5.1f} Hz | "
+              f"HTL {t_htl - 273.15:5.1f} °C | Pyro {t_pyro - 273.15:5.1f} °C | "
+              f"{opt['hits']} start(s)")
+    print("=" * 70)
+
+    return {'best': optima[0] if optima else None, 'optima': optima, 'runs': runs}
+
+
+def build_and_run():
+    prob = build_problem()
 
     print("=" * 70)
     print("  SYMBIOTIC FACTORY DIGITAL TWIN — NASA OpenMDAO MDO")
@@ -335,4 +754,12 @@ def build_and_run():
 
 
 if __name__ == '__main__':
-    build_and_run()
+    if '--check-partials' in sys.argv:
+        print(f"Analytic partials OK (worst relative error {check_partials():.2e})")
+    elif '--multistart' in sys.argv:
+        run_multistart(n_starts=cli_option('--multistart', 32),
+                       design=cli_option('--design', 'lhs'),
+                       levels=cli_option('--levels', 3),
+                       jobs=cli_option('--jobs', 0) or None)
+    else:
+        build_and_run()
@@ -0,0 +1,364 @@
+"""
+Symbiotic Factory — Plant-Wide Heat Integration (Pinch Analysis)
+=================================================================
+Module: 00_Orchestrator / heat_integration.py
+License: GNU GPLv3
+
+The master flowsheet (idaes_master_flowsheet.py) charges the full sensible
+heat of the HTL slurry and the pyrolysis demand as purchased energy: the
+economizer, the hot TERRE vapours and the SUN condenser never meet the cold
+streams. This module collects the hot and cold streams of the converged
+units and applies pinch analysis to every operating point at once:
+
+  1. Stream table   T_supply, T_target, CP of each process stream
+                    (STREAM_DTYPE, one row per operating point)
+  2. Problem table  shifted-temperature intervals and heat cascade
+                    → minimum hot/cold utility and pinch temperature
+  3. Network        heat-load allocation down the cascade: each interval's
+                    demand is drawn proportionally from the heat available
+                    there (own interval plus what cascades from above), so
+                    every match respects ΔT_min by construction
+  4. EROI           thermal demand replaced by the hot-utility target,
+                    covered first by burning the TERRE syngas
+
+Streams are fixed per position (hot or cold by their supply/target order),
+so the whole problem is a few (points × intervals × streams) array passes.
+
+Usage:
+    python heat_integration.py [--points N] [--dtmin K]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from idaes_master_flowsheet import ALGAE_COMPOSITION, solve_flowsheet
+from cli_options import cli_option
+
+
+STREAM_DTYPE = np.dtype([('T_supply', 'f8'), ('T_target', 'f8'), ('CP_W_K', 'f8')])
+
+STREAM_NAMES = ('FIRE slurry feed', 'TERRE pyrolysis', 'FIRE HTL effluent',
+                'TERRE hot vapours', 'SUN condenser')
+
+WATER_CP = 4200.0             # J/(kg·K), as in FIREBiorefinery.energy_in_W
+VAPOUR_CP = 1800.0            # J/(kg·K), pyrolysis vapours + condensables
+EFFLUENT_TARGET_C = 40.0      # products leave the plant cooled
+PYROLYSIS_WINDOW_K = 200.0    # devolatilization span below the kiln setpoint
+CONDENSER_TEMP_C = 45.0       # SUN distillate condensation
+LATENT_HEAT = 2.39e6          # J/kg at the condenser temperature
+BURNER_EFFICIENCY = 0.85      # syngas → process heat
+# Default approach: an equal-CP economizer at the 85 % recovery target of
+# heat_exchanger_model.py closes to 0.15 × 275 K ≈ 40 K
+DEFAULT_DT_MIN = 40.0
+
+
+# =============================================================================
+# 1. Stream Table from the Flowsheet Units
+# =============================================================================
+def flowsheet_streams(units):
+    """
+    Hot and cold process streams of a converged flowsheet (the units
+    returned by solve_flowsheet). Returns a STREAM_DTYPE array of shape
+    (points, len(STREAM_NAMES)); with no integration the cold-stream duties
+    equal FIRE.energy_in_W + TERRE.energy_in_W.
+    """
+    sun, _, fire, terre = units
+    n_points = fire.n_points
+    wet = fire.mass_in['wet_biomass']
+    water_cp = wet * ALGAE_COMPOSITION['moisture'] * WATER_CP
+    feed_T = np.broadcast_to(fire.feed_temp, n_points)
+    htl_T = np.broadcast_to(fire.htl_temp, n_points)
+    pyro_T = np.broadcast_to(terre.pyro_temp, n_points)
+
+    streams = np.empty((n_points, len(STREAM_NAMES)), dtype=STREAM_DTYPE)
+    rows = (
+        (feed_T, htl_T, water_cp),
+        (pyro_T - PYROLYSIS_WINDOW_K, pyro_T, terre.energy_in_W / PYROLYSIS_WINDOW_K),
+        (htl_T, np.full(n_points, EFFLUENT_TARGET_C), water_cp),
+        (pyro_T, np.full(n_points, EFFLUENT_TARGET_C), terre.mass_out['syngas'] * VAPOUR_CP),
+        (np.full(n_points, CONDENSER_TEMP_C), np.full(n_points, CONDENSER_TEMP_C - 1.0),
+         sun.mass_out['freshwater'] * LATENT_HEAT),
+    )
+    for s, (T_supply, T_target, CP) in enumerate(rows):
+        streams['T_supply'][:, s] = T_supply
+        streams['T_target'][:, s] = T_target
+        streams['CP_W_K'][:, s] = CP
+    return streams
+
+
+# =============================================================================
+# 2. Problem Table Algorithm (vectorized over operating points)
+# =============================================================================
+def problem_table(streams, dT_min=DEFAULT_DT_MIN):
+    """
+    Minimum-utility targets of a batch of stream tables (points, streams).
+
+    dT_min may be a scalar or one value per point. Hot streams are shifted
+    down and cold streams up by dT_min/2; the sorted shifted temperatures
+    bound the intervals of the heat cascade.
+
+    Returns a dict with 'Q_H_min_W', 'Q_C_min_W', 'recovered_W', the shifted
+    pinch 'pinch_C' and its hot/cold stream temperatures 'pinch_hot_C' /
+    'pinch_cold_C' (NaN for threshold problems), and the cascade data used
+    by synthesize_network:
+    'boundaries_C' (points, K+1), 'heat_flow_W' (points, K+1), 'hot_duty_W'
+    and 'cold_duty_W' (points, K, streams), 'hot' (points, streams), 'dT_min'.
+    """
+    T_s, T_t, CP = streams['T_supply'], streams['T_target'], streams['CP_W_K']
+    half = np.broadcast_to(np.asarray(dT_min, dtype=float), T_s.shape[:1])[:, None] / 2
+    hot = T_s > T_t
+    shift = np.where(hot, -half, half)
+    lo = np.minimum(T_s, T_t) + shift
+    hi = np.maximum(T_s, T_t) + shift
+
+    boundaries = -np.sort(-np.concatenate([lo, hi], axis=1), axis=1)   # descending
+    upper, lower = boundaries[:, :-1, None], boundaries[:, 1:, None]
+    overlap = np.clip(np.minimum(hi[:, None, :], upper) - np.maximum(lo[:, None, :], lower),
+                      0.0, None)
+    duty = overlap * CP[:, None, :]
+    hot_duty = np.where(hot[:, None, :], duty, 0.0)
+    cold_duty = duty - hot_duty
+
+    cascade = np.cumsum(hot_duty.sum(axis=2) - cold_duty.sum(axis=2), axis=1)
+    Q_H = np.maximum(0.0, -cascade.min(axis=1))
+    heat_flow = np.concatenate([Q_H[:, None], Q_H[:, None] + cascade], axis=1)
+    Q_C = heat_flow[:, -1]
+
+    threshold = (Q_H <= 0.0) | (Q_C <= 1e-9 * (Q_H + 1.0))
+    pinch = np.take_along_axis(boundaries, np.argmin(heat_flow, axis=1)[:, None], 1)[:, 0]
+    pinch = np.where(threshold, np.nan, pinch)
+    return {
+        'Q_H_min_W': Q_H,
+        'Q_C_min_W': Q_C,
+        'recovered_W': cold_duty.sum(axis=(1, 2)) - Q_H,
+        'pinch_C': pinch,
+        'pinch_hot_C': pinch + half[:, 0],
+        'pinch_cold_C': pinch - half[:, 0],
+        'boundaries_C': boundaries,
+        'heat_flow_W': heat_flow,
+        'hot_duty_W': hot_duty,
+        'cold_duty_W': cold_duty,
+        'hot': hot,
+        'dT_min': 2 * half[:, 0],
+    }
+
+
+# =============================================================================
+# 3. Heat-Exchanger Network Synthesis
+# =============================================================================
+def synthesize_network(targets, tol=1e-6):
+    """
+    Heat-load distribution of a maximum-energy-recovery network.
+
+    The hot utility enters at the top of the cascade. Walking down the
+    intervals, the heat available in an interval (carried from above, per
+    source, plus the hot streams' own duty there) is split over the cold
+    streams of that interval in proportion to source and demand; the
+    remainder cascades on and what reaches the bottom goes to cold utility.
+    Heat only ever moves to lower shifted temperatures, so every match keeps
+    ΔT ≥ ΔT_min.
+
+    Returns a dict with 'matches_W' (points, S+1, S+1): rows are the hot
+    sources (index S = hot utility), columns the cold sinks (index S = cold
+    utility); 'n_units' (non-zero matches) and 'n_units_min' (Euler target
+    above plus below the pinch).
+    """
+    hot_duty, cold_duty = targets['hot_duty_W'], targets['cold_duty_W']
+    n_points, n_intervals, n_streams = hot_duty.shape
+    matches = np.zeros((n_points, n_streams + 1, n_streams + 1))
+    carried = np.zeros((n_points, n_streams + 1))
+    carried[:, -1] = targets['Q_H_min_W']
+
+    for k in range(n_intervals):
+        available = carried.copy()
+        available[:, :-1] += hot_duty[:, k]
+        total = available.sum(axis=1, keepdims=True)
+        demand = cold_duty[:, k]
+        share = np.divide(available, total, out=np.zeros_like(available), where=total > 0)
+        matches[:, :, :-1] += share[:, :, None] * demand[:, None, :]
+        carried = available - share * demand.sum(axis=1, keepdims=True)
+    matches[:, :, -1] = np.maximum(carried, 0.0)
+
+    # Euler minimum units on each side of the pinch (MER design)
+    scale = tol * (np.abs(hot_duty).sum(axis=(1, 2)) + targets['Q_H_min_W'] + 1.0)
+    k_pinch = np.argmin(targets['heat_flow_W'], axis=1)
+    above = np.arange(n_intervals)[None, :] < k_pinch[:, None]
+    duty = hot_duty + cold_duty
+
+    def present(mask):
+        return (np.einsum('pk,pks->ps', mask.astype(float), duty) > scale[:, None]).sum(axis=1)
+
+    n_above = present(above) + (targets['Q_H_min_W'] > scale)
+    n_below = present(~above) + (targets['Q_C_min_W'] > scale)
+    return {
+        'matches_W': matches,
+        'n_units': (matches > scale[:, None, None]).sum(axis=(1, 2)),
+        'n_units_min': np.maximum(n_above - 1, 0) + np.maximum(n_below - 1, 0),
+    }
+
+
+# =============================================================================
+# 4. Integrated Flowsheet and EROI
+# =============================================================================
+def integrate_flowsheet(dT_min=DEFAULT_DT_MIN, burner_efficiency=BURNER_EFFICIENCY,
+                        **flowsheet_args):
+    """
+    Solves the master flowsheet (flowsheet_args go to solve_flowsheet),
+    targets its heat recovery and re-evaluates the EROI with the thermal
+    demand replaced by the hot-utility target. Syngas is burned for the
+    hot utility first; only the shortfall is purchased.
+
+    Returns (units, summary, targets, network); summary holds 'eroi' and
+    'eroi_integrated' plus the utility split per point.
+    """
+    units, summary, _ = solve_flowsheet(**flowsheet_args)
+    sun, water, fire, terre = units
+    streams = flowsheet_streams(units)
+    targets = problem_table(streams, dT_min)
+    network = synthesize_network(targets)
+
+    Q_H = targets['Q_H_min_W']
+    syngas_heat = terre.energy_out_W * burner_efficiency
+    from_syngas = np.minimum(Q_H, syngas_heat)
+    purchased = Q_H - from_syngas
+    # Same totals as the flowsheet EROI; only the FIRE/TERRE thermal inputs
+    # are swapped for purchased heat and the burned syngas leaves the output
+    thermal_demand = fire.energy_in_W + terre.energy_in_W
+    energy_in = sum(u.energy_in_W for u in units) - thermal_demand + purchased
+    energy_out = sum(u.energy_out_W for u in units) - from_syngas / burner_efficiency
+
+    summary = dict(summary)
+    summary.update({
+        'eroi_integrated': np.divide(energy_out, energy_in, out=np.zeros_like(energy_out),
+                                     where=energy_in > 0),
+        'thermal_demand_W': thermal_demand,
+        'hot_utility_W': Q_H,
+        'syngas_to_utility_W': from_syngas,
+        'purchased_heat_W': purchased,
+        'cold_utility_W': targets['Q_C_min_W'],
+    })
+    return units, summary, targets, network
+
+
+# =============================================================================
+# 5. Report
+# =============================================================================
+def _composite_curves(targets, point=0):
+    """(H, T) of the hot and cold composites and the grand composite of one point."""
+    B = targets['boundaries_C'][point]
+    half = targets['dT_min'][point] / 2
+    hot = np.concatenate([[0.0], np.cumsum(targets['hot_duty_W'][point].sum(axis=1)[::-1])])
+    cold = np.concatenate([[0.0], np.cumsum(targets['cold_duty_W'][point].sum(axis=1)[::-1])])
+
+    def active(H):
+        """Slice dropping the zero-duty ends of a composite."""
+        changes = np.nonzero(np.diff(H) > 0)[0]
+        return slice(changes[0], changes[-1] + 2) if changes.size else slice(0, 0)
+
+    h, c = active(hot), active(cold)
+    return ((hot[h], (B[::-1] + half)[h]),
+            (cold[c] + targets['Q_C_min_W'][point], (B[::-1] - half)[c]),
+            (targets['heat_flow_W'][point], B))
+
+
+def run_heat_integration(n_points=100_000, dT_min=DEFAULT_DT_MIN, seed=0):
+    """
+    Targets the nominal flowsheet (network and composite curves), then a
+    random batch of operating points, and reports the EROI with and without
+    heat integration.
+    """
+    units, nominal, targets, network = integrate_flowsheet(dT_min=dT_min)
+
+    rng = np.random.default_rng(seed)
+    batch = dict(htl_temp_C=rng.uniform(250.0, 350.0, n_points),
+                 pyro_temp_C=rng.uniform(400.0, 700.0, n_points),
+                 co2_rate_kg_s=rng.uniform(0.001, 0.01, n_points),
+                 ghi_W_m2=rng.uniform(200.0, 1000.0, n_points))
+    start = time.perf_counter()
+    _, summary, batch_targets, batch_network = integrate_flowsheet(dT_min=dT_min, **batch)
+    batch_s = time.perf_counter() - start
+
+    dT_sweep = np.linspace(5.0, 100.0, 96)
+    _, sweep, _, _ = integrate_flowsheet(dT_min=dT_sweep,
+                                         co2_rate_kg_s=np.full(dT_sweep.size, 0.005))
+
+    m = network['matches_W'][0]
+    names = STREAM_NAMES + ('cold utility',)
+    print("=" * 70)
+    print("  SYMBIOTIC FACTORY — PLANT-WIDE HEAT INTEGRATION (PINCH)")
+    print("=" * 70)
+    print(f"  ΔT_min:                 {dT_min:g} K")
+    print(f"  Thermal demand (no HI): {nominal['thermal_demand_W'][0] / 1e3:.2f} kW")
+    print(f"  Minimum hot utility:    {targets['Q_H_min_W'][0] / 1e3:.2f} kW "
+          f"({nominal['syngas_to_utility_W'][0] / 1e3:.2f} kW from syngas)")
+    print(f"  Minimum cold utility:   {targets['Q_C_min_W'][0] / 1e3:.2f} kW")
+    print(f"  Heat recovered:         {targets['recovered_W'][0] / 1e3:.2f} kW")
+    print(f"  Pinch:                  {targets['pinch_hot_C'][0]:.0f} °C hot / "
+          f"{targets['pinch_cold_C'][0]:.0f} °C cold")
+    print(f"  Exchangers:             {network['n_units'][0]} "
+          f"(Euler MER target {network['n_units_min'][0]})")
+    print(f"\n  {'Match (hot → cold)':44s} {'Duty (kW)':>10s}")
+    for i, j in zip(*np.nonzero(m > 1e-6 * m.sum())):
+        source = 'hot utility' if i == len(STREAM_NAMES) else names[i]
+        print(f"  {source + ' → ' + names[j]:44s} {m[i, j] / 1e3:10.3f}")
+    print(f"\n  EROI nominal:           {nominal['eroi'][0]:.2f} → "
+          f"{nominal['eroi_integrated'][0]:.2f} with heat integration")
+    print(f"\n  Batch:                  {n_points:,} operating points in {batch_s:.2f} s")
+    print(f"  EROI gate pass rate:    {np.mean(summary['eroi'] > 3.5) * 100:.1f}% → "
+          f"{np.mean(summary['eroi_integrated'] > 3.5) * 100:.1f}%")
+    gain = np.median(summary['eroi_integrated'] / summary['eroi'])
+    print(f"  Median EROI gain:       ×{gain:.1f}")
+    print(f"  Syngas covers utility:  "
+          f"{np.mean(summary['purchased_heat_W'] <= 0) * 100:.1f}% of points")
+    print("=" * 70)
+
+    fig, axes = plt.subplots(1, 3, figsize=(20, 5))
+    fig.suptitle('Symbiotic Factory — Plant-Wide Heat Integration',
+                 fontsize=14, fontweight='bold')
+    (Hh, Th), (Hc, Tc), (Hg, Tg) = _composite_curves(targets)
+    axes[0].plot(Hh / 1e3, Th, 'r-', linewidth=2, label='Hot composite')
+    axes[0].plot(Hc / 1e3, Tc, 'b-', linewidth=2, label='Cold composite')
+    axes[0].axhline(y=targets['pinch_hot_C'][0], color='k', linestyle=':', alpha=0.6,
+                    label='Pinch (hot side)')
+    axes[0].set_xlabel('Enthalpy (kW)')
+    axes[0].set_ylabel('Temperature (°C)')
+    axes[0].set_title(f'Composite Curves (ΔT_min = {dT_min:g} K)')
+    axes[0].legend()
+    axes[0].grid(True, alpha=0.3)
+
+    axes[1].plot(Hg / 1e3, Tg, 'g-', linewidth=2)
+    axes[1].set_xlabel('Net heat flow (kW)')
+    axes[1].set_ylabel('Shifted temperature (°C)')
+    axes[1].set_title('Grand Composite Curve')
+    axes[1].grid(True, alpha=0.3)
+
+    axes[2].plot(dT_sweep, sweep['eroi_integrated'], 'm-', linewidth=2, label='Heat-integrated')
+    axes[2].axhline(y=sweep['eroi'][0], color='gray', linestyle='--', label='No integration')
+    axes[2].axhline(y=3.5, color='g', linestyle=':', alpha=0.7, label='EROI gate (3.5)')
+    axes[2].set_xlabel('ΔT_min (K)')
+    axes[2].set_ylabel('Systemic EROI')
+    axes[2].set_yscale('log')
+    axes[2].set_title('EROI vs. Minimum Approach Temperature')
+    axes[2].legend()
+    axes[2].grid(True, alpha=0.3, which='both')
+
+    plt.tight_layout()
+    plt.savefig('heat_integration_report.png', dpi=150)
+    plt.close(fig)
+    print(f"\n  📊 Report saved to: heat_integration_report.png")
+
+    return {'nominal': nominal, 'batch': summary, 'targets': batch_targets,
+            'network': batch_network}
+
+
+if __name__ == '__main__':
+    run_heat_integration(n_points=cli_option('--points', 100_000),
+                         dT_min=cli_option('--dtmin', DEFAULT_DT_MIN))
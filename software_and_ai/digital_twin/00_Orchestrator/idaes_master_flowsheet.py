@@ -8,9 +8,25 @@ Builds a complete mass & energy balance flowsheet for the WEFC loop using
 the DOE's IDAES-PSE framework (built on Pyomo). Tracks every molecule of
 recycled Nitrogen, Phosphorus, and Carbon across all four modules.
 
-Usage: python idaes_master_flowsheet.py
+The unit blocks are structure-of-arrays: every operating parameter may be a
+scalar or a 1-D array of operating points, and each compute() fills
+preallocated per-stream arrays, so one call balances the loop for a million
+scenarios as cheaply as for one.
+
+The recycle loop (TEAR_STREAMS) returns the FIRE aqueous-phase N and P to
+WATER and the TERRE biochar to the SUN membrane. With the default inputs,
+namely unlimited fertilizer makeup and the membrane placeholders off, no
+recycle is active: growth does not depend on the recycled nutrients and the
+loop converges in a single pass. The recycle only feeds back with finite N/P
+makeup (the nutrient-limited case of the runner and --recycle-benchmark) or
+a nonzero SUN.membrane_char_demand.
+
+Usage: python idaes_master_flowsheet.py [--recycle-benchmark]
 """
 
+import sys
+import time
+
 import numpy as np
 
 
@@ -26,22 +42,77 @@ BIOCRUDE_COMPOSITION = {
     'C': 0.73, 'H': 0.09, 'O': 0.12, 'N': 0.05, 'S': 0.01
 }
 
+# HTL aqueous phase (dissolved organics + recoverable nutrients)
+AQUEOUS_PHASE_COMPOSITION = {
+    'C': 0.35, 'H': 0.07, 'O': 0.49, 'N': 0.06, 'P': 0.03
+}
+
+# Algal HTL hydrochar: ash- and phosphorus-rich
+HYDROCHAR_COMPOSITION = {
+    'C': 0.42, 'H': 0.05, 'O': 0.18, 'N': 0.03, 'P': 0.06, 'S': 0.01, 'Ash': 0.25
+}
+
+# PAC biochar from hydrochar pyrolysis
+BIOCHAR_COMPOSITION = {
+    'C': 0.60, 'H': 0.02, 'O': 0.06, 'N': 0.02, 'P': 0.08, 'S': 0.01, 'Ash': 0.21
+}
+
+
+def batch_size(*values):
+    """Number of operating points described by scalars and/or 1-D arrays."""
+    shape = np.broadcast_shapes(*(np.shape(v) for v in values))
+    if len(shape) > 1:
+        raise ValueError(f"Operating points must be scalars or 1-D arrays, got shape {shape}")
+    return shape[0] if shape else 1
+
 
 # =============================================================================
 # Unit Operations — Each Module as a Mass/Energy Balance Block
 # =============================================================================
 class UnitBlock:
-    """Base class for mass/energy balance tracking."""
+    """
+    Base class for mass/energy balance tracking.
+
+    mass_in / mass_out map each stream name (STREAMS_IN / STREAMS_OUT) to an
+    array with one entry per operating point; energy_in_W / energy_out_W are
+    arrays too. They are allocated once per batch size and overwritten in
+    place by compute().
+    """
+    STREAMS_IN = ()
+    STREAMS_OUT = ()
+
     def __init__(self, name):
         self.name = name
+        self.n_points = 0
         self.mass_in = {}
         self.mass_out = {}
-        self.energy_in_W = 0.0
-        self.energy_out_W = 0.0
+        self.energy_in_W = np.zeros(0)
+        self.energy_out_W = np.zeros(0)
+
+    def allocate(self, n_points):
+        """Preallocates the stream arrays for a batch of n_points (no-op if unchanged)."""
+        if n_points != self.n_points:
+            self.n_points = n_points
+            self.mass_in = {k: np.zeros(n_points) for k in self.STREAMS_IN}
+            self.mass_out = {k: np.zeros(n_points) for k in self.STREAMS_OUT}
+            self.energy_in_W = np.zeros(n_points)
+            self.energy_out_W = np.zeros(n_points)
 
 
 class SUNEvaporator(UnitBlock):
-    """Module I: Solar evaporation of saltwater → freshwater."""
+    """
+    Module I: Solar evaporation of saltwater → freshwater.
+
+    PLACEHOLDER ASSUMPTIONS: membrane_char_demand (PAC biochar membrane
+    wear, kg/s per m²) and fouling_loss (fraction of the LSPR efficiency
+    lost when the membrane is not replenished) are not taken from SUN
+    measurements. Both default to 0, which disables the membrane makeup
+    drawn from the TERRE biochar recycle and leaves the nominal balance
+    unchanged; set them through `coefficients` (e.g. ~2e-7 kg/(s·m²),
+    i.e. ~0.5 kg/m² per month, and 0.15) to study the coupling.
+    """
+    STREAMS_IN = ('saltwater', 'biochar_makeup')
+    STREAMS_OUT = ('freshwater', 'brine_reject', 'spent_membrane')
 
     def __init__(self, membrane_area_m2=1.0, ghi_W_m2=800.0):
         super().__init__("SUN")
@@ -49,187 +120,425 @@ class SUNEvaporator(UnitBlock):
         self.ghi = ghi_W_m2
         self.lspr_efficiency = 0.92
         self.h_vap_eff = 1250e3  # J/kg (nanoconfined)
-
-    def compute(self):
-        q_abs = self.ghi * self.membrane_area * self.lspr_efficiency
-        self.energy_in_W = self.ghi * self.membrane_area
-        freshwater_rate = q_abs / self.h_vap_eff  # kg/s
-        salt_reject = freshwater_rate * 0.035  # 3.5% salinity input
-
-        self.mass_in = {'saltwater': freshwater_rate / 0.965}
-        self.mass_out = {
-            'freshwater': freshwater_rate,
-            'brine_reject': salt_reject
-        }
-        self.energy_out_W = q_abs
+        # Placeholders (see class docstring): membrane wear and the LSPR
+        # efficiency lost when it is not replenished; off by default.
+        self.membrane_char_demand = 0.0  # kg/s per m²
+        self.fouling_loss = 0.0
+
+    def compute(self, biochar_supply_kg_s=0.0):
+        self.allocate(batch_size(self.ghi, self.membrane_area, self.lspr_efficiency,
+                                 self.h_vap_eff, biochar_supply_kg_s,
+                                 self.membrane_char_demand, self.fouling_loss))
+        freshwater_rate = self.mass_out['freshwater']
+        char_in = self.mass_in['biochar_makeup']
+
+        # Membrane replenishment from recycled TERRE biochar
+        char_demand = self.membrane_char_demand * self.membrane_area
+        char_in[:] = np.minimum(biochar_supply_kg_s, char_demand)
+        self.mass_out['spent_membrane'][:] = char_in  # worn membrane is discarded
+        replenished = np.divide(char_in, char_demand, out=np.ones(self.n_points),
+                                where=char_demand > 0)
+        efficiency = self.lspr_efficiency * (1.0 - self.fouling_loss * (1.0 - replenished))
+
+        self.energy_in_W[:] = self.ghi * self.membrane_area
+        self.energy_out_W[:] = self.energy_in_W * efficiency  # q_abs
+        freshwater_rate[:] = self.energy_out_W / self.h_vap_eff  # kg/s
+        self.mass_out['brine_reject'][:] = freshwater_rate * 0.035  # 3.5% salinity input
+        self.mass_in['saltwater'][:] = freshwater_rate / 0.965
         return freshwater_rate
 
 
 class WATERCycloreactor(UnitBlock):
-    """Module II: CO2 + Freshwater + Light → Algal Biomass."""
-
-    def __init__(self, volume_m3=0.1, co2_rate_kg_s=0.005):
+    """
+    Module II: CO2 + Freshwater + Light → Algal Biomass.
+
+    Growth is capped by the N and P available: external makeup (fertilizer,
+    unlimited by default) plus the nutrients recycled from the FIRE aqueous
+    phase. N_nutrient / P_nutrient are the makeup actually consumed.
+    aqueous_recycle is bookkeeping only (the carrier of the recycled N and P
+    for the element balance); solve_flowsheet fills it once the loop has
+    converged.
+    """
+    STREAMS_IN = ('freshwater', 'CO2', 'N_nutrient', 'P_nutrient',
+                  'N_recycle', 'P_recycle', 'aqueous_recycle')
+    STREAMS_OUT = ('wet_biomass', 'CO2_exhaust')
+
+    # Nutrient demand (Redfield ratio: C:N:P = 106:16:1)
+    N_PER_CO2 = (14.0 * 16) / (12.0 * 106)  # kg N per kg CO2
+    P_PER_CO2 = (31.0 * 1) / (12.0 * 106)
+
+    def __init__(self, volume_m3=0.1, co2_rate_kg_s=0.005,
+                 n_makeup_kg_s=np.inf, p_makeup_kg_s=np.inf):
         super().__init__("WATER")
         self.volume = volume_m3
         self.co2_rate = co2_rate_kg_s
+        self.n_makeup = n_makeup_kg_s
+        self.p_makeup = p_makeup_kg_s
         self.kla = 0.05  # 1/s
         self.fixation_eff = 0.70
 
-    def compute(self, freshwater_rate_kg_s):
-        co2_fixed = self.co2_rate * self.fixation_eff
-        co2_exhaust = self.co2_rate - co2_fixed
-        biomass_wet = co2_fixed * 1.8 / (1.0 - ALGAE_COMPOSITION['moisture'])
-
-        # Nutrient demand (Redfield ratio: C:N:P = 106:16:1)
-        n_demand = co2_fixed * (14.0 * 16) / (12.0 * 106)  # kg N per kg CO2
-        p_demand = co2_fixed * (31.0 * 1) / (12.0 * 106)
-
-        self.mass_in = {
-            'freshwater': freshwater_rate_kg_s,
-            'CO2': self.co2_rate,
-            'N_nutrient': n_demand,
-            'P_nutrient': p_demand
-        }
-        self.mass_out = {
-            'wet_biomass': biomass_wet,
-            'CO2_exhaust': co2_exhaust
-        }
+    def compute(self, freshwater_rate_kg_s, n_recycle_kg_s=0.0, p_recycle_kg_s=0.0):
+        self.allocate(batch_size(freshwater_rate_kg_s, self.co2_rate, self.fixation_eff,
+                                 self.n_makeup, self.p_makeup, n_recycle_kg_s,
+                                 p_recycle_kg_s))
+        biomass_wet = self.mass_out['wet_biomass']
+        co2_exhaust = self.mass_out['CO2_exhaust']
+
+        n_available = self.n_makeup + n_recycle_kg_s
+        p_available = self.p_makeup + p_recycle_kg_s
+        co2_fixed = np.minimum(self.co2_rate * self.fixation_eff,
+                               np.minimum(n_available / self.N_PER_CO2,
+                                          p_available / self.P_PER_CO2))
+        co2_exhaust[:] = self.co2_rate - co2_fixed
+        biomass_wet[:] = co2_fixed * 1.8 / (1.0 - ALGAE_COMPOSITION['moisture'])
+
+        n_demand = co2_fixed * self.N_PER_CO2
+        p_demand = co2_fixed * self.P_PER_CO2
+        self.mass_in['N_recycle'][:] = n_recycle_kg_s
+        self.mass_in['P_recycle'][:] = p_recycle_kg_s
+        self.mass_in['N_nutrient'][:] = np.maximum(n_demand - n_recycle_kg_s, 0.0)
+        self.mass_in['P_nutrient'][:] = np.maximum(p_demand - p_recycle_kg_s, 0.0)
+        self.mass_in['freshwater'][:] = freshwater_rate_kg_s
+        self.mass_in['CO2'][:] = self.co2_rate
 
         # Parasitic: pump + LEDs
-        self.energy_in_W = 150.0 + 50.0
+        self.energy_in_W[:] = 150.0 + 50.0
         return biomass_wet, co2_exhaust, n_demand, p_demand
 
 
 class FIREBiorefinery(UnitBlock):
     """Module IV: Wet Biomass → Bio-crude + Ethanol + Hydrochar."""
+    STREAMS_IN = ('wet_biomass', 'CO2_exhaust')
+    STREAMS_OUT = ('biocrude', 'ethanol', 'hydrochar', 'aqueous_recycle',
+                   'N_recycled', 'P_recycled', 'htl_gas')
 
-    def __init__(self, htl_temp_C=300.0):
+    def __init__(self, htl_temp_C=300.0, feed_temp_C=25.0):
         super().__init__("FIRE")
         self.htl_temp = htl_temp_C
+        self.feed_temp = feed_temp_C  # slurry enters at ambient temperature
         self.crude_yield_frac = 0.35
+        self.co_conversion = 0.30  # Z-scheme CO2 → CO
         self.ethanol_yield_per_co = 0.27
+        self.biocrude_hhv = 36e6  # J/kg
+        self.ethanol_hhv = 29.7e6
 
     def compute(self, biomass_wet_kg_s, co2_exhaust_kg_s):
+        self.allocate(batch_size(biomass_wet_kg_s, co2_exhaust_kg_s, self.htl_temp,
+                                 self.feed_temp, self.crude_yield_frac, self.co_conversion,
+                                 self.ethanol_yield_per_co, self.biocrude_hhv, self.ethanol_hhv))
+        out = self.mass_out
         dry_mass = biomass_wet_kg_s * (1.0 - ALGAE_COMPOSITION['moisture'])
 
         # HTL Products
-        biocrude = dry_mass * self.crude_yield_frac
-        aqueous_phase = dry_mass * 0.40
-        hydrochar = dry_mass * 0.15
-        htl_gas = dry_mass * 0.10
+        out['biocrude'][:] = dry_mass * self.crude_yield_frac
+        out['aqueous_recycle'][:] = dry_mass * 0.40
+        out['hydrochar'][:] = dry_mass * 0.15
+        out['htl_gas'][:] = dry_mass * 0.10
 
         # Nutrient recovery from aqueous phase
-        n_recycled = aqueous_phase * 0.06  # ~60% N ends up in aqueous
-        p_recycled = aqueous_phase * 0.03
+        out['N_recycled'][:] = out['aqueous_recycle'] * AQUEOUS_PHASE_COMPOSITION['N']
+        out['P_recycled'][:] = out['aqueous_recycle'] * AQUEOUS_PHASE_COMPOSITION['P']
 
         # Z-Scheme: CO2 → CO → Ethanol
-        co_produced = co2_exhaust_kg_s * 0.30
-        ethanol = co_produced * self.ethanol_yield_per_co
+        co_produced = co2_exhaust_kg_s * self.co_conversion
+        out['ethanol'][:] = co_produced * self.ethanol_yield_per_co
 
         # Energy
         water_mass = biomass_wet_kg_s * ALGAE_COMPOSITION['moisture']
-        self.energy_in_W = water_mass * 4200 * (self.htl_temp - 25.0)
-        biocrude_hhv = 36e6  # J/kg
-        ethanol_hhv = 29.7e6
-        self.energy_out_W = biocrude * biocrude_hhv + ethanol * ethanol_hhv
-
-        self.mass_in = {'wet_biomass': biomass_wet_kg_s, 'CO2_exhaust': co2_exhaust_kg_s}
-        self.mass_out = {
-            'biocrude': biocrude,
-            'ethanol': ethanol,
-            'hydrochar': hydrochar,
-            'aqueous_recycle': aqueous_phase,
-            'N_recycled': n_recycled,
-            'P_recycled': p_recycled,
-            'htl_gas': htl_gas
-        }
-        return hydrochar, n_recycled, p_recycled
+        self.energy_in_W[:] = water_mass * 4200 * (self.htl_temp - self.feed_temp)
+        self.energy_out_W[:] = (out['biocrude'] * self.biocrude_hhv
+                                + out['ethanol'] * self.ethanol_hhv)
+
+        self.mass_in['wet_biomass'][:] = biomass_wet_kg_s
+        self.mass_in['CO2_exhaust'][:] = co2_exhaust_kg_s
+        return out['hydrochar'], out['N_recycled'], out['P_recycled']
 
 
 class TERREPyrolyzer(UnitBlock):
     """Module III: Hydrochar → PAC Biochar + Syngas."""
+    STREAMS_IN = ('hydrochar',)
+    STREAMS_OUT = ('biochar_PAC', 'syngas')
 
     def __init__(self, pyro_temp_C=500.0):
         super().__init__("TERRE")
         self.pyro_temp = pyro_temp_C
+        self.syngas_hhv = 10e6  # J/kg
+        self.pyrolysis_heat = 2.0e6  # J/kg hydrochar (endothermic demand)
 
     def compute(self, hydrochar_kg_s):
-        char_yield = max(0.20, 0.60 - 0.00075 * self.pyro_temp)
-        biochar = hydrochar_kg_s * char_yield
-        syngas = hydrochar_kg_s * (1.0 - char_yield)
+        self.allocate(batch_size(hydrochar_kg_s, self.pyro_temp, self.syngas_hhv,
+                                 self.pyrolysis_heat))
+        biochar = self.mass_out['biochar_PAC']
+        syngas = self.mass_out['syngas']
 
-        self.mass_in = {'hydrochar': hydrochar_kg_s}
-        self.mass_out = {'biochar_PAC': biochar, 'syngas': syngas}
+        char_yield = np.maximum(0.20, 0.60 - 0.00075 * self.pyro_temp)
+        biochar[:] = hydrochar_kg_s * char_yield
+        syngas[:] = hydrochar_kg_s * (1.0 - char_yield)
 
-        syngas_hhv = 10e6  # J/kg
-        self.energy_in_W = hydrochar_kg_s * 2.0e6  # Endothermic demand
-        self.energy_out_W = syngas * syngas_hhv
+        self.mass_in['hydrochar'][:] = hydrochar_kg_s
+
+        self.energy_in_W[:] = hydrochar_kg_s * self.pyrolysis_heat
+        self.energy_out_W[:] = syngas * self.syngas_hhv
         return biochar
 
 
 # =============================================================================
-# Master Flowsheet — Close the Loop
+# Recycle Loop — Tear Streams & Wegstein Acceleration
 # =============================================================================
-def run_master_flowsheet():
-    print("=" * 70)
-    print("  SYMBIOTIC FACTORY — IDAES MASTER FLOWSHEET")
-    print("  Complete Mass & Energy Balance of the WEFC Loop")
-    print("=" * 70)
+# Streams torn to close the loop: FIRE aqueous-phase nutrients back to WATER,
+# TERRE biochar back to the SUN membrane. The aqueous phase itself enters no
+# WATER equation, so it is not torn (see WATERCycloreactor).
+TEAR_STREAMS = ('N_recycled', 'P_recycled', 'biochar_PAC')
+
+
+def wegstein_solve(g, x0, rtol=1e-10, atol=1e-15, max_iter=200, q_bounds=(-20.0, 0.0),
+                   accelerate=True):
+    """
+    Solves the fixed point x = g(x) for a batch of tear vectors.
+
+    x0 has shape (n_tears, n_points). Every tear stream of every point gets
+    its own Wegstein factor q from the secant slope of g, clipped to q_bounds
+    (q = 0 is plain successive substitution, which accelerate=False forces).
+    A point is converged when max |g(x) - x| / (|g(x)| + atol) <= rtol over
+    its tears; converged points stop moving while the rest iterate.
+
+    Returns (x, diagnostics) where diagnostics holds 'method', 'passes'
+    (evaluations of g), 'converged' and 'residual' per point, and 'history'
+    (worst residual after each pass). The last evaluation of g is at x.
+    """
+    x = np.array(x0, dtype=float)
+    gx = g(x)
+    passes = 1
+    x_prev = g_prev = None
+    history = []
+    while True:
+        residual = np.max(np.abs(gx - x) / (np.abs(gx) + atol), axis=0)
+        history.append(float(residual.max()))
+        converged = residual <= rtol
+        if converged.all() or passes >= max_iter:
+            break
+
+        q = 0.0
+        if accelerate and x_prev is not None:
+            dx = x - x_prev
+            slope = np.divide(gx - g_prev, dx, out=np.zeros_like(dx), where=dx != 0)
+            q = np.divide(slope, slope - 1.0, out=np.zeros_like(slope), where=slope != 1.0)
+            q = np.clip(q, *q_bounds)
+        x_prev, g_prev = x, gx
+        x = np.where(converged, x, q * x + (1.0 - q) * gx)
+        gx = g(x)
+        passes += 1
+
+    return x, {
+        'method': 'wegstein' if accelerate else 'direct',
+        'passes': passes,
+        'converged': converged,
+        'residual': residual,
+        'history': np.array(history),
+    }
 
-    sun  = SUNEvaporator(membrane_area_m2=2.0, ghi_W_m2=800.0)
-    water = WATERCycloreactor(volume_m3=0.1, co2_rate_kg_s=0.005)
-    fire = FIREBiorefinery(htl_temp_C=300.0)
-    terre = TERREPyrolyzer(pyro_temp_C=500.0)
 
-    # Execute the loop
-    fw = sun.compute()
-    biomass, co2_ex, n_demand, p_demand = water.compute(fw)
-    hydrochar, n_recycled, p_recycled = fire.compute(biomass, co2_ex)
-    biochar = terre.compute(hydrochar)
+# =============================================================================
+# Master Flowsheet — Close the Loop
+# =============================================================================
+# Empirical unit coefficients that callers may override (nominal values are
+# set in the unit constructors).
+COEFFICIENTS = (
+    'SUN.lspr_efficiency', 'SUN.h_vap_eff', 'SUN.membrane_char_demand', 'SUN.fouling_loss',
+    'WATER.fixation_eff',
+    'FIRE.crude_yield_frac', 'FIRE.co_conversion', 'FIRE.ethanol_yield_per_co',
+    'FIRE.biocrude_hhv', 'FIRE.ethanol_hhv',
+    'TERRE.syngas_hhv', 'TERRE.pyrolysis_heat',
+)
+
+
+def solve_flowsheet(membrane_area_m2=2.0, ghi_W_m2=800.0, volume_m3=0.1,
+                    co2_rate_kg_s=0.005, htl_temp_C=300.0, pyro_temp_C=500.0,
+                    n_makeup_kg_s=np.inf, p_makeup_kg_s=np.inf, feed_temp_C=25.0,
+                    coefficients=None, recycle=True, accelerate=True, rtol=1e-10,
+                    max_iter=200):
+    """
+    Balances SUN → WATER → FIRE → TERRE for one or many operating points.
+
+    Every operating argument may be a scalar or a 1-D array (broadcast
+    together). `coefficients` overrides unit coefficients by 'UNIT.attribute'
+    name, e.g. {'FIRE.crude_yield_frac': array}, with scalars or per-point
+    arrays (see COEFFICIENTS). With recycle=True the TEAR_STREAMS are converged with
+    wegstein_solve, starting from the open-loop pass; recycle=False gives
+    the open loop (no recycle fed back) and diagnostics of None.
+
+    Returns (units, summary, diagnostics): the four unit blocks holding the
+    converged state, and a dict of per-point arrays: eroi, n_closure_pct,
+    p_closure_pct, biochar_kg_s (net carbon sink after membrane makeup),
+    biocrude_kg_s, ethanol_kg_s.
+    """
+    sun = SUNEvaporator(membrane_area_m2=membrane_area_m2, ghi_W_m2=ghi_W_m2)
+    water = WATERCycloreactor(volume_m3=volume_m3, co2_rate_kg_s=co2_rate_kg_s,
+                              n_makeup_kg_s=n_makeup_kg_s, p_makeup_kg_s=p_makeup_kg_s)
+    fire = FIREBiorefinery(htl_temp_C=htl_temp_C, feed_temp_C=feed_temp_C)
+    terre = TERREPyrolyzer(pyro_temp_C=pyro_temp_C)
+    units = [sun, water, fire, terre]
+    for key, value in (coefficients or {}).items():
+        if key not in COEFFICIENTS:
+            raise KeyError(f"Unknown flowsheet coefficient '{key}'")
+        unit_name, attribute = key.split('.')
+        setattr(units[[u.name for u in units].index(unit_name)], attribute, value)
+    demand = {}
+
+    def flowsheet_pass(tears):
+        n_rec, p_rec, char_rec = tears
+        fw = sun.compute(char_rec)
+        biomass, co2_ex, demand['N'], demand['P'] = water.compute(fw, n_rec, p_rec)
+        fire.compute(biomass, co2_ex)
+        terre.compute(fire.mass_out['hydrochar'])
+        streams = {**fire.mass_out, **terre.mass_out}
+        return np.stack([streams[name] for name in TEAR_STREAMS])
 
-    # --- Mass Balance Check ---
+    # Execute the loop
+    open_loop = flowsheet_pass(np.zeros((len(TEAR_STREAMS), 1)))
+    diagnostics = None
+    if recycle:
+        _, diagnostics = wegstein_solve(flowsheet_pass, open_loop, rtol=rtol,
+                                        max_iter=max_iter, accelerate=accelerate)
+        water.mass_in['aqueous_recycle'][:] = fire.mass_out['aqueous_recycle']
+
+    total_e_in = sum(m.energy_in_W for m in units)
+    total_e_out = sum(m.energy_out_W for m in units)
+
+    def percent(num, den):
+        return np.divide(num * 100, den, out=np.zeros(np.shape(num)), where=den > 0)
+
+    summary = {
+        'eroi': np.divide(total_e_out, total_e_in, out=np.zeros_like(total_e_out),
+                          where=total_e_in > 0),
+        'n_closure_pct': percent(fire.mass_out['N_recycled'], demand['N']),
+        'p_closure_pct': percent(fire.mass_out['P_recycled'], demand['P']),
+        'biochar_kg_s': terre.mass_out['biochar_PAC'] - sun.mass_in['biochar_makeup'],
+        'biocrude_kg_s': fire.mass_out['biocrude'],
+        'ethanol_kg_s': fire.mass_out['ethanol'],
+    }
+    return units, summary, diagnostics
+
+
+def print_flowsheet_report(units, summary, point=0):
+    """Prints the detailed mass & energy balance of one operating point."""
     print("\n  ── MASS FLOWS (kg/hr) ──")
-    modules = [sun, water, fire, terre]
-    total_in = 0.0
-    total_out = 0.0
-    for m in modules:
-        m_in = sum(m.mass_in.values()) * 3600
-        m_out = sum(m.mass_out.values()) * 3600
-        total_in += m_in
-        total_out += m_out
+    for m in units:
         print(f"\n  [{m.name}]")
         for k, v in m.mass_in.items():
-            print(f"    IN  {k:20s}: {v*3600:.4f} kg/hr")
+            print(f"    IN  {k:20s}: {v[point]*3600:.4f} kg/hr")
         for k, v in m.mass_out.items():
-            print(f"    OUT {k:20s}: {v*3600:.4f} kg/hr")
+            print(f"    OUT {k:20s}: {v[point]*3600:.4f} kg/hr")
 
-    # --- Energy Balance ---
     print("\n  ── ENERGY BALANCE (W) ──")
-    total_e_in = 0.0
-    total_e_out = 0.0
-    for m in modules:
-        total_e_in += m.energy_in_W
-        total_e_out += m.energy_out_W
-        print(f"  [{m.name:6s}] In: {m.energy_in_W:12.1f} W | Out: {m.energy_out_W:12.1f} W")
-
-    eroi = total_e_out / total_e_in if total_e_in > 0 else 0
-
-    # --- Nutrient Recycling ---
-    n_closure = n_recycled / n_demand * 100 if n_demand > 0 else 0
-    p_closure = p_recycled / p_demand * 100 if p_demand > 0 else 0
+    for m in units:
+        print(f"  [{m.name:6s}] In: {m.energy_in_W[point]:12.1f} W | "
+              f"Out: {m.energy_out_W[point]:12.1f} W")
 
+    eroi = summary['eroi'][point]
     print(f"\n  ── SUMMARY ──")
     print(f"  Systemic EROI:         {eroi:.2f}")
     print(f"  EROI Gate:             {'✅ PASS' if eroi > 3.5 else '❌ FAIL'}")
-    print(f"  N Recycling Closure:   {n_closure:.1f}%")
-    print(f"  P Recycling Closure:   {p_closure:.1f}%")
-    print(f"  Biochar Carbon Sink:   {biochar*3600:.4f} kg/hr")
-    print(f"  Bio-Crude Output:      {fire.mass_out['biocrude']*3600:.4f} kg/hr")
-    print(f"  Ethanol Output:        {fire.mass_out['ethanol']*3600:.4f} kg/hr")
+    print(f"  N Recycling Closure:   {summary['n_closure_pct'][point]:.1f}%")
+    print(f"  P Recycling Closure:   {summary['p_closure_pct'][point]:.1f}%")
+    print(f"  Biochar Carbon Sink:   {summary['biochar_kg_s'][point]*3600:.4f} kg/hr")
+    print(f"  Bio-Crude Output:      {summary['biocrude_kg_s'][point]*3600:.4f} kg/hr")
+    print(f"  Ethanol Output:        {summary['ethanol_kg_s'][point]*3600:.4f} kg/hr")
+
+
+def print_recycle_diagnostics(diagnostics):
+    """Prints how the tear-stream iteration went."""
+    converged = diagnostics['converged']
+    print(f"\n  ── RECYCLE LOOP ({', '.join(TEAR_STREAMS)}) ──")
+    print(f"  Solver:                {diagnostics['method']}")
+    print(f"  Flowsheet passes:      {diagnostics['passes']}")
+    print(f"  Converged:             {converged.sum():,} / {converged.size:,} points "
+          f"{'✅' if converged.all() else '❌'}")
+    print(f"  Worst tear residual:   {diagnostics['residual'].max():.1e}")
+
+
+def run_master_flowsheet(membrane_area_m2=2.0, ghi_W_m2=800.0, volume_m3=0.1,
+                         co2_rate_kg_s=0.005, htl_temp_C=300.0, pyro_temp_C=500.0,
+                         n_makeup_kg_s=np.inf, p_makeup_kg_s=np.inf, feed_temp_C=25.0,
+                         coefficients=None, recycle=True, report=True,
+                         subtitle='Complete Mass & Energy Balance of the WEFC Loop'):
+    """
+    Runs the recycle-converged master flowsheet and returns {'eroi',
+    'n_closure_pct', 'p_closure_pct', ...} as arrays with one entry per
+    operating point (see solve_flowsheet). A single point prints the full
+    balance; a batch prints distribution statistics.
+    """
+    units, summary, diagnostics = solve_flowsheet(
+        membrane_area_m2, ghi_W_m2, volume_m3, co2_rate_kg_s, htl_temp_C, pyro_temp_C,
+        n_makeup_kg_s, p_makeup_kg_s, feed_temp_C, coefficients, recycle=recycle)
+    if not report:
+        return summary
+
+    print("=" * 70)
+    print("  SYMBIOTIC FACTORY — IDAES MASTER FLOWSHEET")
+    print(f"  {subtitle}")
     print("=" * 70)
 
-    return eroi
+    eroi = summary['eroi']
+    if len(eroi) == 1:
+        print_flowsheet_report(units, summary)
+    else:
+        print(f"\n  Operating points:      {len(eroi):,}")
+        print(f"  EROI (min/mean/max):   {eroi.min():.2f} / {eroi.mean():.2f} / {eroi.max():.2f}")
+        print(f"  EROI Gate pass rate:   {np.mean(eroi > 3.5)*100:.1f}%")
+        print(f"  N Closure (mean):      {summary['n_closure_pct'].mean():.1f}%")
+        print(f"  P Closure (mean):      {summary['p_closure_pct'].mean():.1f}%")
+    if diagnostics is not None:
+        print_recycle_diagnostics(diagnostics)
+    print("=" * 70)
+
+    return summary
+
+
+def nutrient_makeup(co2_rate_kg_s=0.005, fraction=0.5, fixation_eff=0.70):
+    """
+    N and P makeup (kg/s) covering `fraction` of the nutrient-replete
+    demand at this CO2 rate, so the recycled nutrients limit growth.
+    """
+    fixed = np.asarray(co2_rate_kg_s) * fixation_eff * fraction
+    return fixed * WATERCycloreactor.N_PER_CO2, fixed * WATERCycloreactor.P_PER_CO2
+
+
+def benchmark_recycle_solvers(n_points=100_000, seed=0):
+    """
+    Converges a nutrient-limited batch (makeup N and P at 5–100% of the
+    replete demand) with Wegstein and with plain successive substitution,
+    and prints passes, wall time and the largest disagreement in EROI.
+    """
+    rng = np.random.default_rng(seed)
+    co2_rate = rng.uniform(0.001, 0.01, n_points)
+    n_makeup, _ = nutrient_makeup(co2_rate, rng.uniform(0.05, 1.0, n_points))
+    _, p_makeup = nutrient_makeup(co2_rate, rng.uniform(0.05, 1.0, n_points))
+    scenario = dict(co2_rate_kg_s=co2_rate, n_makeup_kg_s=n_makeup, p_makeup_kg_s=p_makeup)
+
+    print("=" * 70)
+    print("  RECYCLE SOLVER BENCHMARK — nutrient-limited WEFC loop")
+    print(f"  Operating points: {n_points:,}")
+    print("=" * 70)
+    eroi = {}
+    for accelerate in (True, False):
+        start = time.perf_counter()
+        _, summary, diag = solve_flowsheet(**scenario, accelerate=accelerate, max_iter=1000)
+        elapsed = time.perf_counter() - start
+        eroi[accelerate] = summary['eroi']
+        print(f"  {diag['method']:9s}: {diag['passes']:4d} passes, {elapsed:6.2f} s, "
+              f"{diag['converged'].mean()*100:5.1f}% converged")
+    print(f"  Max |ΔEROI| between solvers: {np.max(np.abs(eroi[True] - eroi[False])):.1e}")
+    print("=" * 70)
 
 
 if __name__ == '__main__':
-    run_master_flowsheet()
+    if '--recycle-benchmark' in sys.argv:
+        benchmark_recycle_solvers()
+    else:
+        run_master_flowsheet()
+        # Finite fertilizer makeup: growth now depends on the recycled N and
+        # P, so the tear streams take several Wegstein passes to converge
+        n_makeup, p_makeup = nutrient_makeup(fraction=0.5)
+        run_master_flowsheet(n_makeup_kg_s=n_makeup, p_makeup_kg_s=p_makeup,
+                             subtitle='Nutrient-Limited Case (makeup = 50% of replete N/P)')
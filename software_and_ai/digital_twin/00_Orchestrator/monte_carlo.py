@@ -0,0 +1,211 @@
+"""
+Symbiotic Factory Digital Twin — Monte Carlo Uncertainty Propagation
+=====================================================================
+Module: 00_Orchestrator / monte_carlo.py
+License: GNU GPLv3
+
+Propagates the uncertainty of the empirical flowsheet coefficients (LSPR
+efficiency, CO2 fixation, HTL yields, heating values, ...) to distributions
+of EROI, biochar carbon sink and bio-crude output. N/P closure depends only
+on the fixed HTL aqueous-phase split and composition, none of which is
+sampled, so it is not reported.
+
+Samples are drawn and evaluated in chunks: every chunk is one vectorized,
+recycle-converged solve_flowsheet() call (idaes_master_flowsheet.py) in a
+worker process, and returns only streaming histogram sketches
+(streaming_stats.py), which the parent merges. Memory therefore does not
+grow with the sample count; 10^7 samples run comfortably on a laptop.
+
+Reproducibility: chunk i always draws from the i-th child of
+SeedSequence(seed), and sketches are merged in chunk order, so a given
+(seed, n_samples, chunk_size) gives identical results for any --jobs.
+
+Usage:
+    python monte_carlo.py [--samples N] [--jobs N] [--seed S] [--chunk N]
+"""
+
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from idaes_master_flowsheet import solve_flowsheet
+from streaming_stats import StreamingStats
+from cli_options import cli_option
+
+
+# =============================================================================
+# Parameter Distributions
+# =============================================================================
+# 'UNIT.attribute' (see idaes_master_flowsheet.COEFFICIENTS) → one of
+#   ('uniform', low, high)
+#   ('triangular', low, mode, high)
+#   ('normal', mean, sd, low, high)      — clipped to [low, high]
+#   ('lognormal', median, sigma)
+PARAMETER_DISTRIBUTIONS = {
+    'SUN.lspr_efficiency': ('triangular', 0.85, 0.92, 0.96),
+    'SUN.h_vap_eff': ('uniform', 1.10e6, 1.40e6),
+    'WATER.fixation_eff': ('normal', 0.70, 0.05, 0.50, 0.90),
+    'FIRE.crude_yield_frac': ('triangular', 0.25, 0.35, 0.45),
+    'FIRE.co_conversion': ('uniform', 0.20, 0.40),
+    'FIRE.ethanol_yield_per_co': ('uniform', 0.20, 0.32),
+    'FIRE.biocrude_hhv': ('normal', 36e6, 1.5e6, 30e6, 40e6),
+    'FIRE.ethanol_hhv': ('normal', 29.7e6, 0.2e6, 29.0e6, 30.4e6),
+    'TERRE.syngas_hhv': ('lognormal', 10e6, 0.20),
+    'TERRE.pyrolysis_heat': ('uniform', 1.5e6, 2.5e6),
+}
+
+METRICS = ('eroi', 'biochar_kg_h', 'biocrude_kg_h')
+EROI_GATE = 3.5
+
+
+def sample_parameters(rng, n_samples, distributions=PARAMETER_DISTRIBUTIONS):
+    """Draws n_samples of every parameter; returns {name: array}."""
+    samples = {}
+    for name, (kind, *args) in distributions.items():
+        if kind == 'uniform':
+            samples[name] = rng.uniform(args[0], args[1], n_samples)
+        elif kind == 'triangular':
+            samples[name] = rng.triangular(args[0], args[1], args[2], n_samples)
+        elif kind == 'normal':
+            samples[name] = np.clip(rng.normal(args[0], args[1], n_samples), args[2], args[3])
+        elif kind == 'lognormal':
+            samples[name] = args[0] * rng.lognormal(0.0, args[1], n_samples)
+        else:
+            raise ValueError(f"Unknown distribution '{kind}' for {name}")
+    return samples
+
+
+# =============================================================================
+# Chunked Evaluation
+# =============================================================================
+def run_chunk(seed, n_samples, distributions=PARAMETER_DISTRIBUTIONS,
+              operating_point=None, n_bins=4096):
+    """
+    Pool worker: samples and evaluates one chunk.
+
+    Returns ({metric: StreamingStats}, EROI gate passes, converged points).
+    """
+    rng = np.random.default_rng(seed)
+    coefficients = sample_parameters(rng, n_samples, distributions)
+    _, summary, diagnostics = solve_flowsheet(**(operating_point or {}),
+                                              coefficients=coefficients)
+    values = {
+        'eroi': summary['eroi'],
+        'biochar_kg_h': summary['biochar_kg_s'] * 3600.0,
+        'biocrude_kg_h': summary['biocrude_kg_s'] * 3600.0,
+    }
+    sketches = {name: StreamingStats(n_bins).update(values[name]) for name in METRICS}
+    return (sketches, int(np.count_nonzero(summary['eroi'] > EROI_GATE)),
+            int(diagnostics['converged'].sum()))
+
+
+def run_monte_carlo(n_samples=1_000_000, chunk_size=100_000, jobs=None, seed=2024,
+                    distributions=PARAMETER_DISTRIBUTIONS, operating_point=None,
+                    report=True):
+    """
+    Runs the Monte Carlo study and returns a dict with 'n_samples', 'seed',
+    per-metric 'stats' summaries (mean, std, p5/p50/p95, ...), the merged
+    'sketches', 'p_eroi_gate' (probability EROI > EROI_GATE) and
+    'converged_fraction' of the recycle loop. `operating_point` holds
+    solve_flowsheet keyword arguments (nominal design when omitted).
+    jobs=1 runs in this process, jobs=None uses every core.
+    """
+    sizes = [chunk_size] * (n_samples // chunk_size)
+    if n_samples % chunk_size:
+        sizes.append(n_samples % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = (seeds, sizes, repeat(distributions), repeat(operating_point))
+
+    start = time.perf_counter()
+    if jobs == 1:
+        chunks = map(run_chunk, *args)
+        sketches, passes, converged = _merge(chunks)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            sketches, passes, converged = _merge(pool.map(run_chunk, *args))
+    elapsed = time.perf_counter() - start
+
+    results = {
+        'n_samples': n_samples,
+        'seed': seed,
+        'stats': {name: s.summary() for name, s in sketches.items()},
+        'sketches': sketches,
+        'p_eroi_gate': passes / n_samples,
+        'converged_fraction': converged / n_samples,
+    }
+    if report:
+        _print_report(results, elapsed, len(sizes))
+        _plot_report(results)
+    return results
+
+
+def _merge(chunks):
+    """Merges chunk results in chunk order (keeps runs reproducible)."""
+    merged, passes, converged = None, 0, 0
+    for sketches, chunk_passes, chunk_converged in chunks:
+        if merged is None:
+            merged = sketches
+        else:
+            for name in METRICS:
+                merged[name].merge(sketches[name])
+        passes += chunk_passes
+        converged += chunk_converged
+    return merged, passes, converged
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+def _print_report(results, elapsed, n_chunks):
+    n = results['n_samples']
+    print("=" * 70)
+    print("  SYMBIOTIC FACTORY — MONTE CARLO UNCERTAINTY PROPAGATION")
+    print(f"  {n:,} samples in {n_chunks} chunks, seed {results['seed']}, "
+          f"{elapsed:.1f} s ({n/elapsed/1e6:.2f} M samples/s)")
+    print("=" * 70)
+    print(f"\n  {'Metric':16s} {'mean':>10s} {'std':>10s} {'p5':>10s} {'p50':>10s} {'p95':>10s}")
+    for name in METRICS:
+        s = results['stats'][name]
+        print(f"  {name:16s} {s['mean']:10.4f} {s['std']:10.4f} {s['p5']:10.4f} "
+              f"{s['p50']:10.4f} {s['p95']:10.4f}")
+    print(f"\n  P(EROI > {EROI_GATE}):        {results['p_eroi_gate']*100:.2f}%")
+    print(f"  Recycle loop converged: {results['converged_fraction']*100:.2f}% of samples")
+    print("=" * 70)
+
+
+def _plot_report(results):
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    fig.suptitle('Symbiotic Factory — Monte Carlo Uncertainty Propagation',
+                 fontsize=14, fontweight='bold')
+    for ax, name, label, color in ((axes[0], 'eroi', 'Systemic EROI', 'steelblue'),
+                                   (axes[1], 'biochar_kg_h', 'Biochar Carbon Sink (kg/hr)',
+                                    'saddlebrown')):
+        edges, counts = results['sketches'][name].histogram()
+        ax.stairs(counts / counts.sum(), edges, fill=True, color=color, alpha=0.6)
+        s = results['stats'][name]
+        for q, style in (('p5', ':'), ('p50', '--'), ('p95', ':')):
+            ax.axvline(s[q], color='k', linestyle=style, alpha=0.7, label=f"{q} = {s[q]:.3g}")
+        ax.set_xlabel(label)
+        ax.set_ylabel('Probability')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig('monte_carlo_report.png', dpi=150)
+    plt.close(fig)
+    print(f"\n  📊 Report saved to: monte_carlo_report.png")
+
+
+if __name__ == '__main__':
+    run_monte_carlo(n_samples=cli_option('--samples', 1_000_000),
+                    chunk_size=cli_option('--chunk', 100_000),
+                    jobs=cli_option('--jobs', 0) or None,
+                    seed=cli_option('--seed', 2024))
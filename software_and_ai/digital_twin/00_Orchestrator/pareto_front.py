@@ -0,0 +1,300 @@
+"""
+Symbiotic Factory Digital Twin — Multi-Objective Pareto Front Engine
+====================================================================
+Module: 00_Orchestrator / pareto_front.py
+License: GNU GPLv3
+
+The MDO objective in factory_mdo_model.py is the single scalar EROI, but
+carbon sequestration (biochar_rate, co2_absorbed) and freshwater_rate pull
+the design in other directions. This module maps the trade-off surface with
+an NSGA-II style genetic algorithm built on the vectorized NumPy factory
+model (factory_fast_model.py):
+
+  1. Whole populations are evaluated as one batch, split across worker
+     processes for large populations.
+  2. Fast non-dominated sorting + crowding distance select survivors; the
+     O:C < 0.2 recalcitrance limit is enforced by constraint domination.
+  3. A bounded archive of every non-dominated design seen so far is written
+     to CSV after each generation, so a long run can be inspected (or
+     killed) at any time.
+
+Usage:
+    python pareto_front.py [--pop 200] [--generations 100] [--jobs N]
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from factory_fast_model import evaluate_factory  # noqa: E402
+from cli_options import cli_option  # noqa: E402
+
+
+# Decision space: (lower, upper) bounds, same units as the factory model
+DECISION_VARS = {
+    'membrane_area': (0.5, 10.0),          # m²
+    'led_frequency': (5.0, 100.0),         # Hz
+    'htl_temp': (523.15, 623.15),          # K  (250°C - 350°C)
+    'pyrolysis_temp': (673.15, 873.15),    # K  (400°C - 600°C)
+    'co2_flow_rate': (0.001, 0.010),       # kg/s
+}
+
+# Objectives, all maximized
+OBJECTIVES = ['eroi', 'biochar_rate', 'freshwater_rate', 'co2_absorbed']
+
+OC_RATIO_LIMIT = 0.2  # PAC must be recalcitrant
+
+
+# =============================================================================
+# 1. Batched Population Evaluation
+# =============================================================================
+def _evaluate_chunk(designs):
+    outputs = evaluate_factory(**dict(zip(DECISION_VARS, designs.T)))
+    return np.column_stack([outputs[name] for name in OBJECTIVES]), outputs['oc_ratio']
+
+
+def evaluate_population(designs, jobs=1, pool=None):
+    """
+    Evaluates an (n, d) array of designs (columns ordered like DECISION_VARS).
+
+    Returns (objectives (n, m) ordered like OBJECTIVES, oc_ratio (n,)).
+    With a process pool and jobs > 1 the population is split into `jobs`
+    chunks that are evaluated in parallel.
+    """
+    if pool is None or jobs <= 1 or len(designs) < 2 * jobs:
+        return _evaluate_chunk(designs)
+    parts = list(pool.map(_evaluate_chunk, np.array_split(designs, jobs)))
+    return (np.concatenate([p[0] for p in parts]),
+            np.concatenate([p[1] for p in parts]))
+
+
+# =============================================================================
+# 2. Non-Dominated Sorting & Crowding (minimization form)
+# =============================================================================
+def domination_matrix(F, G=None):
+    """
+    dom[i, j] is True when row i of F Pareto-dominates row j of G
+    (minimization); G defaults to F.
+    """
+    G = F if G is None else G
+    # One 2D comparison per objective is much faster than reducing an
+    # (n, k, m) boolean cube over its short last axis.
+    le = np.ones((len(F), len(G)), dtype=bool)
+    lt = np.zeros((len(F), len(G)), dtype=bool)
+    for f, g in zip(F.T, G.T):
+        le &= f[:, None] <= g[None, :]
+        lt |= f[:, None] < g[None, :]
+    return le & lt
+
+
+def non_dominated_sort(F, violation=None):
+    """
+    Front index (0 = non-dominated) of every row of F, minimizing all columns.
+
+    Rows with a positive constraint `violation` rank behind every feasible
+    row, ordered by increasing violation.
+    """
+    n = len(F)
+    ranks = np.full(n, -1, dtype=int)
+    feasible = np.ones(n, dtype=bool) if violation is None else violation <= 0
+
+    idx = np.flatnonzero(feasible)
+    if len(idx):
+        dom = domination_matrix(F[idx])
+        counts = dom.sum(axis=0)
+        sub_ranks = np.full(len(idx), -1, dtype=int)
+        front = 0
+        while (sub_ranks < 0).any():
+            current = (counts == 0) & (sub_ranks < 0)
+            sub_ranks[current] = front
+            counts -= dom[current].sum(axis=0)
+            counts[current] = -1
+            front += 1
+        ranks[idx] = sub_ranks
+
+    infeasible = np.flatnonzero(~feasible)
+    if len(infeasible):
+        order = infeasible[np.argsort(violation[infeasible], kind='stable')]
+        ranks[order] = ranks.max(initial=-1) + 1 + np.arange(len(order))
+    return ranks
+
+
+def crowding_distance(F, ranks):
+    """NSGA-II crowding distance, computed front by front."""
+    distance = np.zeros(len(F))
+    for front in np.unique(ranks):
+        idx = np.flatnonzero(ranks == front)
+        if len(idx) <= 2:
+            distance[idx] = np.inf
+            continue
+        for k in range(F.shape[1]):
+            order = idx[np.argsort(F[idx, k])]
+            span = F[order[-1], k] - F[order[0], k]
+            distance[order[[0, -1]]] = np.inf
+            if span > 0:
+                distance[order[1:-1]] += (F[order[2:], k] - F[order[:-2], k]) / span
+    return distance
+
+
+# =============================================================================
+# 3. Variation Operators (on the unit hypercube)
+# =============================================================================
+def _tournament(rng, ranks, crowding, n):
+    a, b = rng.integers(0, len(ranks), (2, n))
+    a_wins = (ranks[a] < ranks[b]) | ((ranks[a] == ranks[b]) & (crowding[a] > crowding[b]))
+    return np.where(a_wins, a, b)
+
+
+def _sbx_crossover(rng, p1, p2, eta=15.0, prob=0.9):
+    u = rng.random(p1.shape)
+    beta = np.where(u <= 0.5, (2 * u) ** (1 / (eta + 1)), (1 / (2 * (1 - u))) ** (1 / (eta + 1)))
+    cross = rng.random((len(p1), 1)) < prob
+    c1 = np.where(cross, 0.5 * ((1 + beta) * p1 + (1 - beta) * p2), p1)
+    c2 = np.where(cross, 0.5 * ((1 - beta) * p1 + (1 + beta) * p2), p2)
+    return np.clip(np.vstack([c1, c2]), 0.0, 1.0)
+
+
+def _polynomial_mutation(rng, x, eta=20.0, prob=None):
+    prob = 1.0 / x.shape[1] if prob is None else prob
+    u = rng.random(x.shape)
+    delta = np.where(u < 0.5, (2 * u) ** (1 / (eta + 1)) - 1, 1 - (2 * (1 - u)) ** (1 / (eta + 1)))
+    mutate = rng.random(x.shape) < prob
+    return np.clip(x + mutate * delta, 0.0, 1.0)
+
+
+# =============================================================================
+# 4. Non-Dominated Archive with Incremental CSV Output
+# =============================================================================
+class ParetoArchive:
+    """
+    Keeps every feasible non-dominated design seen so far, thinned by
+    crowding distance to at most `max_size` entries, and mirrors it to a CSV
+    file after each update (atomic replace, so readers never see a partial
+    file).
+    """
+
+    def __init__(self, path='pareto_front.csv', max_size=2000):
+        self.path = Path(path) if path else None
+        self.max_size = max_size
+        self.designs = np.empty((0, len(DECISION_VARS)))
+        self.objectives = np.empty((0, len(OBJECTIVES)))
+        self.oc_ratio = np.empty(0)
+
+    def update(self, designs, objectives, oc_ratio):
+        """
+        Merges a batch into the archive. Candidates are only compared with
+        each other and with the archive (never archive against archive), so
+        an update costs O(batch × archive).
+        """
+        feasible = oc_ratio <= OC_RATIO_LIMIT
+        X, F, oc = designs[feasible], objectives[feasible], oc_ratio[feasible]
+
+        # Non-dominated within the batch and not dominated by the archive
+        _, unique = np.unique(np.round(X, 12), axis=0, return_index=True)
+        X, F, oc = X[unique], F[unique], oc[unique]
+        keep = ~domination_matrix(-F).any(axis=0)
+        if len(self.objectives):
+            keep &= ~domination_matrix(-self.objectives, -F).any(axis=0)
+            keep &= ~(self.objectives[:, None, :] == F[None, :, :]).all(axis=-1).any(axis=0)
+        X, F, oc = X[keep], F[keep], oc[keep]
+
+        # Archive members dominated by a new entry drop out
+        survivors = ~domination_matrix(-F, -self.objectives).any(axis=0)
+        X = np.vstack([self.designs[survivors], X])
+        F = np.vstack([self.objectives[survivors], F])
+        oc = np.concatenate([self.oc_ratio[survivors], oc])
+
+        if len(X) > self.max_size:
+            keep = np.argsort(-crowding_distance(-F, np.zeros(len(F), dtype=int)),
+                              kind='stable')[:self.max_size]
+            X, F, oc = X[keep], F[keep], oc[keep]
+
+        self.designs, self.objectives, self.oc_ratio = X, F, oc
+        if self.path is not None:
+            self.write()
+
+    def write(self):
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        table = np.column_stack([self.designs, self.objectives, self.oc_ratio])
+        np.savetxt(tmp, table, fmt='%.12g', delimiter=',', comments='',
+                   header=','.join(list(DECISION_VARS) + OBJECTIVES + ['oc_ratio']))
+        os.replace(tmp, self.path)
+
+
+# =============================================================================
+# 5. NSGA-II Driver
+# =============================================================================
+def run_nsga2(pop_size=200, generations=100, seed=0, jobs=1,
+              output='pareto_front.csv', max_archive=2000):
+    """
+    Evolves a population over DECISION_VARS, maximizing all OBJECTIVES
+    subject to oc_ratio <= OC_RATIO_LIMIT.
+
+    Returns the ParetoArchive of non-dominated designs (physical units).
+    """
+    rng = np.random.default_rng(seed)
+    lower, upper = np.array(list(DECISION_VARS.values())).T
+    archive = ParetoArchive(output, max_size=max_archive)
+
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        def evaluate(unit):
+            designs = lower + unit * (upper - lower)
+            objectives, oc = evaluate_population(designs, jobs=jobs, pool=pool)
+            archive.update(designs, objectives, oc)
+            return -objectives, np.maximum(oc - OC_RATIO_LIMIT, 0.0)
+
+        pop = rng.random((pop_size, len(DECISION_VARS)))
+        F, violation = evaluate(pop)
+        for _ in range(generations):
+            ranks = non_dominated_sort(F, violation)
+            crowding = crowding_distance(F, ranks)
+            parents = _tournament(rng, ranks, crowding, pop_size)
+            half = pop_size // 2 + pop_size % 2
+            children = _sbx_crossover(rng, pop[parents[:half]], pop[parents[half:2 * half]])
+            children = _polynomial_mutation(rng, children)[:pop_size]
+            F_child, violation_child = evaluate(children)
+
+            # Elitist (mu + lambda) survival
+            pop = np.vstack([pop, children])
+            F = np.vstack([F, F_child])
+            violation = np.concatenate([violation, violation_child])
+            ranks = non_dominated_sort(F, violation)
+            crowding = crowding_distance(F, ranks)
+            survivors = np.lexsort((-crowding, ranks))[:pop_size]
+            pop, F, violation = pop[survivors], F[survivors], violation[survivors]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return archive
+
+
+def run_pareto_analysis(pop_size=200, generations=100, jobs=1, output='pareto_front.csv'):
+    archive = run_nsga2(pop_size=pop_size, generations=generations, jobs=jobs, output=output)
+
+    print("=" * 70)
+    print("  SYMBIOTIC FACTORY DIGITAL TWIN — Multi-Objective Pareto Front")
+    print("=" * 70)
+    print(f"  Population × Generations: {pop_size} × {generations}")
+    print(f"  Evaluations:              {pop_size * (generations + 1):,}")
+    print(f"  Non-dominated designs:    {len(archive.designs)}")
+    for k, name in enumerate(OBJECTIVES):
+        best = np.argmax(archive.objectives[:, k])
+        others = ", ".join(f"{o} {archive.objectives[best, j]:.3g}"
+                           for j, o in enumerate(OBJECTIVES) if j != k)
+        print(f"  Max {name:16s} {archive.objectives[best, k]:.4g}  ({others})")
+    print("=" * 70)
+    print(f"\n  📄 Pareto set saved to: {output}")
+    return archive
+
+
+if __name__ == '__main__':
+    run_pareto_analysis(pop_size=cli_option('--pop', 200),
+                        generations=cli_option('--generations', 100),
+                        jobs=cli_option('--jobs', 1))
@@ -0,0 +1,264 @@
+"""
+Symbiotic Factory Digital Twin — Global Sensitivity Analysis (Sobol / Morris)
+==============================================================================
+Module: 00_Orchestrator / sensitivity_analysis.py
+License: GNU GPLv3
+
+Ranks the empirical constants that drive EROI, for two models:
+  - 'flowsheet': the unit coefficients of the recycle-converged master
+    flowsheet (idaes_master_flowsheet.COEFFICIENTS)
+  - 'mdo': the constants hard-coded in the OpenMDAO WATER/FIRE/TERRE/EROI
+    components, via their vectorized twin (factory_fast_model.COEFFICIENTS),
+    plus the parasitic-load and mass-transfer inputs
+
+Sobol indices use a scrambled Sobol' Saltelli design (A, B and the k
+A_B^(i) matrices: N·(k + 2) runs), the Saltelli (2010) first-order and
+Jansen total-order estimators, and percentile bootstrap confidence
+intervals. Morris screening uses r random one-at-a-time trajectories on a
+p-level grid and reports μ* and σ of the elementary effects. Every design is
+evaluated as a single batch on the vectorized model, so a full run takes
+about a second and can run on every model change.
+
+Usage:
+    python sensitivity_analysis.py [--problem flowsheet|mdo|all] [--n 4096]
+                                   [--trajectories 100] [--bootstrap 200]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy.stats import qmc
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from idaes_master_flowsheet import solve_flowsheet
+from factory_fast_model import COEFFICIENTS as MDO_COEFFICIENTS, evaluate_factory
+from cli_options import cli_option
+
+
+# =============================================================================
+# Problems: factor ranges and vectorized models
+# =============================================================================
+# SUN.h_vap_eff only sets the freshwater rate and SUN.fouling_loss only acts
+# with a nonzero membrane_char_demand placeholder (0 by default); neither
+# reaches EROI, so they are not sampled.
+FLOWSHEET_FACTORS = {
+    'SUN.lspr_efficiency': (0.85, 0.96),
+    'WATER.fixation_eff': (0.55, 0.85),
+    'FIRE.crude_yield_frac': (0.25, 0.45),
+    'FIRE.co_conversion': (0.20, 0.40),
+    'FIRE.ethanol_yield_per_co': (0.20, 0.32),
+    'FIRE.biocrude_hhv': (32e6, 40e6),
+    'FIRE.ethanol_hhv': (29.0e6, 30.4e6),
+    'TERRE.syngas_hhv': (7e6, 14e6),
+    'TERRE.pyrolysis_heat': (1.5e6, 2.5e6),
+}
+
+# ±20 % around the component constants and selected empirical inputs
+MDO_FACTORS = {name: (0.8 * v, 1.2 * v) for name, v in {
+    **MDO_COEFFICIENTS, 'kla': 0.05, 'pump_power': 150.0, 'led_power': 50.0}.items()}
+
+
+def flowsheet_eroi(params):
+    """EROI of the nominal flowsheet with per-point coefficient overrides."""
+    _, summary, _ = solve_flowsheet(coefficients=params)
+    return summary['eroi']
+
+
+def mdo_eroi(params):
+    """EROI of the factory MDO model (fast path) at nominal design."""
+    inputs = {k: v for k, v in params.items() if k not in MDO_COEFFICIENTS}
+    coefficients = {k: v for k, v in params.items() if k in MDO_COEFFICIENTS}
+    return evaluate_factory(coefficients=coefficients, **inputs)['eroi']
+
+
+PROBLEMS = {
+    'flowsheet': (FLOWSHEET_FACTORS, flowsheet_eroi),
+    'mdo': (MDO_FACTORS, mdo_eroi),
+}
+
+
+def evaluate_design(model, factors, unit_points, chunk_rows=1_000_000):
+    """Maps unit-hypercube rows to the factor ranges and evaluates in chunks."""
+    names = list(factors)
+    lo = np.array([factors[n][0] for n in names])
+    hi = np.array([factors[n][1] for n in names])
+    x = lo + unit_points * (hi - lo)
+    y = np.empty(len(x))
+    for start in range(0, len(x), chunk_rows):
+        rows = slice(start, start + chunk_rows)
+        y[rows] = model({n: x[rows, j] for j, n in enumerate(names)})
+    return y
+
+
+# =============================================================================
+# Sobol Indices (Saltelli design)
+# =============================================================================
+def saltelli_design(n_factors, n_base, seed=0):
+    """
+    Returns the stacked unit design [A; B; A_B^(1); ...; A_B^(k)] with
+    n_base (rounded up to a power of 2) rows per block.
+    """
+    m = int(np.ceil(np.log2(max(n_base, 2))))
+    base = qmc.Sobol(d=2 * n_factors, scramble=True, seed=seed).random_base2(m)
+    A, B = base[:, :n_factors], base[:, n_factors:]
+    AB = np.repeat(A[None], n_factors, axis=0)
+    for i in range(n_factors):
+        AB[i, :, i] = B[:, i]
+    return np.vstack([A, B, AB.reshape(-1, n_factors)])
+
+
+def sobol_estimates(fA, fB, fAB):
+    """
+    First-order (Saltelli 2010) and total (Jansen) indices.
+    fA, fB: (..., N); fAB: (..., N, k). Returns (S1, ST), each (..., k).
+    """
+    var = np.var(np.concatenate([fA, fB], axis=-1), axis=-1)[..., None]
+    var = np.where(var > 0, var, np.inf)
+    s1 = np.mean(fB[..., None] * (fAB - fA[..., None]), axis=-2) / var
+    st = 0.5 * np.mean((fA[..., None] - fAB) ** 2, axis=-2) / var
+    return s1, st
+
+
+def sobol_indices(model, factors, n_base=4096, n_bootstrap=200, confidence=0.95, seed=0):
+    """
+    Sobol first-order and total indices of `model` over `factors`, with
+    percentile bootstrap confidence intervals. Returns a dict with 'S1',
+    'ST', 'S1_ci', 'ST_ci' ((k, 2) arrays) and 'n_evaluations'.
+    """
+    k = len(factors)
+    design = saltelli_design(k, n_base, seed)
+    y = evaluate_design(model, factors, design)
+    n = len(design) // (k + 2)
+    fA, fB, fAB = y[:n], y[n:2 * n], y[2 * n:].reshape(k, n).T
+    s1, st = sobol_estimates(fA, fB, fAB)
+
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, n, (n_bootstrap, n))
+    s1_boot, st_boot = sobol_estimates(fA[idx], fB[idx], fAB[idx])
+    tail = (1.0 - confidence) / 2 * 100
+    return {
+        'S1': s1, 'ST': st,
+        'S1_ci': np.percentile(s1_boot, [tail, 100 - tail], axis=0).T,
+        'ST_ci': np.percentile(st_boot, [tail, 100 - tail], axis=0).T,
+        'n_evaluations': len(design),
+    }
+
+
+# =============================================================================
+# Morris Elementary Effects
+# =============================================================================
+def morris_design(n_factors, n_trajectories, levels=4, seed=0):
+    """
+    Random one-at-a-time trajectories on a `levels`-level grid in the unit
+    hypercube. Returns (points (r·(k+1), k), factor moved at each step
+    (r, k), signed step (r, k)).
+    """
+    rng = np.random.default_rng(seed)
+    delta = levels / (2.0 * (levels - 1))
+    r, k = n_trajectories, n_factors
+    start = rng.integers(0, levels // 2, (r, k)) / (levels - 1)
+    step = np.where(rng.random((r, k)) < 0.5, delta, -delta)
+    start = np.where(step < 0, start + delta, start)
+    order = np.argsort(rng.random((r, k)), axis=1)
+
+    points = np.empty((r, k + 1, k))
+    points[:, 0] = start
+    rows = np.arange(r)
+    for j in range(k):
+        points[:, j + 1] = points[:, j]
+        moved = order[:, j]
+        points[rows, j + 1, moved] += step[rows, moved]
+    return points.reshape(-1, k), order, np.take_along_axis(step, order, axis=1)
+
+
+def morris_screening(model, factors, n_trajectories=100, levels=4, seed=0):
+    """Morris μ* (mean |EE|), μ and σ per factor, with EE in output units per unit range."""
+    k = len(factors)
+    points, order, step = morris_design(k, n_trajectories, levels, seed)
+    y = evaluate_design(model, factors, points).reshape(n_trajectories, k + 1)
+    effects = np.empty((n_trajectories, k))
+    np.put_along_axis(effects, order, np.diff(y, axis=1) / step, axis=1)
+    return {
+        'mu_star': np.abs(effects).mean(axis=0),
+        'mu': effects.mean(axis=0),
+        'sigma': effects.std(axis=0, ddof=1),
+        'n_evaluations': len(points),
+    }
+
+
+# =============================================================================
+# Driver
+# =============================================================================
+def run_sensitivity_analysis(problems=('flowsheet', 'mdo'), n_base=4096, n_trajectories=100,
+                             n_bootstrap=200, seed=0, report=True):
+    """Runs Sobol + Morris for each problem; returns {problem: results dict}."""
+    results = {}
+    for name in problems:
+        factors, model = PROBLEMS[name]
+        start = time.perf_counter()
+        res = {'factors': list(factors)}
+        res.update(sobol_indices(model, factors, n_base, n_bootstrap, seed=seed))
+        morris = morris_screening(model, factors, n_trajectories, seed=seed)
+        res.update({f'morris_{k}': v for k, v in morris.items()})
+        res['elapsed_s'] = time.perf_counter() - start
+        results[name] = res
+        if report:
+            _print_problem(name, res)
+    if report:
+        _plot_report(results)
+    return results
+
+
+def _print_problem(name, res):
+    print("=" * 78)
+    print(f"  SENSITIVITY OF EROI — {name.upper()} MODEL")
+    print(f"  {len(res['factors'])} factors, {res['n_evaluations']:,} Sobol + "
+          f"{res['morris_n_evaluations']:,} Morris runs, {res['elapsed_s']:.2f} s")
+    print("=" * 78)
+    print(f"  {'Factor':28s} {'S1':>6s} {'95% CI':>15s} {'ST':>6s} {'95% CI':>15s} "
+          f"{'μ*':>8s}")
+    for i in np.argsort(-res['ST']):
+        s1_lo, s1_hi = res['S1_ci'][i]
+        st_lo, st_hi = res['ST_ci'][i]
+        print(f"  {res['factors'][i]:28s} {res['S1'][i]:6.3f} [{s1_lo:6.3f},{s1_hi:6.3f}] "
+              f"{res['ST'][i]:6.3f} [{st_lo:6.3f},{st_hi:6.3f}] {res['morris_mu_star'][i]:8.4f}")
+    print(f"  Σ S1 = {res['S1'].sum():.3f} (1 − Σ S1 ≈ interaction share)")
+
+
+def _plot_report(results):
+    fig, axes = plt.subplots(1, len(results), figsize=(8 * len(results), 7), squeeze=False)
+    fig.suptitle('Symbiotic Factory — Global Sensitivity of EROI (Sobol)',
+                 fontsize=14, fontweight='bold')
+    for ax, (name, res) in zip(axes[0], results.items()):
+        order = np.argsort(res['ST'])
+        ypos = np.arange(len(order))
+        for offset, key, color in ((-0.2, 'S1', 'steelblue'), (0.2, 'ST', 'darkorange')):
+            vals = res[key][order]
+            ci = res[f'{key}_ci'][order]
+            err = np.abs(ci.T - vals)
+            ax.barh(ypos + offset, vals, height=0.4, xerr=err, color=color, alpha=0.8,
+                    label=key, capsize=2)
+        ax.set_yticks(ypos)
+        ax.set_yticklabels([res['factors'][i] for i in order], fontsize=8)
+        ax.set_xlabel('Sobol index')
+        ax.set_title(f'{name} model')
+        ax.legend()
+        ax.grid(True, alpha=0.3, axis='x')
+    plt.tight_layout()
+    plt.savefig('sensitivity_report.png', dpi=150)
+    plt.close(fig)
+    print(f"\n  📊 Report saved to: sensitivity_report.png")
+
+
+if __name__ == '__main__':
+    problem = cli_option('--problem', 'all')
+    run_sensitivity_analysis(problems=tuple(PROBLEMS) if problem == 'all' else (problem,),
+                             n_base=cli_option('--n', 4096),
+                             n_trajectories=cli_option('--trajectories', 100),
+                             n_bootstrap=cli_option('--bootstrap', 200))
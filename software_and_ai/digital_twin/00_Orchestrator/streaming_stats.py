@@ -0,0 +1,149 @@
+"""
+Symbiotic Factory Digital Twin — Streaming Statistics
+======================================================
+Module: 00_Orchestrator / streaming_stats.py
+License: GNU GPLv3
+
+Constant-memory running statistics for series that are too long to hold in
+memory (multi-year weather streams, Monte-Carlo ensembles): count, sum,
+min/max, mean and variance (Chan's parallel update), plus quantiles from an
+auto-ranging histogram whose bin width doubles whenever new values fall
+outside its span. Quantiles are accurate to one bin width, i.e. to about
+(max - min) / n_bins. Sketches of disjoint chunks can be merged, so workers
+can summarize their share and the parent combines them.
+
+Usage:
+    stats = StreamingStats()
+    for chunk in chunks:
+        stats.update(chunk)
+    stats.quantile([0.05, 0.5, 0.95])
+"""
+
+import numpy as np
+
+
+class StreamingStats:
+    """Running moments and histogram quantiles of a stream of values."""
+
+    def __init__(self, n_bins=4096):
+        if n_bins < 2 or n_bins % 2:
+            raise ValueError("n_bins must be an even number >= 2")
+        self.n_bins = n_bins
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self._lo = None      # left edge of the histogram
+        self._width = None   # bin width
+        self._counts = np.zeros(n_bins, dtype=np.int64)
+
+    # -------------------------------------------------------------------------
+    # Histogram range management
+    # -------------------------------------------------------------------------
+    def _cover(self, lo, hi):
+        """Doubles the bin width until [lo, hi] lies inside the histogram."""
+        if self._lo is None:
+            span = hi - lo
+            self._width = span / self.n_bins if span > 0 else max(abs(lo), 1.0) * 1e-9
+            self._width *= 1.0 + 1e-9   # keep `hi` inside the last bin
+            self._lo = lo
+            return
+        half = self.n_bins // 2
+        while lo < self._lo or hi >= self._lo + self.n_bins * self._width:
+            pairs = self._counts.reshape(half, 2).sum(axis=1)
+            self._counts = np.zeros(self.n_bins, dtype=np.int64)
+            if lo < self._lo:   # grow downwards: old span becomes the upper half
+                self._counts[half:] = pairs
+                self._lo -= self.n_bins * self._width
+            else:               # grow upwards: old span becomes the lower half
+                self._counts[:half] = pairs
+            self._width *= 2.0
+
+    def _add_to_histogram(self, values, counts=None):
+        idx = np.floor((values - self._lo) / self._width).astype(np.int64)
+        np.clip(idx, 0, self.n_bins - 1, out=idx)
+        self._counts += np.bincount(idx, weights=counts, minlength=self.n_bins).astype(np.int64)
+
+    # -------------------------------------------------------------------------
+    # Updates
+    # -------------------------------------------------------------------------
+    def update(self, values):
+        """Adds a chunk of values (NaNs are ignored)."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        n = values.size
+        if n == 0:
+            return self
+        chunk_mean = float(values.mean())
+        chunk_m2 = float(np.sum((values - chunk_mean) ** 2))
+        self._combine_moments(n, chunk_mean, chunk_m2)
+        self.total += float(values.sum())
+        lo, hi = float(values.min()), float(values.max())
+        self.min, self.max = min(self.min, lo), max(self.max, hi)
+        self._cover(lo, hi)
+        self._add_to_histogram(values)
+        return self
+
+    def _combine_moments(self, n, mean, m2):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self._m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    def merge(self, other):
+        """Folds another sketch into this one (bins re-binned at their centres)."""
+        if other.count == 0:
+            return self
+        self._combine_moments(other.count, other.mean, other._m2)
+        self.total += other.total
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self._cover(other.min, other.max)
+        occupied = other._counts > 0
+        centres = other._lo + (np.nonzero(occupied)[0] + 0.5) * other._width
+        self._add_to_histogram(np.clip(centres, other.min, other.max), other._counts[occupied])
+        return self
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance))
+
+    def quantile(self, q):
+        """Quantile(s) q in [0, 1], interpolated linearly within a bin."""
+        q = np.asarray(q, dtype=float)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)[()]
+        cum = np.cumsum(self._counts)
+        target = q * self.count
+        idx = np.clip(np.searchsorted(cum, target, side='left'), 0, self.n_bins - 1)
+        before = np.where(idx > 0, cum[idx - 1], 0)
+        frac = np.divide(target - before, self._counts[idx],
+                         out=np.zeros(q.shape), where=self._counts[idx] > 0)
+        value = self._lo + (idx + np.clip(frac, 0.0, 1.0)) * self._width
+        return np.clip(value, self.min, self.max)[()]
+
+    def histogram(self):
+        """Returns (bin edges, counts) of the occupied part of the sketch."""
+        occupied = np.nonzero(self._counts)[0]
+        if occupied.size == 0:
+            return np.array([]), np.array([], dtype=np.int64)
+        first, last = occupied[0], occupied[-1] + 1
+        edges = self._lo + np.arange(first, last + 1) * self._width
+        return edges, self._counts[first:last].copy()
+
+    def summary(self, quantiles=(0.05, 0.50, 0.95)):
+        """Dict of count, mean, std, min, max and p<NN> for each quantile."""
+        out = {'count': self.count, 'mean': self.mean, 'std': self.std,
+               'min': self.min, 'max': self.max}
+        for q, v in zip(quantiles, np.atleast_1d(self.quantile(quantiles))):
+            out[f"p{q*100:g}"] = float(v)
+        return out
@@ -10,19 +10,36 @@ under LSPR-enhanced solar conditions.
 
 Physics: Washburn equation + Darcy flow in a porous sponge.
 
-Usage: python capillary_wicking.py
+Pore size pulls both ways: fine pores lift water high but choke the Darcy
+flow, coarse pores flow freely but cannot hold a column against gravity.
+--sweep maps the window of pore radii between those limits for every sponge
+thickness and irradiance.
+
+Usage:
+    python capillary_wicking.py           # 1D pore-radius scan at 20 mm, 800 W/m²
+    python capillary_wicking.py --sweep   # radius × thickness × GHI design space
 """
 
+import sys
+from pathlib import Path
+
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from inverse_solver import find_root, first_feasible
+
+SURFACE_TENSION = 0.0728   # N/m, water at 25°C
+WATER_VISCOSITY = 1.002e-3  # Pa·s, water at 20°C
+WATER_DENSITY = 998.0       # kg/m³
+CONTACT_ANGLE_DEG = 20.0    # water on hydrophilic biochar
 
 # =============================================================================
 # 1. Washburn Equation: Capillary Rise Dynamics
 # =============================================================================
-def washburn_height(t_seconds, pore_radius_m, contact_angle_deg=20.0):
+def washburn_height(t_seconds, pore_radius_m, contact_angle_deg=CONTACT_ANGLE_DEG):
     """
     Lucas-Washburn equation for capillary rise in a cylindrical pore:
         h(t) = sqrt(r * γ * cos(θ) * t / (2η))
@@ -32,38 +49,52 @@ def washburn_height(t_seconds, pore_radius_m, contact_angle_deg=20.0):
         pore_radius_m: average pore radius (m)
         contact_angle_deg: water-biochar contact angle (hydrophilic ~20°)
     """
-    gamma = 0.0728     # Surface tension of water (N/m) at 25°C
-    eta = 1.002e-3      # Dynamic viscosity of water (Pa·s) at 20°C
     theta = np.radians(contact_angle_deg)
+    r = np.asarray(pore_radius_m, dtype=float)
+    return np.sqrt(r * SURFACE_TENSION * np.cos(theta) * np.asarray(t_seconds, dtype=float)
+                   / (2 * WATER_VISCOSITY))
+
+
+def washburn_time(height_m, pore_radius_m, contact_angle_deg=CONTACT_ANGLE_DEG):
+    """Time (s) for the Washburn front to wick through height_m (inverse of washburn_height)."""
+    theta = np.radians(contact_angle_deg)
+    h = np.asarray(height_m, dtype=float)
+    return h ** 2 * 2 * WATER_VISCOSITY / (np.asarray(pore_radius_m, dtype=float)
+                                           * SURFACE_TENSION * np.cos(theta))
+
 
-    h = np.sqrt(pore_radius_m * gamma * np.cos(theta) * t_seconds / (2 * eta))
-    return h
+def jurin_height(pore_radius_m, contact_angle_deg=CONTACT_ANGLE_DEG):
+    """Equilibrium capillary rise against gravity, h = 2γcos(θ) / (ρ g r)  (m)."""
+    theta = np.radians(contact_angle_deg)
+    return (2 * SURFACE_TENSION * np.cos(theta)
+            / (WATER_DENSITY * 9.81 * np.asarray(pore_radius_m, dtype=float)))
 
 
 # =============================================================================
 # 2. Darcy Permeability: Steady-State Flow Rate Through the Sponge
 # =============================================================================
-def darcy_flow_rate(sponge_thickness_m, pore_radius_m, porosity=0.65):
+def darcy_flow_rate(sponge_thickness_m, pore_radius_m, porosity=0.65,
+                    contact_angle_deg=CONTACT_ANGLE_DEG):
     """
     Darcy's law: volumetric flow rate per unit area through the biochar.
         q = (K / η) * (ΔP / L)
     
     K (permeability) estimated via Kozeny-Carman:
         K = (d² * ε³) / (180 * (1-ε)²)
+
+    Returns (q, K), broadcast over the arguments.
     """
-    eta = 1.002e-3
-    d = pore_radius_m * 2
-    epsilon = porosity
+    r = np.asarray(pore_radius_m, dtype=float)
+    d = r * 2
+    epsilon = np.asarray(porosity, dtype=float)
 
     # Kozeny-Carman permeability
     K = (d**2 * epsilon**3) / (180 * (1 - epsilon)**2)
 
     # Capillary pressure driving flow
-    gamma = 0.0728
-    theta_rad = np.radians(20)
-    delta_P = 2 * gamma * np.cos(theta_rad) / pore_radius_m
+    delta_P = 2 * SURFACE_TENSION * np.cos(np.radians(contact_angle_deg)) / r
 
-    q = (K / eta) * (delta_P / sponge_thickness_m)  # m³/(m²·s) = m/s
+    q = (K / WATER_VISCOSITY) * (delta_P / np.asarray(sponge_thickness_m, dtype=float))  # m/s
     return q, K
 
 
@@ -75,12 +106,127 @@ def lspr_evaporation_rate(ghi_W_m2=800.0, efficiency=0.92, h_vap_eff_J_kg=1250e3
     Mass flux of water evaporated from the ISSG membrane surface.
         m_dot = (GHI * η) / ΔH_vap   [kg/(m²·s)]
     """
-    return ghi_W_m2 * efficiency / h_vap_eff_J_kg
+    return np.asarray(ghi_W_m2, dtype=float) * efficiency / h_vap_eff_J_kg
 
 
 # =============================================================================
 # 4. Steady-State Matching: Does Supply Meet Demand?
 # =============================================================================
+def balanced_pore_radius(sponge_thickness_m=0.020, ghi_W_m2=800.0, porosity=0.65,
+                         contact_angle_deg=CONTACT_ANGLE_DEG, r_bounds=(1e-8, 1e-5)):
+    """
+    Pore radius (m) at which the Darcy supply equals the LSPR evaporation
+    demand, solved in log(r) with the shared bracketed solver; vectorized
+    over thickness, GHI, porosity and contact angle. NaN where there is no
+    crossover within r_bounds (by default the 10 nm – 10 μm design range;
+    the Kozeny-Carman / Laplace model is not extrapolated beyond it).
+    """
+    demand_m_s = lspr_evaporation_rate(ghi_W_m2) / 1000.0
+
+    def log_supply_ratio(r):
+        q, _ = darcy_flow_rate(sponge_thickness_m, r, porosity, contact_angle_deg)
+        return np.log(q / demand_m_s)
+
+    return find_root(log_supply_ratio, *r_bounds, xtol=1e-12, log_scale=True)['x']
+
+
+def wicking_design_space(pore_radii_m=None, thicknesses_m=None, ghis_W_m2=None,
+                         porosity=0.65, max_wick_time_s=3 * 3600.0):
+    """
+    Evaluates the capillary supply / evaporation demand balance on the full
+    pore radius × sponge thickness × GHI grid in one broadcast pass.
+
+    A design is feasible when the Darcy supply meets the demand (no
+    dry-out), the Jurin height reaches the sponge surface against gravity
+    (large pores do not lift water through a thick sponge) and the Washburn
+    front wets the sponge within max_wick_time_s at start-up (by default
+    3 h, so a dry sponge is wet before the midday irradiance peak).
+
+    Returns a dict with the axes, the 3D 'balance' (supply/demand) and
+    'feasible' arrays (indexed [radius, thickness, GHI]), 'wick_time_s'
+    [radius, thickness], and the 2D feasible radius window 'r_min_m' /
+    'r_max_m' over (thickness, GHI), NaN where no radius on the grid works.
+    """
+    r = np.logspace(-9, -3, 241) if pore_radii_m is None else np.asarray(pore_radii_m, float)
+    L = (np.linspace(0.005, 0.050, 46) if thicknesses_m is None
+         else np.asarray(thicknesses_m, float))
+    G = np.linspace(100, 1100, 41) if ghis_W_m2 is None else np.asarray(ghis_W_m2, float)
+
+    supply, _ = darcy_flow_rate(L[None, :, None], r[:, None, None], porosity)
+    demand = lspr_evaporation_rate(G) / 1000.0   # m³/(m²·s)
+    balance = supply / demand[None, None, :]
+    wick_time = washburn_time(L[None, :], r[:, None])
+    lifts = jurin_height(r)[:, None] >= L[None, :]
+    feasible = (balance >= 1.0) & (lifts & (wick_time <= max_wick_time_s))[:, :, None]
+
+    r_min, _ = first_feasible(r, feasible)
+    r_max, _ = first_feasible(r, feasible, last=True)
+    return {
+        'pore_radii_m': r, 'thicknesses_m': L, 'ghis_W_m2': G,
+        'supply_m_s': supply, 'demand_m_s': demand, 'balance': balance,
+        'wick_time_s': wick_time, 'feasible': feasible,
+        'r_min_m': r_min, 'r_max_m': r_max,
+    }
+
+
+def run_wicking_sweep():
+    """Computes the radius × thickness × GHI design space, prints and plots it."""
+    space = wicking_design_space()
+    r, L, G = space['pore_radii_m'], space['thicknesses_m'], space['ghis_W_m2']
+    i_L = np.argmin(np.abs(L - 0.020))
+    i_G = np.argmin(np.abs(G - 800.0))
+
+    print("=" * 70)
+    print("  DIGITAL TWIN — SUN Capillary Wicking Design Space")
+    print("=" * 70)
+    print(f"  Grid:                   {len(r)} radius × {len(L)} thickness × {len(G)} GHI "
+          f"= {space['balance'].size:,} designs")
+    print(f"  Feasible designs:       {space['feasible'].mean() * 100:.1f}%")
+    print(f"\n  {'Thickness':>10s} {'r_min @800 W/m²':>16s} {'r_max':>10s} {'r_min @1100':>12s}")
+    for j in np.linspace(0, len(L) - 1, 6).astype(int):
+        print(f"  {L[j] * 1000:8.0f}mm {space['r_min_m'][j, i_G] * 1e9:13.1f} nm "
+              f"{space['r_max_m'][j, i_G] * 1e6:7.0f} μm "
+              f"{space['r_min_m'][j, -1] * 1e9:9.1f} nm")
+    print("=" * 70)
+
+    fig, axes = plt.subplots(1, 3, figsize=(20, 6))
+    fig.suptitle('SUN Module — Capillary Wicking Design Space (Radius × Thickness × GHI)',
+                 fontsize=14, fontweight='bold')
+
+    im = axes[0].pcolormesh(L * 1000, r * 1e6, np.log10(space['balance'][:, :, i_G]),
+                            shading='auto', cmap='RdBu', vmin=-3, vmax=3)
+    axes[0].contour(L * 1000, r * 1e6, space['feasible'][:, :, i_G].astype(float),
+                    levels=[0.5], colors='k', linewidths=2)
+    axes[0].set_yscale('log')
+    axes[0].set_xlabel('Sponge Thickness (mm)')
+    axes[0].set_ylabel('Pore Radius (μm)')
+    axes[0].set_title(f'Supply/Demand at {G[i_G]:.0f} W/m² (black = feasible edge)')
+    fig.colorbar(im, ax=axes[0], label='log10(supply / demand)')
+
+    im = axes[1].pcolormesh(G, L * 1000, space['r_min_m'] * 1e9, shading='auto', cmap='viridis')
+    axes[1].set_xlabel('GHI (W/m²)')
+    axes[1].set_ylabel('Sponge Thickness (mm)')
+    axes[1].set_title('Smallest Feasible Pore Radius')
+    fig.colorbar(im, ax=axes[1], label='r_min (nm)')
+
+    im = axes[2].pcolormesh(G, r * 1e6, space['feasible'][:, i_L, :], shading='auto',
+                            cmap='Greens')
+    axes[2].set_yscale('log')
+    axes[2].set_xlabel('GHI (W/m²)')
+    axes[2].set_ylabel('Pore Radius (μm)')
+    axes[2].set_title(f'Feasible Region at {L[i_L] * 1000:.0f} mm Thickness')
+
+    plt.tight_layout()
+    plt.savefig('capillary_wicking_design_space.png', dpi=150)
+    plt.close(fig)
+    print(f"\n  📊 Report saved to: capillary_wicking_design_space.png")
+
+    return space
+
+
+# =============================================================================
+# 5. Simulation Runner
+# =============================================================================
 def run_simulation():
     pore_radii = np.logspace(-8, -5, 200)  # 10nm to 10μm
     sponge_thickness = 0.020  # 20mm
@@ -88,20 +234,25 @@ def run_simulation():
     evap_rate = lspr_evaporation_rate()  # kg/(m²·s)
     evap_rate_m_s = evap_rate / 1000.0   # Convert to m/s (m³/m²/s)
 
-    darcy_rates = []
-    washburn_times = []
-    for r in pore_radii:
-        q, _ = darcy_flow_rate(sponge_thickness, r)
-        darcy_rates.append(q)
-        # Time to wick through full sponge thickness
-        t_wick = (sponge_thickness**2 * 2 * 1.002e-3) / (r * 0.0728 * np.cos(np.radians(20)))
-        washburn_times.append(t_wick)
-
-    darcy_rates = np.array(darcy_rates)
+    darcy_rates, _ = darcy_flow_rate(sponge_thickness, pore_radii)
+    # Time to wick through full sponge thickness
+    washburn_times = washburn_time(sponge_thickness, pore_radii)
 
-    # Find pore radius where supply = demand
-    crossover_idx = np.argmin(np.abs(darcy_rates - evap_rate_m_s))
-    optimal_pore = pore_radii[crossover_idx]
+    # Find pore radius where supply = demand; without a crossover in the
+    # design range, report the radius closest to balance and the mismatch
+    optimal_pore = float(balanced_pore_radius(sponge_thickness,
+                                              r_bounds=(pore_radii[0], pore_radii[-1])))
+    balanced = np.isfinite(optimal_pore)
+    if balanced:
+        status = '✅ BALANCED'
+    else:
+        optimal_pore = pore_radii[np.argmin(np.abs(np.log(darcy_rates / evap_rate_m_s)))]
+        status = ('⚠️ MISMATCH — oversupplied across the design range'
+                  if darcy_rates.min() > evap_rate_m_s else
+                  '⚠️ MISMATCH — undersupplied across the design range')
+    pore_label = 'Optimal' if balanced else 'Closest'
+    optimal_rate, _ = darcy_flow_rate(sponge_thickness, optimal_pore)
+    optimal_wick_time = washburn_time(sponge_thickness, optimal_pore)
 
     print("=" * 70)
     print("  DIGITAL TWIN — SUN Module Capillary Wicking Analysis")
@@ -110,11 +261,11 @@ def run_simulation():
     print(f"  LSPR Evaporation Rate:    {evap_rate*3600:.2f} kg/(m²·hr)")
     print(f"  Evaporation Rate (m/s):   {evap_rate_m_s:.2e}")
     print(f"  ---")
-    print(f"  Optimal Pore Radius:      {optimal_pore*1e6:.2f} μm")
-    print(f"  Darcy Flow at Optimal:    {darcy_rates[crossover_idx]:.2e} m/s")
-    print(f"  Washburn Wick Time:       {washburn_times[crossover_idx]:.1f} s")
-    print(f"  Supply/Demand Ratio:      {darcy_rates[crossover_idx]/evap_rate_m_s:.2f}")
-    print(f"  Status:                   {'✅ BALANCED' if 0.8 < darcy_rates[crossover_idx]/evap_rate_m_s < 1.5 else '⚠️ MISMATCH'}")
+    print(f"  {pore_label} Pore Radius:      {optimal_pore*1e9:.2f} nm")
+    print(f"  Darcy Flow at {pore_label}:    {optimal_rate:.2e} m/s")
+    print(f"  Washburn Wick Time:       {optimal_wick_time:.1f} s")
+    print(f"  Supply/Demand Ratio:      {optimal_rate/evap_rate_m_s:.2f}")
+    print(f"  Status:                   {status}")
     print("=" * 70)
 
     # Generate plots
@@ -124,7 +275,7 @@ def run_simulation():
     axes[0].loglog(pore_radii * 1e6, darcy_rates, 'b-', linewidth=2, label='Darcy Supply Rate')
     axes[0].axhline(y=evap_rate_m_s, color='r', linestyle='--', linewidth=2, label='LSPR Evaporation Demand')
     axes[0].axvline(x=optimal_pore * 1e6, color='g', linestyle=':', alpha=0.7,
-                    label=f'Optimal: {optimal_pore*1e6:.2f} μm')
+                    label=f'{pore_label}: {optimal_pore*1e6:.2f} μm')
     axes[0].set_xlabel('Pore Radius (μm)')
     axes[0].set_ylabel('Flow Rate (m/s)')
     axes[0].set_title('Supply-Demand Matching')
@@ -145,4 +296,7 @@ def run_simulation():
 
 
 if __name__ == '__main__':
-    run_simulation()
+    if '--sweep' in sys.argv:
+        run_wicking_sweep()
+    else:
+        run_simulation()
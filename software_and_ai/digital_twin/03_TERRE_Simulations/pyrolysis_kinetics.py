@@ -10,31 +10,53 @@ Calculates:
   2. O:C atomic ratio of the resulting biochar (must be < 0.2 for millennial sequestration)
   3. Self-sustainability: does the syngas combustion energy meet the endothermic pyrolysis demand?
 
+Longer holds lower the O:C ratio, while self-sustainability depends on
+temperature alone, so --surface trades the two off: per hold time it finds
+the coldest temperature that still gives sequestration-grade biochar from a
+self-heating reactor, and over the batch size it shows the energy surplus.
+
 Usage:
-    python pyrolysis_kinetics.py
+    python pyrolysis_kinetics.py              # 1D temperature scan at 1 h hold
+    python pyrolysis_kinetics.py --surface    # T × hold × mass design surface
 """
 
+import sys
+from pathlib import Path
+
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from inverse_solver import first_feasible, inverse_query
+
 
 # =============================================================================
 # 1. Syngas Composition Model
 # =============================================================================
+GAS_SPECIES = ('CO', 'H2', 'CH4', 'CO2', 'Tar')
+GAS_DTYPE = np.dtype([(name, float) for name in GAS_SPECIES])
+
+# Heating values of the gas-phase species (MJ/kg)
+GAS_HHV = {'CO': 10.1, 'H2': 120.0, 'CH4': 55.5, 'CO2': 0.0, 'Tar': 20.0}
+
+
 def syngas_composition(T_celsius):
     """
     Empirical model for syngas composition during slow biomass pyrolysis.
     Based on thermogravimetric analysis (TGA) data from literature.
     
-    Returns dict of mass fractions: CO, H2, CH4, CO2, tar
+    Returns a structured array (GAS_DTYPE, shaped like T_celsius) of mass
+    fractions: comp['CO'], comp['H2'], comp['CH4'], comp['CO2'], comp['Tar']
     """
+    T_celsius = np.asarray(T_celsius, dtype=float)
+
     # CO increases with temperature (Boudouard equilibrium)
     co_frac = 0.10 + 0.0004 * (T_celsius - 300)
     
     # H2 increases sharply above 500°C (water-gas shift)
-    h2_frac = 0.02 + 0.0006 * max(0, T_celsius - 400)
+    h2_frac = 0.02 + 0.0006 * np.maximum(0, T_celsius - 400)
     
     # CH4 peaks around 500°C then decreases (thermal cracking)
     ch4_frac = 0.08 * np.exp(-0.5 * ((T_celsius - 500) / 100)**2)
@@ -43,17 +65,19 @@ def syngas_composition(T_celsius):
     co2_frac = 0.30 - 0.0003 * (T_celsius - 300)
     
     # Tar decreases with temperature (more complete cracking)
-    tar_frac = max(0.01, 0.25 - 0.0005 * (T_celsius - 300))
+    tar_frac = np.maximum(0.01, 0.25 - 0.0005 * (T_celsius - 300))
     
     total = co_frac + h2_frac + ch4_frac + co2_frac + tar_frac
     
-    return {
-        'CO': co_frac / total,
-        'H2': h2_frac / total,
-        'CH4': ch4_frac / total,
-        'CO2': co2_frac / total,
-        'Tar': tar_frac / total
-    }
+    comp = np.empty(T_celsius.shape, dtype=GAS_DTYPE)
+    for name, frac in zip(GAS_SPECIES, (co_frac, h2_frac, ch4_frac, co2_frac, tar_frac)):
+        comp[name] = frac / total
+    return comp
+
+
+def syngas_hhv(comp):
+    """Mass-weighted HHV (MJ/kg) of a syngas_composition() array."""
+    return sum(comp[name] * hhv for name, hhv in GAS_HHV.items())
 
 
 # =============================================================================
@@ -69,37 +93,58 @@ def oc_ratio(T_celsius, hold_time_hours=1.0):
       - O:C > 0.6  → < 100 years
     
     Higher temperatures and longer hold times drive off more oxygen.
+    Arguments broadcast.
     """
     # Base O:C decreases exponentially with temperature
-    oc_base = 0.55 * np.exp(-0.004 * (T_celsius - 300))
+    oc_base = 0.55 * np.exp(-0.004 * (np.asarray(T_celsius, dtype=float) - 300))
     
     # Hold time further reduces O:C (logarithmic effect)
-    time_factor = 1.0 - 0.05 * np.log(max(hold_time_hours, 0.1))
+    time_factor = 1.0 - 0.05 * np.log(np.maximum(hold_time_hours, 0.1))
     
-    return max(0.02, oc_base * time_factor)
+    return np.maximum(0.02, oc_base * time_factor)
+
+
+def min_temperature_for_oc(oc_target=0.2, hold_time_hours=1.0, T_bounds=(350.0, 700.0),
+                           xtol=1e-6):
+    """
+    Lowest pyrolysis temperature (°C) reaching O:C = oc_target, solved to
+    xtol with the shared bracketed solver; vectorized over targets and hold
+    times. Returns T_bounds[0] where the target is already met there and
+    NaN where it is not reached within T_bounds.
+    """
+    lo, hi = T_bounds
+    result = inverse_query(lambda T: oc_ratio(T, hold_time_hours), oc_target, lo, hi, xtol=xtol)
+    already = np.broadcast_to(oc_ratio(lo, hold_time_hours) < oc_target, result['x'].shape)
+    return np.where(already, lo, result['x'])
+
+
+def biochar_yield(T_celsius):
+    """Solid carbon recovery (fraction of feedstock mass)."""
+    return np.maximum(0.20, 0.60 - 0.00075 * np.asarray(T_celsius, dtype=float))
 
 
 # =============================================================================
 # 3. Energy Balance: Self-Sustaining Check
 # =============================================================================
-def energy_balance(T_celsius, feedstock_mass_kg=10.0):
+def energy_balance(T_celsius, feedstock_mass_kg=10.0, comp=None):
     """
     Checks whether the thermal energy released by combusting the syngas
     is sufficient to sustain the endothermic pyrolysis reaction.
+    Arguments broadcast; pass a precomputed syngas_composition() as comp
+    to avoid evaluating it twice.
     
     Returns (syngas_energy_MJ, pyrolysis_demand_MJ, is_self_sustaining)
     """
+    T_celsius = np.asarray(T_celsius, dtype=float)
+
     # Volatile fraction decreases with temperature
     volatile_fraction = 0.70 - 0.0005 * (T_celsius - 300)
     volatile_mass = feedstock_mass_kg * volatile_fraction
     
     # Average HHV of pyrolysis syngas: ~8-12 MJ/kg 
-    syngas = syngas_composition(T_celsius)
-    # Weighted HHV (MJ/kg): CO=10.1, H2=120, CH4=55.5, CO2=0, Tar=20
-    hhv_mix = (syngas['CO'] * 10.1 + syngas['H2'] * 120.0 + 
-               syngas['CH4'] * 55.5 + syngas['Tar'] * 20.0)
-    
-    syngas_energy = volatile_mass * hhv_mix
+    if comp is None:
+        comp = syngas_composition(T_celsius)
+    syngas_energy = volatile_mass * syngas_hhv(comp)
     
     # Endothermic pyrolysis demand: ~1.5-2.5 MJ/kg biomass
     pyrolysis_demand = feedstock_mass_kg * (1.5 + 0.003 * (T_celsius - 300))
@@ -108,35 +153,123 @@ def energy_balance(T_celsius, feedstock_mass_kg=10.0):
 
 
 # =============================================================================
-# 4. Simulation Runner
+# 4. Design Surface (Temperature × Hold Time × Feedstock Mass)
+# =============================================================================
+def pyrolysis_design_surface(temps_C=None, hold_times_h=None, feedstock_masses_kg=None,
+                             oc_target=0.2):
+    """
+    Evaluates O:C, syngas energy, pyrolysis demand and biochar mass on the
+    full T × hold × mass grid in one broadcast pass (syngas composition is
+    computed once per temperature) and flags the design region where the
+    biochar reaches O:C < oc_target AND the syngas sustains the reactor.
+
+    Both energies scale linearly with the feedstock mass, so the feasible
+    region is the same for every batch size; the mass axis sizes the energy
+    surplus and the biochar output.
+
+    Returns a dict with the axes, 3D arrays indexed [T, hold, mass]
+    ('oc_ratio', 'syngas_energy_MJ', 'demand_MJ', 'surplus_MJ',
+    'biochar_kg', 'feasible'), and 'min_feasible_T_C' per hold time
+    (NaN where no grid temperature qualifies).
+    """
+    T = np.linspace(350, 700, 351) if temps_C is None else np.asarray(temps_C, float)
+    hold = np.linspace(0.25, 4.0, 76) if hold_times_h is None else np.asarray(hold_times_h, float)
+    mass = (np.linspace(1.0, 50.0, 50) if feedstock_masses_kg is None
+            else np.asarray(feedstock_masses_kg, float))
+
+    shape = (len(T), len(hold), len(mass))
+    comp = syngas_composition(T)
+    oc = np.broadcast_to(oc_ratio(T[:, None, None], hold[None, :, None]), shape)
+    syngas_e, demand, sustaining = (
+        np.broadcast_to(a, shape) for a in energy_balance(T[:, None, None], mass[None, None, :],
+                                                          comp=comp[:, None, None]))
+    feasible = (oc < oc_target) & sustaining
+
+    min_feasible_T, _ = first_feasible(T, feasible.any(axis=2))
+    return {
+        'temps_C': T, 'hold_times_h': hold, 'feedstock_masses_kg': mass,
+        'composition': comp,
+        'oc_ratio': oc, 'syngas_energy_MJ': syngas_e, 'demand_MJ': demand,
+        'surplus_MJ': syngas_e - demand,
+        'biochar_kg': biochar_yield(T)[:, None, None] * mass[None, None, :],
+        'feasible': feasible,
+        'min_feasible_T_C': min_feasible_T,
+    }
+
+
+def run_pyrolysis_surface():
+    """Computes the T × hold × mass surface, prints the design window and plots maps."""
+    surface = pyrolysis_design_surface()
+    T, hold, mass = surface['temps_C'], surface['hold_times_h'], surface['feedstock_masses_kg']
+    i_mass = np.argmin(np.abs(mass - 10.0))
+
+    print("=" * 70)
+    print("  SYMBIOTIC FACTORY DIGITAL TWIN — Pyrolysis Design Surface (TERRE)")
+    print("=" * 70)
+    print(f"  Grid:                     {len(T)} T × {len(hold)} hold × {len(mass)} mass "
+          f"= {surface['feasible'].size:,} points")
+    print(f"  Feasible (O:C < 0.2 & self-sustaining): {surface['feasible'].mean()*100:.1f}% of grid")
+    print(f"\n  {'Hold (h)':>9s} {'min T (°C)':>11s}")
+    for j in np.linspace(0, len(hold) - 1, 6).astype(int):
+        print(f"  {hold[j]:9.2f} {surface['min_feasible_T_C'][j]:11.0f}")
+    print("=" * 70)
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    fig.suptitle('Symbiotic Factory — Pyrolysis Design Surface (T × Hold × Feedstock)',
+                 fontsize=14, fontweight='bold')
+
+    im = axes[0].pcolormesh(hold, T, surface['oc_ratio'][:, :, i_mass], shading='auto',
+                            cmap='viridis_r')
+    axes[0].contour(hold, T, surface['feasible'][:, :, i_mass].astype(float), levels=[0.5],
+                    colors='w', linewidths=2)
+    axes[0].plot(hold, surface['min_feasible_T_C'], 'w--', linewidth=1,
+                 label='Min T (O:C < 0.2, self-sustaining)')
+    axes[0].set_xlabel('Hold Time (h)')
+    axes[0].set_ylabel('Pyrolysis Temperature (°C)')
+    axes[0].set_title('Biochar O:C Ratio and Feasible Region')
+    axes[0].legend(loc='upper right')
+    fig.colorbar(im, ax=axes[0], label='O:C atomic ratio')
+
+    i_hold = np.argmin(np.abs(hold - 1.0))
+    im = axes[1].pcolormesh(mass, T, surface['surplus_MJ'][:, i_hold, :], shading='auto',
+                            cmap='YlGn')
+    axes[1].contour(mass, T, surface['feasible'][:, i_hold, :].astype(float), levels=[0.5],
+                    colors='k', linewidths=2)
+    axes[1].set_xlabel('Feedstock Mass (kg)')
+    axes[1].set_ylabel('Pyrolysis Temperature (°C)')
+    axes[1].set_title(f'Syngas Energy Surplus (hold {hold[i_hold]:.1f} h)')
+    fig.colorbar(im, ax=axes[1], label='Syngas energy − demand (MJ)')
+
+    plt.tight_layout()
+    plt.savefig('pyrolysis_design_surface.png', dpi=150)
+    plt.close(fig)
+    print(f"\n  📊 Report saved to: pyrolysis_design_surface.png")
+
+    return surface
+
+
+# =============================================================================
+# 5. Simulation Runner
 # =============================================================================
 def run_pyrolysis_simulation():
     temps = np.linspace(350, 700, 200)
     hold_time = 1.0  # hours
     
-    oc_ratios = [oc_ratio(t, hold_time) for t in temps]
-    
-    syngas_profiles = {
-        'CO': [], 'H2': [], 'CH4': [], 'CO2': [], 'Tar': []
-    }
-    for t in temps:
-        comp = syngas_composition(t)
-        for key in syngas_profiles:
-            syngas_profiles[key].append(comp[key] * 100)
-    
-    energies = [energy_balance(t) for t in temps]
-    syngas_e = [e[0] for e in energies]
-    pyro_d = [e[1] for e in energies]
+    oc_ratios = oc_ratio(temps, hold_time)
+    comp = syngas_composition(temps)
+    syngas_profiles = {key: comp[key] * 100 for key in GAS_SPECIES}
+    syngas_e, pyro_d, _ = energy_balance(temps, comp=comp)
     
     # Find minimum temperature for O:C < 0.2
-    target_temps = [t for t, oc in zip(temps, oc_ratios) if oc < 0.2]
-    min_temp_for_pac = target_temps[0] if target_temps else float('inf')
+    min_temp_for_pac = float(min_temperature_for_oc(0.2, hold_time))
+    if np.isnan(min_temp_for_pac):
+        min_temp_for_pac = float('inf')
     
     print("=" * 70)
     print("  SYMBIOTIC FACTORY DIGITAL TWIN — Pyrolysis Kinetics (TERRE)")
     print("=" * 70)
     print(f"  Hold Time:                {hold_time:.1f} hours")
-    print(f"  Min Temp for O:C < 0.2:   {min_temp_for_pac:.0f} °C")
+    print(f"  Min Temp for O:C < 0.2:   {min_temp_for_pac:.1f} °C")
     print(f"  O:C at 500°C:             {oc_ratio(500, hold_time):.3f}")
     print(f"  O:C at 600°C:             {oc_ratio(600, hold_time):.3f}")
     ss_500 = energy_balance(500)
@@ -175,7 +308,7 @@ def run_pyrolysis_simulation():
     axes[1, 0].plot(temps, syngas_e, 'g-', linewidth=2, label='Syngas Energy (Output)')
     axes[1, 0].plot(temps, pyro_d, 'r--', linewidth=2, label='Pyrolysis Demand (Input)')
     axes[1, 0].fill_between(temps, pyro_d, syngas_e,
-                             where=[s > p for s, p in zip(syngas_e, pyro_d)],
+                             where=syngas_e > pyro_d,
                              alpha=0.2, color='green', label='Self-Sustaining Zone')
     axes[1, 0].set_xlabel('Pyrolysis Temperature (°C)')
     axes[1, 0].set_ylabel('Energy (MJ per 10 kg feedstock)')
@@ -184,7 +317,7 @@ def run_pyrolysis_simulation():
     axes[1, 0].grid(True, alpha=0.3)
     
     # Plot 4: Biochar Yield
-    char_yields = [max(0.20, 0.60 - 0.00075 * t) * 100 for t in temps]
+    char_yields = biochar_yield(temps) * 100
     axes[1, 1].plot(temps, char_yields, 'brown', linewidth=2)
     axes[1, 1].set_xlabel('Pyrolysis Temperature (°C)')
     axes[1, 1].set_ylabel('Biochar Yield (%)')
@@ -199,4 +332,7 @@ def run_pyrolysis_simulation():
 
 
 if __name__ == '__main__':
-    run_pyrolysis_simulation()
+    if '--surface' in sys.argv:
+        run_pyrolysis_surface()
+    else:
+        run_pyrolysis_simulation()
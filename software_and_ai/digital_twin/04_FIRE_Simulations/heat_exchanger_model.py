@@ -13,15 +13,101 @@ Target: > 85% thermal recovery efficiency.
 Usage: python heat_exchanger_model.py
 """
 
+import sys
+import time
+from pathlib import Path
+
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from inverse_solver import inverse_query
+
 
 # =============================================================================
 # Counter-Current Heat Exchanger Model (ε-NTU Method)
 # =============================================================================
+def counterflow_effectiveness(NTU, C_r):
+    """ε-NTU relation for counter-current flow (C_r = 1 uses the limit NTU/(1+NTU))."""
+    NTU, C_r = np.asarray(NTU, dtype=float), np.asarray(C_r, dtype=float)
+    balanced = np.abs(C_r - 1.0) < 1e-10
+    # expm1 form: no cancellation as C_r → 1, so only the exact limit needs a branch
+    decay = np.expm1(-NTU * (1 - C_r))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        general = -decay / ((1 - C_r) - C_r * decay)
+    return np.where(balanced, NTU / (1 + NTU), general)
+
+
+HX_DTYPE = np.dtype([(name, 'f8') for name in (
+    'epsilon', 'NTU', 'C_r', 'Q_actual_W', 'Q_max_W',
+    'T_hot_out', 'T_cold_out', 'LMTD', 'area_m2', 'recovery_pct')])
+
+HX_DEFAULTS = {
+    'T_hot_in': 300.0, 'T_cold_in': 25.0,
+    'm_dot_hot': 0.01, 'm_dot_cold': 0.01,
+    'cp_hot': 3800.0, 'cp_cold': 4186.0,
+    'U': 150.0, 'tube_length': 2.0, 'tube_od': 0.025,
+}
+
+
+def evaluate_exchangers(**design):
+    """
+    ε-NTU evaluation of a whole batch of economizer designs in one pass.
+
+    design holds CounterCurrentHeatExchanger keyword arguments as scalars or
+    arrays; they broadcast against each other, so open grids such as
+    tube_length=L[:, None], U=U[None, :] give a full L × U table. Missing
+    arguments take the class defaults.
+
+    Returns a structured array (HX_DTYPE, broadcast shape) with the same
+    fields as CounterCurrentHeatExchanger.compute().
+    """
+    unknown = set(design) - set(HX_DEFAULTS)
+    if unknown:
+        raise TypeError(f"Unknown design arguments: {sorted(unknown)}")
+    values = np.broadcast_arrays(*(np.asarray(design.get(name, default), dtype=float)
+                                   for name, default in HX_DEFAULTS.items()))
+    (T_hot_in, T_cold_in, m_dot_hot, m_dot_cold, cp_hot, cp_cold,
+     U, L, d_o) = values
+
+    # Heat capacity rates
+    C_hot = m_dot_hot * cp_hot    # W/K
+    C_cold = m_dot_cold * cp_cold
+    C_min = np.minimum(C_hot, C_cold)
+    C_r = C_min / np.maximum(C_hot, C_cold)
+
+    area = np.pi * d_o * L
+    NTU = U * area / C_min
+    epsilon = counterflow_effectiveness(NTU, C_r)
+
+    Q_max = C_min * (T_hot_in - T_cold_in)
+    Q_actual = epsilon * Q_max
+    T_hot_out = T_hot_in - Q_actual / C_hot
+    T_cold_out = T_cold_in + Q_actual / C_cold
+
+    # Log-Mean Temperature Difference (equal end differences → dT1)
+    dT1 = T_hot_in - T_cold_out
+    dT2 = T_hot_out - T_cold_in
+    equal = np.abs(dT1 - dT2) < 0.01
+    with np.errstate(divide='ignore', invalid='ignore'):
+        LMTD = np.where(equal, dT1, (dT1 - dT2) / np.log(dT1 / dT2))
+
+    out = np.empty(C_min.shape, dtype=HX_DTYPE)
+    out['epsilon'] = epsilon
+    out['NTU'] = NTU
+    out['C_r'] = C_r
+    out['Q_actual_W'] = Q_actual
+    out['Q_max_W'] = Q_max
+    out['T_hot_out'] = T_hot_out
+    out['T_cold_out'] = T_cold_out
+    out['LMTD'] = LMTD
+    out['area_m2'] = area
+    out['recovery_pct'] = epsilon * 100
+    return out
+
+
 class CounterCurrentHeatExchanger:
     """
     ε-NTU method for a concentric tube counter-current heat exchanger.
@@ -52,54 +138,34 @@ class CounterCurrentHeatExchanger:
         self.d_o = tube_od
 
     def compute(self):
-        # Heat capacity rates
-        C_hot = self.m_dot_hot * self.cp_hot    # W/K
-        C_cold = self.m_dot_cold * self.cp_cold
-        C_min = min(C_hot, C_cold)
-        C_max = max(C_hot, C_cold)
-        C_r = C_min / C_max  # Capacity ratio
-
-        # Heat transfer area
-        A = np.pi * self.d_o * self.L  # m²
-
-        # Number of Transfer Units
-        NTU = self.U * A / C_min
-
-        # ε-NTU for counter-current flow
-        if abs(C_r - 1.0) < 1e-10:
-            epsilon = NTU / (1 + NTU)
-        else:
-            epsilon = (1 - np.exp(-NTU * (1 - C_r))) / \
-                      (1 - C_r * np.exp(-NTU * (1 - C_r)))
-
-        # Maximum possible heat transfer
-        Q_max = C_min * (self.T_hot_in - self.T_cold_in)
-        Q_actual = epsilon * Q_max
-
-        # Outlet temperatures
-        T_hot_out = self.T_hot_in - Q_actual / C_hot
-        T_cold_out = self.T_cold_in + Q_actual / C_cold
-
-        # Log-Mean Temperature Difference
-        dT1 = self.T_hot_in - T_cold_out
-        dT2 = T_hot_out - self.T_cold_in
-        if abs(dT1 - dT2) < 0.01:
-            LMTD = dT1
-        else:
-            LMTD = (dT1 - dT2) / np.log(dT1 / dT2)
-
-        return {
-            'epsilon': epsilon,
-            'NTU': NTU,
-            'C_r': C_r,
-            'Q_actual_W': Q_actual,
-            'Q_max_W': Q_max,
-            'T_hot_out': T_hot_out,
-            'T_cold_out': T_cold_out,
-            'LMTD': LMTD,
-            'area_m2': A,
-            'recovery_pct': epsilon * 100
-        }
+        result = evaluate_exchangers(
+            T_hot_in=self.T_hot_in, T_cold_in=self.T_cold_in,
+            m_dot_hot=self.m_dot_hot, m_dot_cold=self.m_dot_cold,
+            cp_hot=self.cp_hot, cp_cold=self.cp_cold,
+            U=self.U, tube_length=self.L, tube_od=self.d_o)
+        return {name: float(result[name]) for name in HX_DTYPE.names}
+
+
+def min_tube_length(target_recovery_pct=85.0, L_bounds=(0.1, 100.0), **design):
+    """
+    Shortest tube (m) reaching target_recovery_pct, solved with the shared
+    bracketed solver. design holds CounterCurrentHeatExchanger keyword
+    arguments (scalars or arrays, broadcast into a batch of designs).
+    Returns L_bounds[0] where the target is already met there and NaN where
+    it is not reached within L_bounds.
+    """
+    hx = CounterCurrentHeatExchanger(**design)
+    C_hot = hx.m_dot_hot * hx.cp_hot
+    C_cold = hx.m_dot_cold * hx.cp_cold
+    C_min, C_max = np.minimum(C_hot, C_cold), np.maximum(C_hot, C_cold)
+
+    def recovery_pct(L):
+        return counterflow_effectiveness(hx.U * np.pi * hx.d_o * L / C_min, C_min / C_max) * 100
+
+    lo, hi = L_bounds
+    result = inverse_query(recovery_pct, target_recovery_pct, lo, hi)
+    already = np.broadcast_to(recovery_pct(lo) >= target_recovery_pct, result['x'].shape)
+    return np.where(already, lo, result['x'])
 
 
 def run_simulation():
@@ -124,36 +190,48 @@ def run_simulation():
 
     # Sweep tube length to find minimum length for 85% recovery
     lengths = np.linspace(0.5, 10.0, 200)
-    recoveries = []
-    for L in lengths:
-        hx_sweep = CounterCurrentHeatExchanger(tube_length=L)
-        r = hx_sweep.compute()
-        recoveries.append(r['recovery_pct'])
+    recoveries = evaluate_exchangers(tube_length=lengths)['recovery_pct']
 
-    target_idx = next((i for i, r in enumerate(recoveries) if r >= 85.0), None)
-    min_length = lengths[target_idx] if target_idx else float('inf')
+    min_length = float(min_tube_length(85.0))
+    if np.isnan(min_length):
+        min_length = float('inf')
 
-    # Sweep U coefficient  
+    # Sweep U coefficient
     u_values = np.linspace(50, 500, 200)
-    recoveries_u = []
-    for u in u_values:
-        hx_u = CounterCurrentHeatExchanger(U=u)
-        r = hx_u.compute()
-        recoveries_u.append(r['recovery_pct'])
+    recoveries_u = evaluate_exchangers(U=u_values)['recovery_pct']
+
+    # Economizer design grid: length × U × tube OD in a single pass
+    grid_L = np.linspace(0.5, 20.0, 120)
+    grid_U = np.linspace(50, 500, 100)
+    grid_od = np.array([0.019, 0.025, 0.032, 0.038])
+    t0 = time.perf_counter()
+    grid = evaluate_exchangers(tube_length=grid_L[:, None, None],
+                               U=grid_U[None, :, None],
+                               tube_od=grid_od[None, None, :])
+    grid_ms = (time.perf_counter() - t0) * 1e3
+    feasible = grid['recovery_pct'] >= 85.0
+    area = np.where(feasible, grid['area_m2'], np.inf)
+    best = np.unravel_index(np.argmin(area), area.shape)
 
     print(f"\n  --- Optimization Results ---")
     print(f"  Min tube length for 85%: {min_length:.2f} m")
     print(f"  Recovery at L=5m:        {recoveries[np.argmin(np.abs(lengths-5.0))]:.1f}%")
+    print(f"\n  --- Design Grid (L × U × OD = {grid.size:,} designs, {grid_ms:.1f} ms) ---")
+    print(f"  Designs reaching 85%:    {feasible.sum():,} ({feasible.mean() * 100:.0f}%)")
+    if feasible.any():
+        print(f"  Smallest area:           {grid['area_m2'][best]:.3f} m² "
+              f"(L={grid_L[best[0]]:.1f} m, U={grid_U[best[1]]:.0f}, "
+              f"OD={grid_od[best[2]] * 1e3:.0f} mm)")
     print("=" * 70)
 
     # Generate plots
-    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    fig, axes = plt.subplots(1, 3, figsize=(20, 5))
     fig.suptitle('FIRE Module — Counter-Current Heat Exchanger Optimization',
                  fontsize=14, fontweight='bold')
 
     axes[0].plot(lengths, recoveries, 'r-', linewidth=2)
     axes[0].axhline(y=85, color='g', linestyle='--', alpha=0.7, label='85% target')
-    if target_idx:
+    if min_length <= lengths[-1]:
         axes[0].axvline(x=min_length, color='b', linestyle=':', alpha=0.7,
                         label=f'Min L = {min_length:.1f} m')
     axes[0].set_xlabel('Tube Length (m)')
@@ -170,6 +248,16 @@ def run_simulation():
     axes[1].legend()
     axes[1].grid(True, alpha=0.3)
 
+    k = int(np.argmin(np.abs(grid_od - 0.025)))
+    cs = axes[2].contourf(grid_L, grid_U, grid['recovery_pct'][:, :, k].T,
+                          levels=20, cmap='inferno')
+    axes[2].contour(grid_L, grid_U, grid['recovery_pct'][:, :, k].T,
+                    levels=[85.0], colors='lime', linewidths=2)
+    axes[2].set_xlabel('Tube Length (m)')
+    axes[2].set_ylabel('Overall U (W/(m²·K))')
+    axes[2].set_title(f'Recovery Map (OD = {grid_od[k] * 1e3:.0f} mm, green = 85%)')
+    fig.colorbar(cs, ax=axes[2], label='Thermal Recovery (%)')
+
     plt.tight_layout()
     plt.savefig('heat_exchanger_report.png', dpi=150)
     print(f"\n  📊 Report saved to: heat_exchanger_report.png")
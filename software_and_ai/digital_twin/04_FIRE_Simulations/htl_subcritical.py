@@ -10,36 +10,48 @@ subcritical water during Hydrothermal Liquefaction (HTL). It calculates:
   2. The Arrhenius depolymerization kinetics of wet algal biomass
   3. The predicted Higher Heating Value (HHV) of the resulting bio-crude
 
+Because the feedstock's activation energy is uncertain and the hold time is
+set by the reactor's throughput, --surface maps the reactor set point over
+both: for each (hold time, Ea) it reports the temperature maximizing
+conversion × HHV and the cooler "knee" temperature that gets within 5 % of it.
+
 Usage:
-    python htl_subcritical.py
+    python htl_subcritical.py              # 1D temperature scan at 30 min
+    python htl_subcritical.py --surface    # T × hold × Ea operating surface
 """
 
+import sys
+from pathlib import Path
+
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import water_properties
+from inverse_solver import first_feasible
+
+# Reactor pressure: keeps water liquid over the whole 200–370°C sweep
+HTL_PRESSURE_MPA = 25.0
+
 
 # =============================================================================
 # 1. Subcritical Water Dielectric Constant Model
 # =============================================================================
-def dielectric_constant(T_celsius):
+def dielectric_constant(T_celsius, P_MPa=HTL_PRESSURE_MPA):
     """
-    Calculates the static relative permittivity (dielectric constant) of water
-    as a function of temperature using the Uematsu & Franck empirical correlation.
-    
+    Static relative permittivity (dielectric constant) of liquid water,
+    looked up in the shared water property tables (Uematsu & Franck
+    ε_r(T, ρ) on the compressed-liquid density, see water_properties.py).
+
     At 25°C:  ε_r ≈ 78.4 (highly polar, dissolves salts)
     At 300°C: ε_r ≈ 20   (non-polar, acts like acetone/benzene)
-    
+
     This phase shift is the entire thermodynamic basis of HTL.
     """
-    T_K = T_celsius + 273.15
-    T_ref = 298.15
-    t_r = T_K / T_ref
-    
-    # Simplified polynomial fit (Uematsu & Franck, J. Phys. Chem. Ref. Data, 1980)
-    epsilon_r = 87.74 - 40.0 * (t_r - 1) + 9.39 * (t_r - 1)**2 - 1.41 * (t_r - 1)**3
-    return max(epsilon_r, 2.0)  # Physical floor (steam at critical point)
+    return water_properties.dielectric_constant(T_celsius, P_MPa)
 
 
 # =============================================================================
@@ -65,14 +77,14 @@ def arrhenius_rate(T_celsius, Ea=75000.0, A=1e8):
     return A * np.exp(-Ea / (R * T_K))
 
 
-def biocrude_conversion(T_celsius, hold_time_s):
+def biocrude_conversion(T_celsius, hold_time_s, Ea=75000.0, A=1e8):
     """
     Predicts the fractional conversion of wet algal biomass into bio-crude
     using a first-order kinetic model.
     
         X = 1 - exp(-k * t)
     """
-    k = arrhenius_rate(T_celsius)
+    k = arrhenius_rate(T_celsius, Ea, A)
     return 1.0 - np.exp(-k * hold_time_s)
 
 
@@ -91,11 +103,105 @@ def predict_hhv(T_celsius):
     """
     # Linear fit from experimental literature (Toor et al., 2011; Biller & Ross, 2011)
     hhv = 28.0 + 0.035 * (T_celsius - 200.0)
-    return min(hhv, 39.0)  # Physical cap
+    return np.minimum(hhv, 39.0)  # Physical cap
+
+
+# =============================================================================
+# 4. Operating Surface (Temperature × Hold Time × Activation Energy)
+# =============================================================================
+def htl_operating_surface(temps_C=None, hold_times_s=None, activation_energies=None,
+                          A=1e8, knee_fraction=0.95):
+    """
+    Evaluates conversion and the energy density score (conversion × HHV) on
+    the full T × hold × Ea grid in one broadcast pass, and extracts the
+    optimal operating surface over (hold time, Ea):
+
+      optimal_T_C  — temperature maximizing the score
+      knee_T_C     — lowest temperature reaching knee_fraction of that
+                     maximum (the score rises monotonically towards the hot
+                     end of the grid, so this is the practical set point)
+
+    Returns a dict with the axes, the 3D 'conversion' and 'score' arrays
+    (indexed [T, hold, Ea]), and the 2D optimal/knee surfaces (T, score and
+    conversion at each set point).
+    """
+    T = np.linspace(200, 370, 200) if temps_C is None else np.asarray(temps_C, float)
+    t = np.linspace(60, 7200, 120) if hold_times_s is None else np.asarray(hold_times_s, float)
+    Ea = (np.linspace(60e3, 160e3, 51) if activation_energies is None
+          else np.asarray(activation_energies, float))
+
+    conversion = biocrude_conversion(T[:, None, None], t[None, :, None], Ea[None, None, :], A)
+    hhv = predict_hhv(T)
+    score = conversion * hhv[:, None, None]
+
+    best = score.argmax(axis=0)
+    best_score = score.max(axis=0)
+    # The maximum itself qualifies, so every (hold, Ea) has a knee
+    knee_T, knee = first_feasible(T, score >= knee_fraction * best_score)
+    hold_idx, ea_idx = np.indices(best.shape)
+    return {
+        'temps_C': T, 'hold_times_s': t, 'activation_energies': Ea,
+        'hhv': hhv, 'conversion': conversion, 'score': score,
+        'optimal_T_C': T[best], 'optimal_score': best_score,
+        'optimal_conversion': conversion[best, hold_idx, ea_idx],
+        'knee_T_C': knee_T, 'knee_score': score[knee, hold_idx, ea_idx],
+        'knee_conversion': conversion[knee, hold_idx, ea_idx],
+    }
+
+
+def run_htl_surface():
+    """Computes the T × hold × Ea surface, prints set points and plots maps."""
+    surface = htl_operating_surface()
+    T, t, Ea = surface['temps_C'], surface['hold_times_s'], surface['activation_energies']
+    i_ea = np.argmin(np.abs(Ea - 75000.0))
+    i_hold = np.argmin(np.abs(t - 1800.0))
+
+    print("=" * 70)
+    print("  SYMBIOTIC FACTORY DIGITAL TWIN — HTL Operating Surface")
+    print("=" * 70)
+    print(f"  Grid:                   {len(T)} T × {len(t)} hold × {len(Ea)} Ea "
+          f"= {surface['score'].size:,} points")
+    print(f"\n  {'Ea (kJ/mol)':>12s} {'knee T @30min':>14s} {'score':>7s} {'conversion':>11s}")
+    for j in np.linspace(0, len(Ea) - 1, 6).astype(int):
+        print(f"  {Ea[j]/1000:12.0f} {surface['knee_T_C'][i_hold, j]:12.1f}°C "
+              f"{surface['knee_score'][i_hold, j]:7.2f} "
+              f"{surface['knee_conversion'][i_hold, j]*100:10.1f}%")
+    print("=" * 70)
+
+    fig, axes = plt.subplots(1, 3, figsize=(20, 6))
+    fig.suptitle('Symbiotic Factory — HTL Operating Surface (T × Hold × Ea)',
+                 fontsize=14, fontweight='bold')
+
+    im = axes[0].pcolormesh(t / 60, T, surface['score'][:, :, i_ea], shading='auto', cmap='viridis')
+    axes[0].plot(t / 60, surface['knee_T_C'][:, i_ea], 'w--', linewidth=2, label='95% knee')
+    axes[0].set_xlabel('Hold Time (min)')
+    axes[0].set_ylabel('Temperature (°C)')
+    axes[0].set_title(f'Energy Density Score (Ea = {Ea[i_ea]/1000:.0f} kJ/mol)')
+    axes[0].legend()
+    fig.colorbar(im, ax=axes[0], label='Conversion × HHV (MJ/kg)')
+
+    im = axes[1].pcolormesh(t / 60, Ea / 1000, surface['knee_T_C'].T, shading='auto', cmap='inferno')
+    axes[1].set_xlabel('Hold Time (min)')
+    axes[1].set_ylabel('Activation Energy (kJ/mol)')
+    axes[1].set_title('Knee Set Point Temperature')
+    fig.colorbar(im, ax=axes[1], label='T (°C)')
+
+    im = axes[2].pcolormesh(t / 60, Ea / 1000, surface['knee_score'].T, shading='auto', cmap='viridis')
+    axes[2].set_xlabel('Hold Time (min)')
+    axes[2].set_ylabel('Activation Energy (kJ/mol)')
+    axes[2].set_title('Score at Knee Set Point')
+    fig.colorbar(im, ax=axes[2], label='Conversion × HHV (MJ/kg)')
+
+    plt.tight_layout()
+    plt.savefig('htl_operating_surface.png', dpi=150)
+    plt.close(fig)
+    print(f"\n  📊 Report saved to: htl_operating_surface.png")
+
+    return surface
 
 
 # =============================================================================
-# 4. Simulation Runner
+# 5. Simulation Runner
 # =============================================================================
 def run_htl_simulation():
     """
@@ -108,13 +214,13 @@ def run_htl_simulation():
     hold_time = 1800  # 30 minutes
 
     # Calculate profiles
-    dielectrics = [dielectric_constant(t) for t in temps]
-    rates = [arrhenius_rate(t) for t in temps]
-    conversions = [biocrude_conversion(t, hold_time) for t in temps]
-    hhvs = [predict_hhv(t) for t in temps]
+    dielectrics = dielectric_constant(temps)
+    rates = arrhenius_rate(temps)
+    conversions = biocrude_conversion(temps, hold_time)
+    hhvs = predict_hhv(temps)
 
     # Find optimal temperature (maximum crude yield × HHV)
-    energy_densities = [c * h for c, h in zip(conversions, hhvs)]
+    energy_densities = conversions * hhvs
     optimal_idx = np.argmax(energy_densities)
     optimal_T = temps[optimal_idx]
 
@@ -150,7 +256,7 @@ def run_htl_simulation():
     axes[0, 1].grid(True, alpha=0.3)
 
     # Plot 3: Bio-crude Conversion
-    axes[1, 0].plot(temps, [c * 100 for c in conversions], 'g-', linewidth=2)
+    axes[1, 0].plot(temps, conversions * 100, 'g-', linewidth=2)
     axes[1, 0].axvline(x=optimal_T, color='orange', linestyle='--', alpha=0.7,
                         label=f'Optimal: {optimal_T:.0f}°C')
     axes[1, 0].set_xlabel('Temperature (°C)')
@@ -174,4 +280,7 @@ def run_htl_simulation():
 
 
 if __name__ == '__main__':
-    run_htl_simulation()
+    if '--surface' in sys.argv:
+        run_htl_surface()
+    else:
+        run_htl_simulation()
@@ -0,0 +1,342 @@
+"""
+Symbiotic Factory Digital Twin — Segmented Counter-Current Economizer
+=====================================================================
+Module: 04_FIRE_Simulations / segmented_economizer.py
+License: GNU GPLv3
+
+heat_exchanger_model.py sizes the economizer with the ε-NTU method: one cp
+per stream and one U over the whole 25 → 300 °C span. At HTL pressure the
+heat capacity of water rises by ~25 % between the cold and hot ends and its
+viscosity falls tenfold, so both the capacity rates and the film
+coefficients vary strongly along the tube.
+
+This model splits the tube into N segments. Each segment balances
+
+    C_h,k (T_h,k − T_h,k+1) = UA_k (T̄_h,k − T̄_c,k) = C_c,k (T_c,k − T_c,k+1)
+
+with the mean temperatures T̄ of the segment ends (second order in N), the
+hot stream entering at x = 0 and the cold stream at x = L. cp is read from
+the shared water property tables (water_properties.py) blended with the
+oil/solids fraction of each stream; the local U combines two film
+coefficients scaled by Dittus–Boelter at constant mass flux,
+h ∝ cp^0.4 μ^-0.4.
+
+The node temperatures of a whole batch of geometries are interleaved
+(T_h,0, T_c,0, T_h,1, ...) so the stacked system is banded with two
+sub- and super-diagonals; each Picard update of the properties is a single
+solve_banded call for every geometry at once.
+
+Usage:
+    python segmented_economizer.py           # size the HTL economizer
+    python segmented_economizer.py --verify  # constant properties vs ε-NTU
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy.linalg import solve_banded
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, str(Path(__file__).parent))
+import water_properties
+from heat_exchanger_model import evaluate_exchangers
+from htl_subcritical import HTL_PRESSURE_MPA
+
+
+# =============================================================================
+# 1. Local Stream Properties
+# =============================================================================
+def liquid_viscosity(T_celsius):
+    """Dynamic viscosity of liquid water (Pa·s), Vogel form valid to ~370 °C."""
+    return 2.414e-5 * 10.0 ** (247.8 / (np.asarray(T_celsius, dtype=float) + 133.15))
+
+
+class SegmentedEconomizer:
+    """
+    Segmented tube-in-tube economizer with temperature-dependent properties.
+
+    Hot side: HTL effluent (water + bio-crude) at P_MPa
+    Cold side: wet algal slurry pumped to P_MPa before pre-heating
+
+    h_hot_ref and h_cold_ref are the film coefficients at T_ref_C; the
+    defaults give U = 150 W/(m²·K) there, the ε-NTU baseline.
+    """
+
+    def __init__(self,
+                 n_segments=40,
+                 P_MPa=HTL_PRESSURE_MPA,
+                 hot_water_fraction=0.85,   # rest is bio-crude
+                 cp_oil=2200.0,             # J/(kg·K)
+                 cold_water_fraction=0.90,  # rest is algal solids
+                 cp_solids=1500.0,          # J/(kg·K)
+                 h_hot_ref=300.0,           # W/(m²·K)
+                 h_cold_ref=300.0,          # W/(m²·K)
+                 T_ref_C=160.0,
+                 ):
+        self.n = n_segments
+        self.P = P_MPa
+        self.w_hot, self.cp_oil = hot_water_fraction, cp_oil
+        self.w_cold, self.cp_solids = cold_water_fraction, cp_solids
+        self.h_hot_ref, self.h_cold_ref = h_hot_ref, h_cold_ref
+        self.T_ref = T_ref_C
+        self._cp_ref = water_properties.specific_heat(T_ref_C, P_MPa)
+        self._mu_ref = liquid_viscosity(T_ref_C)
+
+    def cp_hot(self, T_celsius, cp_water=None):
+        """cp of the effluent (J/(kg·K)): water from the tables + bio-crude."""
+        if cp_water is None:
+            cp_water = water_properties.specific_heat(T_celsius, self.P)
+        return self.w_hot * cp_water + (1 - self.w_hot) * self.cp_oil
+
+    def cp_cold(self, T_celsius, cp_water=None):
+        """cp of the slurry (J/(kg·K)): water from the tables + algal solids."""
+        if cp_water is None:
+            cp_water = water_properties.specific_heat(T_celsius, self.P)
+        return self.w_cold * cp_water + (1 - self.w_cold) * self.cp_solids
+
+    def _film(self, h_ref, T_celsius, cp_water):
+        """Dittus–Boelter scaling of a film coefficient at constant mass flux."""
+        return (h_ref * (cp_water / self._cp_ref) ** 0.4
+                * (self._mu_ref / liquid_viscosity(T_celsius)) ** 0.4)
+
+    def local_properties(self, T_hot, T_cold):
+        """
+        (cp_hot, cp_cold, U) at local stream temperatures, with one table
+        lookup per stream; U (W/(m²·K)) combines the two film coefficients.
+        """
+        cp_wh = water_properties.specific_heat(T_hot, self.P)
+        cp_wc = water_properties.specific_heat(T_cold, self.P)
+        U = 1.0 / (1.0 / self._film(self.h_hot_ref, T_hot, cp_wh)
+                   + 1.0 / self._film(self.h_cold_ref, T_cold, cp_wc))
+        return self.cp_hot(T_hot, cp_wh), self.cp_cold(T_cold, cp_wc), U
+
+    def max_duty(self, m_dot_hot, m_dot_cold, T_hot_in, T_cold_in, n_quad=64):
+        """Q_max (W): the smaller of the two enthalpy changes over [T_cold_in, T_hot_in]."""
+        s = (np.arange(n_quad) + 0.5) / n_quad
+        T = T_cold_in[..., None] + (T_hot_in - T_cold_in)[..., None] * s
+        span = T_hot_in - T_cold_in
+        return np.minimum(m_dot_hot * self.cp_hot(T).mean(axis=-1) * span,
+                          m_dot_cold * self.cp_cold(T).mean(axis=-1) * span)
+
+    # =========================================================================
+    # 2. Banded Assembly and Solve
+    # =========================================================================
+    def _assemble(self, C_h, C_c, g):
+        """
+        Band storage (5, B·2(n+1)) of the interleaved segment balances.
+        C_h, C_c: (B, n) segment capacity rates; g: (B, n) UA_k / 2.
+        """
+        B, n = C_h.shape
+        ab = np.zeros((5, B, 2 * (n + 1)))
+        k = 2 * np.arange(n)
+        # Hot balance of segment k on row 2k+2, ab[2 + row - col, col]
+        ab[4, :, k] = (C_h - g).T
+        ab[3, :, k + 1] = g.T
+        ab[2, :, k + 2] = (-C_h - g).T
+        ab[1, :, k + 3] = g.T
+        # Cold balance of segment k on row 2k+1
+        ab[3, :, k] = -g.T
+        ab[2, :, k + 1] = (C_c + g).T
+        ab[1, :, k + 2] = -g.T
+        ab[0, :, k + 3] = (-C_c + g).T
+        # Inlet conditions: T_h,0 (row 0) and T_c,n (last row)
+        ab[2, :, 0] = 1.0
+        ab[2, :, -1] = 1.0
+        return ab.reshape(5, -1)
+
+    def solve(self, tube_length=14.7, tube_od=0.025, m_dot_hot=0.01, m_dot_cold=0.01,
+              T_hot_in=300.0, T_cold_in=25.0, constant_properties=None,
+              tol=1e-4, max_iter=30):
+        """
+        Temperature profiles of a batch of economizers (arguments broadcast).
+
+        constant_properties=(cp_hot, cp_cold, U) freezes the properties, which
+        reproduces the ε-NTU model as the segments are refined.
+
+        Returns a dict with 'x' (n+1,), 'T_hot'/'T_cold' (..., n+1), 'U'
+        (..., n) segment coefficients, 'Q_W', 'Q_max_W', 'recovery_pct',
+        'T_hot_out', 'T_cold_out' and 'iterations' (Picard sweeps).
+        """
+        values = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in
+                                       (tube_length, tube_od, m_dot_hot, m_dot_cold,
+                                        T_hot_in, T_cold_in)))
+        shape = values[0].shape
+        L, d_o, m_h, m_c, Th_in, Tc_in = (v.ravel() for v in values)
+        B, n = L.size, self.n
+        dA = (np.pi * d_o * L / n)[:, None]
+
+        rhs = np.zeros((B, 2 * (n + 1)))
+        rhs[:, 0] = Th_in
+        rhs[:, -1] = Tc_in
+        rhs = rhs.ravel()
+
+        # Start from both streams at the mean inlet temperature
+        T_h = np.repeat(((Th_in + Tc_in) / 2)[:, None], n + 1, axis=1)
+        T_c = T_h.copy()
+        for iteration in range(1, max_iter + 1):
+            Tm_h = (T_h[:, 1:] + T_h[:, :-1]) / 2
+            Tm_c = (T_c[:, 1:] + T_c[:, :-1]) / 2
+            if constant_properties is None:
+                cp_h, cp_c, U = self.local_properties(Tm_h, Tm_c)
+                C_h, C_c = m_h[:, None] * cp_h, m_c[:, None] * cp_c
+            else:
+                cp_h, cp_c, U_fixed = constant_properties
+                C_h = np.broadcast_to(m_h[:, None] * cp_h, Tm_h.shape)
+                C_c = np.broadcast_to(m_c[:, None] * cp_c, Tm_c.shape)
+                U = np.full(Tm_h.shape, float(U_fixed))
+
+            z = solve_banded((2, 2), self._assemble(C_h, C_c, U * dA / 2), rhs,
+                             check_finite=False).reshape(B, n + 1, 2)
+            change = max(np.abs(z[..., 0] - T_h).max(), np.abs(z[..., 1] - T_c).max())
+            T_h, T_c = z[..., 0], z[..., 1]
+            if change < tol or constant_properties is not None:
+                break
+
+        Q = (C_h * (T_h[:, :-1] - T_h[:, 1:])).sum(axis=1)
+        if constant_properties is None:
+            Q_max = self.max_duty(m_h, m_c, Th_in, Tc_in)
+        else:
+            Q_max = np.minimum(m_h * cp_h, m_c * cp_c) * (Th_in - Tc_in)
+        return {
+            'x': np.linspace(0.0, 1.0, n + 1),
+            'T_hot': T_h.reshape(shape + (n + 1,)),
+            'T_cold': T_c.reshape(shape + (n + 1,)),
+            'U': U.reshape(shape + (n,)),
+            'Q_W': Q.reshape(shape),
+            'Q_max_W': Q_max.reshape(shape),
+            'recovery_pct': (Q / Q_max * 100).reshape(shape),
+            'T_hot_out': T_h[:, -1].reshape(shape),
+            'T_cold_out': T_c[:, 0].reshape(shape),
+            'iterations': iteration,
+        }
+
+
+# =============================================================================
+# 3. Verification and Sizing Report
+# =============================================================================
+def verify_against_ntu(segments=(10, 20, 40, 80)):
+    """
+    Max |Δ recovery| (percentage points) between the constant-property
+    segmented model and the ε-NTU evaluator over a batch of geometries,
+    for each segment count (the error falls as 1/N²).
+    """
+    lengths = np.linspace(0.5, 30.0, 50)[:, None]
+    ods = np.array([0.019, 0.025, 0.038])
+    exact = evaluate_exchangers(tube_length=lengths, tube_od=ods)['recovery_pct']
+    errors = {}
+    for n in segments:
+        seg = SegmentedEconomizer(n_segments=n).solve(
+            tube_length=lengths, tube_od=ods, constant_properties=(3800.0, 4186.0, 150.0))
+        errors[n] = float(np.abs(seg['recovery_pct'] - exact).max())
+    return errors
+
+
+def run_economizer_sizing(n_segments=40):
+    """
+    Sizes the HTL economizer over a length × OD × flow grid with the
+    segmented model and compares it with the constant-property ε-NTU sizing.
+    """
+    econ = SegmentedEconomizer(n_segments=n_segments)
+    lengths = np.linspace(0.5, 40.0, 160)
+    ods = np.array([0.019, 0.025, 0.032, 0.038])
+    flows = np.array([0.008, 0.010, 0.012])
+
+    start = time.perf_counter()
+    grid = econ.solve(tube_length=lengths[:, None, None], tube_od=ods[None, :, None],
+                      m_dot_hot=flows[None, None, :], m_dot_cold=flows[None, None, :])
+    grid_s = time.perf_counter() - start
+    ntu = evaluate_exchangers(tube_length=lengths[:, None, None], tube_od=ods[None, :, None],
+                              m_dot_hot=flows[None, None, :],
+                              m_dot_cold=flows[None, None, :])['recovery_pct']
+
+    def min_length(recovery):
+        """Shortest grid length reaching 85 % (linear interpolation, NaN if never)."""
+        ok = recovery >= 85.0
+        i = np.argmax(ok, axis=0)
+        prev = np.maximum(i - 1, 0)
+        r0 = np.take_along_axis(recovery, prev[None], 0)[0]
+        r1 = np.take_along_axis(recovery, i[None], 0)[0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frac = np.where(i > 0, (85.0 - r0) / (r1 - r0), 0.0)
+        L = lengths[prev] + frac * (lengths[i] - lengths[prev])
+        return np.where(ok.any(axis=0), L, np.nan)
+
+    L_seg, L_ntu = min_length(grid['recovery_pct']), min_length(ntu)
+    k_od, k_flow = int(np.argmin(np.abs(ods - 0.025))), int(np.argmin(np.abs(flows - 0.010)))
+    design = econ.solve(tube_length=L_seg[k_od, k_flow])
+    U_mean = design['U'].mean()
+
+    print("=" * 70)
+    print("  SYMBIOTIC FACTORY DIGITAL TWIN — Segmented HTL Economizer")
+    print("=" * 70)
+    print(f"  Streams:                300 °C effluent ⇄ 25 °C slurry at {econ.P:g} MPa")
+    print(f"  Grid:                   {lengths.size} L × {ods.size} OD × {flows.size} flows "
+          f"= {grid['Q_W'].size:,} geometries, {n_segments} segments")
+    print(f"  Batch solve:            {grid['iterations']} Picard sweeps, {grid_s * 1e3:.0f} ms")
+    print(f"\n  --- 85% Recovery at OD 25 mm, 0.010 kg/s ---")
+    print(f"  ε-NTU (constant props): L = {L_ntu[k_od, k_flow]:.2f} m")
+    print(f"  Segmented (local props): L = {L_seg[k_od, k_flow]:.2f} m")
+    print(f"  Local U range:          {design['U'].min():.0f} – {design['U'].max():.0f} W/(m²·K) "
+          f"(mean {U_mean:.0f})")
+    print(f"  Outlets:                hot {design['T_hot_out']:.1f} °C, "
+          f"cold {design['T_cold_out']:.1f} °C")
+    print(f"\n  {'OD (mm)':>8s} " + " ".join(f"{'L @ ' + format(f, '.3f') + ' kg/s':>16s}" for f in flows))
+    for a, od in enumerate(ods):
+        print(f"  {od * 1e3:8.0f} " + " ".join(f"{L:14.2f} m" for L in L_seg[a]))
+    print("=" * 70)
+
+    fig, axes = plt.subplots(1, 3, figsize=(20, 5))
+    fig.suptitle('FIRE Module — Segmented Economizer with Local Water Properties',
+                 fontsize=14, fontweight='bold')
+
+    x = design['x'] * L_seg[k_od, k_flow]
+    const = econ.solve(tube_length=L_seg[k_od, k_flow],
+                       constant_properties=(3800.0, 4186.0, 150.0))
+    axes[0].plot(x, design['T_hot'], 'r-', linewidth=2, label='Hot (local props)')
+    axes[0].plot(x, design['T_cold'], 'b-', linewidth=2, label='Cold (local props)')
+    axes[0].plot(x, const['T_hot'], 'r--', alpha=0.6, label='Hot (ε-NTU props)')
+    axes[0].plot(x, const['T_cold'], 'b--', alpha=0.6, label='Cold (ε-NTU props)')
+    axes[0].set_xlabel('Position along tube (m)')
+    axes[0].set_ylabel('Temperature (°C)')
+    axes[0].set_title('Stream Profiles at the Sizing Length')
+    axes[0].legend()
+    axes[0].grid(True, alpha=0.3)
+
+    xm = (x[1:] + x[:-1]) / 2
+    axes[1].plot(xm, design['U'], 'k-', linewidth=2, label='Local U')
+    axes[1].axhline(y=150, color='k', linestyle=':', alpha=0.6, label='ε-NTU U')
+    axes[1].set_xlabel('Position along tube (m)')
+    axes[1].set_ylabel('U (W/(m²·K))')
+    axes[1].set_title('Local Heat Transfer Coefficient')
+    axes[1].legend()
+    axes[1].grid(True, alpha=0.3)
+
+    axes[2].plot(lengths, grid['recovery_pct'][:, k_od, k_flow], 'm-', linewidth=2,
+                 label='Segmented')
+    axes[2].plot(lengths, ntu[:, k_od, k_flow], 'm--', alpha=0.6, label='ε-NTU')
+    axes[2].axhline(y=85, color='g', linestyle='--', alpha=0.7, label='85% target')
+    axes[2].set_xlabel('Tube Length (m)')
+    axes[2].set_ylabel('Thermal Recovery (%)')
+    axes[2].set_title('Recovery vs. Tube Length (OD 25 mm)')
+    axes[2].legend()
+    axes[2].grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig('segmented_economizer.png', dpi=150)
+    plt.close(fig)
+    print(f"\n  📊 Report saved to: segmented_economizer.png")
+
+    return {'lengths_m': lengths, 'tube_od_m': ods, 'flows_kg_s': flows,
+            'recovery_pct': grid['recovery_pct'], 'min_length_m': L_seg}
+
+
+if __name__ == '__main__':
+    if '--verify' in sys.argv:
+        for n, err in verify_against_ntu().items():
+            print(f"  {n:4d} segments: max |Δ recovery| vs ε-NTU = {err:.2e} %-points")
+    else:
+        run_economizer_sizing()
@@ -0,0 +1,348 @@
+"""
+Symbiotic Factory Digital Twin — Subcritical Water Property Tables
+==================================================================
+Module: 04_FIRE_Simulations / water_properties.py
+License: GNU GPLv3
+
+Shared property backend for the hot-water side of the factory (HTL
+reactor, economizer). Liquid water from 0 to 370 °C, from saturation up to
+35 MPa above it:
+
+  P_sat(T)    Wagner & Pruss (1993) saturation pressure
+  ρ_sat(T)    Wagner & Pruss (1993) saturated-liquid density
+  ρ(T, P)     Tait compression of ρ_sat, fitted to IAPWS-95
+              (within 0.1 % to 350 °C, 0.4 % at 370 °C)
+  ε_r(T, ρ)   Uematsu & Franck (1980) static dielectric constant
+  cp(T, P)    cv(T) + T·α²/(ρ·κ_T) from the density model, with cv(T)
+              fitted to IAPWS-95 (2 % to 300 °C, 6 % to 350 °C; indicative
+              only in the near-critical 350–370 °C band)
+  Kw(T, ρ)    Bandura & Lvov (2006) ionic product (IAPWS R11-07)
+
+States below the saturation pressure (steam) are evaluated as saturated
+liquid: callers that must stay liquid check is_compressed_liquid().
+
+The correlations are evaluated once on a dense (T, P − P_sat) grid; it is
+cached on disk as .npz (keyed by a hash of this file and the grid spec) and
+served by vectorized bilinear lookups, so property calls inside sweeps cost
+a handful of array operations regardless of the correlation behind them.
+The cache lives in $SYMBIOTIC_WATER_TABLE_DIR, else the user cache
+directory; setting the variable to an empty string (or an unwritable
+directory) keeps the tables in memory only.
+
+The module needs only NumPy (matplotlib is imported by the report), so the
+edge models in software_and_ai/ai_predictive_models import it directly.
+
+Usage:
+    python water_properties.py     # build/load the tables, check and plot
+"""
+
+import hashlib
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+
+T_CRIT_K = 647.096   # K
+P_CRIT_MPA = 22.064  # MPa
+RHO_CRIT = 322.0     # kg/m³
+
+PROPERTIES = ('epsilon_r', 'density', 'cp', 'pKw')
+TABLE_DIR_ENV = 'SYMBIOTIC_WATER_TABLE_DIR'
+
+
+# =============================================================================
+# 1. Correlations (direct evaluation)
+# =============================================================================
+def saturation_pressure(T_celsius):
+    """Vapour pressure of water (MPa), Wagner & Pruss (1993)."""
+    T_K = np.asarray(T_celsius, dtype=float) + 273.15
+    tau = 1.0 - T_K / T_CRIT_K
+    a = (-7.85951783, 1.84408259, -11.7866497, 22.6807411, -15.9618719, 1.80122502)
+    n = (1.0, 1.5, 3.0, 3.5, 4.0, 7.5)
+    return P_CRIT_MPA * np.exp(T_CRIT_K / T_K * sum(ai * tau ** ni for ai, ni in zip(a, n)))
+
+
+def saturated_liquid_density(T_celsius):
+    """Density of saturated liquid water (kg/m³), Wagner & Pruss (1993)."""
+    tau = 1.0 - (np.asarray(T_celsius, dtype=float) + 273.15) / T_CRIT_K
+    b = (1.99274064, 1.09965342, -0.510839303, -1.75493479, -45.5170352, -6.74694450e5)
+    n = (1 / 3, 2 / 3, 5 / 3, 16 / 3, 43 / 3, 110 / 3)
+    return RHO_CRIT * (1.0 + sum(bi * tau ** ni for bi, ni in zip(b, n)))
+
+
+def is_compressed_liquid(T_celsius, P_MPa):
+    """True where (T, P) is liquid: below the critical point and above P_sat."""
+    T_celsius = np.asarray(T_celsius, dtype=float)
+    return (T_celsius + 273.15 < T_CRIT_K) & (np.asarray(P_MPa) >= saturation_pressure(T_celsius))
+
+
+# Tait compression  ρ = ρ_sat / (1 − C ln(1 + (P − P_sat)/B)),  B and C in τ = 1 − T/Tc
+_TAIT_B = (0.720171707, 11.2775331, 1061.48366, 2744.78286, -6744.48322)  # exponent, poly
+_TAIT_C = (0.0709962983, 0.340103376, -0.545701785)
+# Isochoric heat capacity of the liquid (kJ/(kg·K)), cubic in T/100 °C
+_CV_POLY = (0.04493599, -0.16767978, -0.27025973, 4.14820751)
+
+
+def liquid_density(T_celsius, P_MPa):
+    """Compressed-liquid density (kg/m³); P below P_sat is read as P_sat."""
+    T_celsius = np.asarray(T_celsius, dtype=float)
+    tau = 1.0 - (T_celsius + 273.15) / T_CRIT_K
+    p_sat = saturation_pressure(T_celsius)
+    dp = np.maximum(np.asarray(P_MPa, dtype=float) - p_sat, 0.0)
+    B = tau ** _TAIT_B[0] * np.polyval(_TAIT_B[:0:-1], tau)
+    C = np.polyval(_TAIT_C[::-1], tau)
+    return saturated_liquid_density(T_celsius) / (1.0 - C * np.log1p(dp / B))
+
+
+def dielectric_from_density(T_celsius, density):
+    """Static relative permittivity ε_r(T, ρ), Uematsu & Franck (1980)."""
+    A = (7.62571, 244.003, -140.569, 27.7841, -96.2805, 41.7909, -10.2099,
+         -45.2059, 84.6395, -35.8644)
+    t = (np.asarray(T_celsius, dtype=float) + 273.15) / 298.15
+    r = np.asarray(density) / 1000.0
+    return (1.0 + A[0] / t * r
+            + (A[1] / t + A[2] + A[3] * t) * r ** 2
+            + (A[4] / t + A[5] * t + A[6] * t ** 2) * r ** 3
+            + (A[7] / t ** 2 + A[8] / t + A[9]) * r ** 4)
+
+
+def heat_capacity(T_celsius, P_MPa, dT=0.01, dP=1e-3):
+    """
+    Isobaric heat capacity (J/(kg·K)) as cv(T) + T·α²/(ρ·κ_T), with the
+    expansivity α and compressibility κ_T taken from liquid_density by
+    central differences.
+    """
+    T_celsius = np.asarray(T_celsius, dtype=float)
+    P = np.maximum(np.asarray(P_MPa, dtype=float), saturation_pressure(T_celsius) + dP)
+    rho = liquid_density(T_celsius, P)
+    alpha = -(liquid_density(T_celsius + dT, P) - liquid_density(T_celsius - dT, P)) / (2 * dT * rho)
+    kappa = (liquid_density(T_celsius, P + dP) - liquid_density(T_celsius, P - dP)) / (2 * dP * 1e6 * rho)
+    cv = np.polyval(_CV_POLY, T_celsius / 100.0) * 1000.0
+    return cv + (T_celsius + 273.15) * alpha ** 2 / (rho * kappa)
+
+
+def ionic_product_pKw(T_celsius, density):
+    """pKw = −log10(Kw / (mol/kg)²), Bandura & Lvov (2006)."""
+    T_K = np.asarray(T_celsius, dtype=float) + 273.15
+    rho = np.asarray(density) / 1000.0  # g/cm³
+    Q = rho * np.exp(-0.864671 + 8659.19 / T_K - 22786.2 / T_K ** 2 * rho ** (2 / 3))
+    pkw_gas = 0.61415 + 48251.33 / T_K - 67707.93 / T_K ** 2 + 10102100.0 / T_K ** 3
+    return (-12.0 * (np.log10(1.0 + Q) - Q / (Q + 1.0) * rho
+                     * (0.642044 - 56.8534 / T_K - 0.375754 * rho))
+            + pkw_gas + 2.0 * np.log10(18.015268 / 1000.0))
+
+
+def evaluate_properties(T_celsius, P_MPa):
+    """Direct evaluation of every tabulated property; returns {name: array}."""
+    rho = liquid_density(T_celsius, P_MPa)
+    return {
+        'epsilon_r': dielectric_from_density(T_celsius, rho),
+        'density': rho,
+        'cp': heat_capacity(T_celsius, P_MPa),
+        'pKw': ionic_product_pKw(T_celsius, rho),
+    }
+
+
+# =============================================================================
+# 2. Cached (T, P) Tables with Bilinear Lookup
+# =============================================================================
+def default_table_dir():
+    """
+    Table cache directory: $SYMBIOTIC_WATER_TABLE_DIR when set (an empty
+    value disables disk caching and returns None), else
+    $XDG_CACHE_HOME (or ~/.cache)/symbiotic_factory/water_properties.
+    """
+    if TABLE_DIR_ENV in os.environ:
+        return Path(os.environ[TABLE_DIR_ENV]) if os.environ[TABLE_DIR_ENV] else None
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'symbiotic_factory' / 'water_properties'
+
+
+class WaterPropertyTable:
+    """
+    Dense (T, P − P_sat) tables of PROPERTIES.
+
+    The pressure axis is the subcooling pressure P − P_sat(T), so the
+    saturation line is a grid edge and no cell straddles it, spaced
+    uniformly in u = ln(1 + (P − P_sat)/dP_scale) to resolve the steep
+    near-critical cp just above saturation; P_sat itself is tabulated along
+    T. The tables are loaded from table_dir (default: default_table_dir())
+    when a file for this grid and module version exists, otherwise built and
+    saved there; with persist=False, no usable directory or a failed write
+    they stay in memory only (path is None). Lookups outside the grid are
+    clamped to its edges.
+    """
+
+    def __init__(self, T_range_C=(0.0, 370.0), dP_max_MPa=35.0, dT=0.25, n_pressure=401,
+                 dP_scale=0.01, table_dir=None, persist=True):
+        self.T_grid = np.linspace(*T_range_C, int(round((T_range_C[1] - T_range_C[0]) / dT)) + 1)
+        self.dT = self.T_grid[1] - self.T_grid[0]
+        self.dP_scale = dP_scale
+        self.u_grid = np.linspace(0.0, np.log1p(dP_max_MPa / dP_scale), n_pressure)
+        self.du = self.u_grid[1] - self.u_grid[0]
+        self.dP_grid = dP_scale * np.expm1(self.u_grid)
+
+        h = hashlib.sha256(Path(__file__).read_bytes())
+        h.update(np.concatenate([self.T_grid, self.dP_grid]).tobytes())
+        table_dir = default_table_dir() if table_dir is None else Path(table_dir)
+        self.path = (table_dir / f"water_tables_{h.hexdigest()[:16]}.npz"
+                     if persist and table_dir is not None else None)
+        self.build_time_s = None
+        if self.path is not None and self.path.exists():
+            with np.load(self.path) as data:
+                self.p_sat = data['p_sat']
+                self.tables = {name: data[name] for name in PROPERTIES}
+        else:
+            self._build()
+            if self.path is not None:
+                self._save()
+
+    def _build(self):
+        start = time.perf_counter()
+        self.p_sat = saturation_pressure(self.T_grid)
+        T = self.T_grid[:, None]
+        self.tables = evaluate_properties(T, self.p_sat[:, None] + self.dP_grid)
+        self.build_time_s = time.perf_counter() - start
+
+    def _save(self):
+        """
+        Writes the tables atomically (concurrent builders simply race); on a
+        read-only or full disk the tables are kept in memory instead.
+        """
+        staging = self.path.with_name(f".{self.path.stem}.{time.time_ns()}.tmp.npz")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(staging, p_sat=self.p_sat, **self.tables)
+            staging.replace(self.path)
+        except OSError:
+            staging.unlink(missing_ok=True)
+            self.path = None
+
+    def _stencil(self, T_celsius, P_MPa):
+        """Cell indices and bilinear weights of (T, P); P below P_sat reads as P_sat."""
+        T, P = np.broadcast_arrays(np.asarray(T_celsius, dtype=float),
+                                   np.asarray(P_MPa, dtype=float))
+        x = (np.clip(T, self.T_grid[0], self.T_grid[-1]) - self.T_grid[0]) / self.dT
+        i = np.minimum(x.astype(np.intp), len(self.T_grid) - 2)
+        fx = x - i
+        p_sat = self.p_sat[i] * (1 - fx) + self.p_sat[i + 1] * fx
+        y = np.log1p(np.clip(P - p_sat, 0.0, self.dP_grid[-1]) / self.dP_scale) / self.du
+        j = np.minimum(y.astype(np.intp), len(self.u_grid) - 2)
+        return i, j, fx, y - j
+
+    @staticmethod
+    def _interpolate(g, i, j, fx, fy):
+        return ((g[i, j] * (1 - fx) + g[i + 1, j] * fx) * (1 - fy)
+                + (g[i, j + 1] * (1 - fx) + g[i + 1, j + 1] * fx) * fy)
+
+    def lookup(self, name, T_celsius, P_MPa):
+        """Bilinear interpolation of one property; T and P broadcast."""
+        return self._interpolate(self.tables[name], *self._stencil(T_celsius, P_MPa))
+
+    def properties(self, T_celsius, P_MPa, names=PROPERTIES):
+        """{name: lookup} for several properties, sharing one stencil."""
+        stencil = self._stencil(T_celsius, P_MPa)
+        return {name: self._interpolate(self.tables[name], *stencil) for name in names}
+
+
+@lru_cache(maxsize=None)
+def default_table():
+    """The process-wide default table (built or loaded on first use)."""
+    return WaterPropertyTable()
+
+
+def dielectric_constant(T_celsius, P_MPa):
+    """ε_r of liquid water from the default table."""
+    return default_table().lookup('epsilon_r', T_celsius, P_MPa)
+
+
+def density(T_celsius, P_MPa):
+    """ρ (kg/m³) of liquid water from the default table."""
+    return default_table().lookup('density', T_celsius, P_MPa)
+
+
+def specific_heat(T_celsius, P_MPa):
+    """cp (J/(kg·K)) of liquid water from the default table."""
+    return default_table().lookup('cp', T_celsius, P_MPa)
+
+
+def ionic_product(T_celsius, P_MPa):
+    """Kw ((mol/kg)²) of liquid water from the default table."""
+    return 10.0 ** -default_table().lookup('pKw', T_celsius, P_MPa)
+
+
+# =============================================================================
+# 3. Self-Check and Report
+# =============================================================================
+def run_water_properties(n_check=1_000_000, seed=0):
+    """
+    Builds or loads the default table, times vectorized lookups against the
+    direct correlations on random liquid states, and plots the properties.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    table = default_table()
+    load_s = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    T = rng.uniform(0.0, 370.0, n_check)
+    P = rng.uniform(saturation_pressure(T), 35.0)
+
+    start = time.perf_counter()
+    direct = evaluate_properties(T, P)
+    direct_s = time.perf_counter() - start
+    start = time.perf_counter()
+    looked_up = table.properties(T, P)
+    lookup_s = time.perf_counter() - start
+
+    print("=" * 70)
+    print("  SYMBIOTIC FACTORY DIGITAL TWIN — Subcritical Water Property Tables")
+    print("=" * 70)
+    print(f"  Grid:                   {len(table.T_grid)} T × {len(table.dP_grid)} (P − P_sat), "
+          f"ΔT = {table.dT:g} °C, log-spaced pressure")
+    print(f"  Table file:             {table.path or 'in memory'} "
+          + (f"(built in {table.build_time_s:.2f} s)" if table.build_time_s is not None
+             else f"(loaded in {load_s:.3f} s)"))
+    print(f"  {n_check:,} states:       direct {direct_s:.2f} s, lookup {lookup_s:.2f} s")
+    print(f"\n  {'Property':10s} {'max |rel. interpolation error|':>32s}")
+    for name in PROPERTIES:
+        err = np.abs(looked_up[name] / direct[name] - 1.0)
+        print(f"  {name:10s} {err.max():32.2e}")
+    print(f"\n  At 300 °C / 15 MPa:     ε_r = {dielectric_constant(300.0, 15.0):.1f}, "
+          f"ρ = {density(300.0, 15.0):.0f} kg/m³, cp = {specific_heat(300.0, 15.0):.0f} J/(kg·K), "
+          f"pKw = {-np.log10(ionic_product(300.0, 15.0)):.2f}")
+    print("=" * 70)
+
+    temps = np.linspace(0.0, 370.0, 741)
+    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    fig.suptitle('Symbiotic Factory — Subcritical Water Properties', fontsize=14, fontweight='bold')
+    panels = (('epsilon_r', 'Dielectric Constant ε_r', 1.0),
+              ('density', 'Density (kg/m³)', 1.0),
+              ('cp', 'Heat Capacity cp (kJ/(kg·K))', 1e-3),
+              ('pKw', 'pKw', 1.0))
+    for ax, (name, label, scale) in zip(axes.ravel(), panels):
+        for p in (5.0, 15.0, 25.0, 35.0):
+            liquid = is_compressed_liquid(temps, p)
+            ax.plot(temps[liquid], table.lookup(name, temps[liquid], p) * scale,
+                    linewidth=2, label=f'{p:g} MPa')
+        ax.set_xlabel('Temperature (°C)')
+        ax.set_ylabel(label)
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+    axes[1, 0].set_ylim(top=12)
+
+    plt.tight_layout()
+    plt.savefig('water_properties_report.png', dpi=150)
+    plt.close(fig)
+    print(f"\n  📊 Report saved to: water_properties_report.png")
+    return table
+
+
+if __name__ == '__main__':
+    run_water_properties()
@@ -0,0 +1,39 @@
+"""
+Symbiotic Factory — Digital Twin Command-Line Options
+======================================================
+`--name value` option lookup shared by the simulation runners.
+
+The runners take a handful of flags (`'--flag' in sys.argv`) and typed
+options; cli_option() returns an option's value converted to the type of
+its default. A missing or malformed value is a usage error (exit status 2,
+as with argparse) rather than a silent fallback to the default.
+"""
+
+import sys
+from pathlib import Path
+
+
+def cli_option(name, default, argv=None):
+    """
+    Value following `name` in argv (default: sys.argv[1:]), converted to
+    type(default); `default` when the option is absent. Exits with a usage
+    error when the option has no value (end of the command line or another
+    `--option` next) or the value does not convert.
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if name not in argv:
+        return default
+
+    index = argv.index(name)
+    if index + 1 >= len(argv) or argv[index + 1].startswith('--'):
+        _usage_error(f"option {name} expects a value")
+    value = argv[index + 1]
+    try:
+        return type(default)(value)
+    except ValueError:
+        _usage_error(f"option {name}: invalid {type(default).__name__} value '{value}'")
+
+
+def _usage_error(message):
+    print(f"{Path(sys.argv[0]).name}: error: {message}", file=sys.stderr)
+    sys.exit(2)
@@ -0,0 +1,131 @@
+"""
+Symbiotic Factory — Digital Twin Inverse Design-Target Solver
+==============================================================
+Vectorized bracketed root finding shared by the simulation modules.
+
+Design targets such as "the minimum pyrolysis temperature for O:C < 0.2" or
+"the tube length giving 85 % recovery" are roots of f(x) − target on a
+bracket [lo, hi]. find_root() solves many of them at once: f is called with
+an array of abscissae (one per problem) and every problem advances through
+Chandrupatla's method (a Brent-class hybrid of bisection and inverse
+quadratic interpolation that only needs one evaluation per step and
+vectorizes cleanly). Typical targets converge to 1e-10 in 10–30 calls of f.
+
+Modules expose thin wrappers, e.g. pyrolysis_kinetics.min_temperature_for_oc,
+heat_exchanger_model.min_tube_length, capillary_wicking.balanced_pore_radius.
+
+Design surfaces ask the same question of a sampled grid instead of a
+bracket: first_feasible() returns the lowest (or highest) grid value whose
+feasibility mask is set, for every point of the remaining axes.
+"""
+
+import numpy as np
+
+
+def find_root(f, lo, hi, xtol=1e-12, rtol=1e-10, max_iter=100, log_scale=False):
+    """
+    Finds x in [lo, hi] with f(x) = 0 for every problem of a batch.
+
+    f maps an array x to f(x); the batch shape is the broadcast of lo, hi
+    and f(lo), so scalar brackets work with array-valued parameters. Each
+    problem needs a sign change over its bracket.
+    With log_scale=True the search runs in log(x) (brackets spanning
+    decades, e.g. pore radii); xtol then applies to log(x).
+
+    Returns a dict with 'x' (NaN where the bracket holds no sign change),
+    'f_x', 'bracketed', 'converged', 'iterations' (per problem) and
+    'evaluations' (calls of f).
+    """
+    lo, hi = np.broadcast_arrays(np.asarray(lo, dtype=float), np.asarray(hi, dtype=float))
+    if log_scale:
+        g = lambda u: f(np.exp(u))
+        lo, hi = np.log(lo), np.log(hi)
+    else:
+        g = f
+
+    # The batch shape also follows f (scalar brackets, array parameters)
+    fb, fa = np.asarray(g(lo), dtype=float), np.asarray(g(hi), dtype=float)
+    shape = np.broadcast_shapes(lo.shape, fa.shape, fb.shape)
+    b, a, fb, fa = (np.broadcast_to(v, shape).copy() for v in (lo, hi, fb, fa))
+    evaluations = 2
+    bracketed = (np.sign(fa) != np.sign(fb)) | (fa == 0) | (fb == 0)
+    c, fc = a.copy(), fa.copy()
+    t = np.full(a.shape, 0.5)
+    xm = np.where(np.abs(fa) < np.abs(fb), a, b)
+    fm = np.where(np.abs(fa) < np.abs(fb), fa, fb)
+    active = bracketed & (fm != 0)
+    iterations = np.zeros(a.shape, dtype=int)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for _ in range(max_iter):
+            if not active.any():
+                break
+            xt = a + t * (b - a)
+            ft = np.asarray(g(np.where(active, xt, xm)), dtype=float)
+            evaluations += 1
+            iterations += active
+
+            same = np.sign(ft) == np.sign(fa)
+            c_new = np.where(same, a, b)
+            fc_new = np.where(same, fa, fb)
+            b_new = np.where(same, b, a)
+            fb_new = np.where(same, fb, fa)
+            c, fc = np.where(active, c_new, c), np.where(active, fc_new, fc)
+            b, fb = np.where(active, b_new, b), np.where(active, fb_new, fb)
+            a, fa = np.where(active, xt, a), np.where(active, ft, fa)
+
+            closer = np.abs(fa) < np.abs(fb)
+            xm = np.where(active, np.where(closer, a, b), xm)
+            fm = np.where(active, np.where(closer, fa, fb), fm)
+            tol = 2 * rtol * np.abs(xm) + xtol
+            tlim = tol / np.abs(b - c)
+            active &= (fm != 0) & (tlim <= 0.5)
+
+            # Inverse quadratic interpolation when it is safe, else bisection
+            xi = (a - b) / (c - b)
+            phi = (fa - fb) / (fc - fb)
+            iqi = (phi ** 2 < xi) & ((1 - phi) ** 2 < 1 - xi)
+            t_iqi = (fa / (fb - fa) * fc / (fb - fc)
+                     + (c - a) / (b - a) * fa / (fc - fa) * fb / (fc - fb))
+            t = np.clip(np.where(iqi, t_iqi, 0.5), tlim, 1 - tlim)
+
+    x = np.where(bracketed, xm, np.nan)
+    return {
+        'x': np.exp(x) if log_scale else x,
+        'f_x': np.where(bracketed, fm, np.nan),
+        'bracketed': bracketed,
+        'converged': bracketed & ~active,
+        'iterations': iterations,
+        'evaluations': evaluations,
+    }
+
+
+def inverse_query(func, target, lo, hi, **kwargs):
+    """
+    Solves func(x) = target for every problem (target broadcasts against
+    the bracket); keyword arguments are passed to find_root.
+    """
+    lo, hi, target = np.broadcast_arrays(np.asarray(lo, dtype=float),
+                                         np.asarray(hi, dtype=float),
+                                         np.asarray(target, dtype=float))
+    return find_root(lambda x: func(x) - target, lo, hi, **kwargs)
+
+
+def first_feasible(grid, mask, last=False):
+    """
+    First grid value along axis 0 of `mask` at which the mask is True, for
+    every position on the remaining axes (last=True: the last such value).
+    `grid` holds the axis-0 coordinates.
+
+    Returns (value, index): value is NaN where the mask is False along the
+    whole axis, and index (int array) is then 0.
+    """
+    grid = np.asarray(grid, dtype=float)
+    mask = np.asarray(mask, dtype=bool)
+    found = mask.any(axis=0)
+    if last:
+        index = len(grid) - 1 - mask[::-1].argmax(axis=0)
+    else:
+        index = mask.argmax(axis=0)
+    index = np.where(found, index, 0)
+    return np.where(found, grid[index], np.nan), index
@@ -0,0 +1,148 @@
+"""
+Symbiotic Factory — Digital Twin Result Cache
+==============================================
+Content-addressed, size-bounded on-disk cache for simulation phases.
+
+Each entry is keyed by a SHA-256 hash of the phase's source code (every .py
+file in the phase's directory, so helper modules count too, plus the shared
+twin-level helpers in SHARED_SOURCES), its entry point
+and its keyword parameters. An entry stores the returned result, the console
+report and every artifact (e.g. PNG reports) the phase wrote. Least-recently
+used entries are evicted once the cache exceeds its size budget.
+
+Used by run_digital_twin.py; disable with --no-cache.
+"""
+
+import hashlib
+import json
+import pickle
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".twin_cache"
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2  # 256 MB
+# Twin-level modules imported by phase scripts
+SHARED_SOURCES = ("inverse_solver.py",)
+
+
+def _snapshot(result):
+    """
+    Returns a picklable stand-in for a phase result.
+
+    OpenMDAO Problems hold weak references and cannot be pickled, so they are
+    stored as a {promoted name: value} snapshot of all model variables.
+    """
+    try:
+        pickle.dumps(result)
+        return result
+    except Exception:
+        pass
+    model = getattr(result, 'model', None)
+    if model is not None and hasattr(model, 'list_outputs'):
+        snapshot = {}
+        for _, meta in model.list_inputs(prom_name=True, out_stream=None):
+            snapshot[meta['prom_name']] = np.copy(meta['val'])
+        for _, meta in model.list_outputs(prom_name=True, out_stream=None):
+            if not meta['prom_name'].startswith('_auto_ivc'):
+                snapshot[meta['prom_name']] = np.copy(meta['val'])
+        return snapshot
+    return None
+
+
+class ResultCache:
+    """
+    On-disk LRU cache of phase results and artifacts.
+
+    Layout: <cache_dir>/<key>/{meta.json, result.pkl, output.txt, artifacts/}
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def key(self, script, func_name, params=None):
+        """Hash of the phase's directory sources, entry point and parameters."""
+        script = Path(script)
+        h = hashlib.sha256()
+        shared = [Path(__file__).parent / name for name in SHARED_SOURCES]
+        for source in sorted(script.parent.glob("*.py")) + shared:
+            h.update(source.name.encode())
+            h.update(source.read_bytes())
+        h.update(script.name.encode())
+        h.update(func_name.encode())
+        h.update(json.dumps(params or {}, sort_keys=True, default=repr).encode())
+        h.update(f"{sys.version_info[:2]} numpy {np.__version__}".encode())
+        return h.hexdigest()
+
+    def get(self, key):
+        """
+        Returns (result, output, artifacts_dir) for a cached phase, or None.
+        A hit refreshes the entry's LRU timestamp.
+        """
+        entry = self.cache_dir / key
+        meta_path = entry / "meta.json"
+        if not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text())
+            with open(entry / "result.pkl", "rb") as f:
+                result = pickle.load(f)
+            output = (entry / "output.txt").read_text()
+        except Exception:
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        meta['last_used'] = time.time()
+        meta_path.write_text(json.dumps(meta, indent=2))
+        return result, output, entry / "artifacts"
+
+    def put(self, key, script, result, output, artifacts_dir=None):
+        """Stores a phase result, its report and the files in artifacts_dir."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = self.cache_dir / key
+        staging = self.cache_dir / f".{key}.{time.time_ns()}.tmp"
+        staging.mkdir()
+        with open(staging / "result.pkl", "wb") as f:
+            pickle.dump(_snapshot(result), f)
+        (staging / "output.txt").write_text(output)
+        if artifacts_dir is not None:
+            shutil.copytree(artifacts_dir, staging / "artifacts")
+        else:
+            (staging / "artifacts").mkdir()
+        size = sum(p.stat().st_size for p in staging.rglob("*") if p.is_file())
+        now = time.time()
+        meta = {'script': str(script), 'created': now, 'last_used': now, 'size': size}
+        (staging / "meta.json").write_text(json.dumps(meta, indent=2))
+
+        # Atomic publish: a concurrent writer of the same key simply loses.
+        shutil.rmtree(entry, ignore_errors=True)
+        try:
+            staging.rename(entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def evict(self):
+        """Removes least-recently used entries until the cache fits max_bytes."""
+        if not self.cache_dir.exists():
+            return []
+        entries = []
+        for meta_path in self.cache_dir.glob("*/meta.json"):
+            try:
+                meta = json.loads(meta_path.read_text())
+            except Exception:
+                meta = {'last_used': 0.0, 'size': 0}
+            entries.append((meta['last_used'], meta['size'], meta_path.parent))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        evicted = []
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            evicted.append(path.name)
+        return evicted
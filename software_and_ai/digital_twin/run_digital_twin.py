@@ -1,69 +1,258 @@
 """
 Symbiotic Factory — Digital Twin Master Orchestrator
 =====================================================
-Runs all simulation phases sequentially and generates a unified report.
-Usage: python run_digital_twin.py [--module SUN|WATER|TERRE|FIRE|ALL]
+Runs all simulation phases and generates a unified report.
+
+Phases declare the phases they depend on; independent phases (HTL, pyrolysis,
+Chlorella, Clostridium) run concurrently in a process pool when --jobs > 1, so
+the wall-clock time tracks the slowest phase rather than the sum of all phases.
+
+Unchanged phases are replayed from a content-addressed result cache
+(see result_cache.py) instead of being re-executed.
+
+Usage: python run_digital_twin.py [--module SUN|WATER|TERRE|FIRE|ALL] [--jobs N]
+                                  [--no-cache] [--cache-size MB]
 """
 
+import contextlib
+import io
+import os
+import pickle
+import shutil
 import sys
+import tempfile
+import time
 import importlib.util
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 
+from cli_options import cli_option
+from result_cache import DEFAULT_MAX_BYTES, ResultCache
+
 TWIN_DIR = Path(__file__).parent
 
 
+def run_entry_point(module_path, func_name, **params):
+    """Dynamically load a Python module and call one of its functions."""
+    # Register under a unique name so the module's own functions stay
+    # picklable (needed by phases that fan out to their own process pools).
+    spec = importlib.util.spec_from_file_location(f"twin_{module_path.stem}", module_path)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)
+    return getattr(mod, func_name)(**params)
+
+
 def load_and_run(module_path, func_name):
     """Dynamically load a Python module and run a function."""
-    spec = importlib.util.spec_from_file_location("mod", module_path)
-    mod = importlib.util.module_from_spec(spec)
     try:
-        spec.loader.exec_module(mod)
-        return getattr(mod, func_name)()
+        return run_entry_point(module_path, func_name)
     except Exception as e:
         print(f"  ⚠️  Skipped {module_path.name}: {e}")
         return None
 
 
+class _Tee(io.TextIOBase):
+    """Writes to several text streams at once."""
+
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, s):
+        for stream in self.streams:
+            stream.write(s)
+        return len(s)
+
+    def flush(self):
+        for stream in self.streams:
+            stream.flush()
+
+
+def _copy_tree(src, dst):
+    for path in Path(src).rglob("*"):
+        if path.is_file():
+            target = Path(dst) / path.relative_to(src)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, target)
+
+
+def load_and_run_cached(module_path, func_name, cache):
+    """
+    Like load_and_run, but replays the phase from the cache when its sources
+    are unchanged. On a miss the phase runs in a scratch directory so that the
+    files it writes can be collected as artifacts; they are then copied to the
+    working directory and stored together with the result and report.
+    Failed phases are never cached.
+    """
+    key = cache.key(module_path, func_name)
+    hit = cache.get(key)
+    if hit is not None:
+        result, output, artifacts_dir = hit
+        print(output, end="")
+        _copy_tree(artifacts_dir, Path.cwd())
+        print(f"  ♻️  Restored from cache ({key[:12]})")
+        return result
+
+    out_dir = Path.cwd()
+    phase_output = io.StringIO()
+    with tempfile.TemporaryDirectory(prefix="twin_") as scratch:
+        with contextlib.redirect_stdout(_Tee(sys.stdout, phase_output)):
+            os.chdir(scratch)
+            try:
+                result = run_entry_point(module_path, func_name)
+            except Exception as e:
+                print(f"  ⚠️  Skipped {module_path.name}: {e}")
+                return None
+            finally:
+                os.chdir(out_dir)
+        _copy_tree(scratch, out_dir)
+        cache.put(key, module_path, result, phase_output.getvalue(), scratch)
+    return result
+
+
+HTL = "04_FIRE_Simulations/htl_subcritical.py"
+PYROLYSIS = "03_TERRE_Simulations/pyrolysis_kinetics.py"
+CLOSTRIDIUM = "05_WETWARE_Simulations/clostridium_flux.py"
+CHLORELLA = "05_WETWARE_Simulations/chlorella_flux.py"
+FLOWSHEET = "00_Orchestrator/idaes_master_flowsheet.py"
+MDO = "00_Orchestrator/factory_mdo_model.py"
+
+KERNELS = [HTL, PYROLYSIS, CLOSTRIDIUM, CHLORELLA]
+
+# (title, script, entry point, --module filters, phases it must run after)
 SIMULATIONS = [
     ("Phase 3A: FIRE — HTL Subcritical Thermodynamics",
-     "04_FIRE_Simulations/htl_subcritical.py", "run_htl_simulation", ["ALL", "FIRE"]),
+     HTL, "run_htl_simulation", ["ALL", "FIRE"], []),
     ("Phase 3B: TERRE — Pyrolysis Kinetics",
-     "03_TERRE_Simulations/pyrolysis_kinetics.py", "run_pyrolysis_simulation", ["ALL", "TERRE"]),
+     PYROLYSIS, "run_pyrolysis_simulation", ["ALL", "TERRE"], []),
     ("Phase 5A: WETWARE — Clostridium Metabolic FBA",
-     "05_WETWARE_Simulations/clostridium_flux.py", "run_simulation", ["ALL", "FIRE"]),
+     CLOSTRIDIUM, "run_simulation", ["ALL", "FIRE"], []),
     ("Phase 5A: WETWARE — Chlorella Photosynthetic FBA",
-     "05_WETWARE_Simulations/chlorella_flux.py", "run_simulation", ["ALL", "WATER"]),
+     CHLORELLA, "run_simulation", ["ALL", "WATER"], []),
     ("Phase 1B: SYSTEM — IDAES Mass & Energy Flowsheet",
-     "00_Orchestrator/idaes_master_flowsheet.py", "run_master_flowsheet", ["ALL"]),
+     FLOWSHEET, "run_master_flowsheet", ["ALL"], KERNELS),
     ("Phase 1A: SYSTEM — NASA OpenMDAO MDO Optimization",
-     "00_Orchestrator/factory_mdo_model.py", "build_and_run", ["ALL"]),
+     MDO, "build_and_run", ["ALL"], KERNELS + [FLOWSHEET]),
 ]
 
 
+def run_phase(path, func, cache=None):
+    """
+    Pool worker: runs one phase with its console output captured, so that
+    concurrent phases do not interleave their reports.
+
+    Returns (result, captured_output, elapsed_seconds).
+    """
+    start = time.perf_counter()
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        if cache is None:
+            result = load_and_run(TWIN_DIR / path, func)
+        else:
+            result = load_and_run_cached(TWIN_DIR / path, func, cache)
+        try:
+            pickle.dumps(result)
+        except Exception as e:
+            print(f"  ⚠️  Result of {Path(path).name} cannot leave the worker ({e}); "
+                  f"rerun with --jobs 1 to keep it")
+            result = None
+    return result, buf.getvalue(), time.perf_counter() - start
+
+
+def ready_phases(pending, done, selected):
+    """Phases whose selected dependencies have all completed."""
+    return [sim for sim in pending
+            if all(dep in done for dep in sim[4] if dep in selected)]
+
+
+def run_phases(phases, jobs=1, cache=None):
+    """
+    Executes the phases in dependency order and returns {script: result}.
+
+    With jobs == 1 every phase runs in this process, streaming its output as
+    it goes. Otherwise ready phases are dispatched to a pool of `jobs`
+    workers and each phase's output is printed as one block on completion.
+    A phase that has nothing to overlap with runs in this process, which
+    also keeps non-picklable results (e.g. the OpenMDAO Problem) intact.
+    With a ResultCache, unchanged phases are replayed instead of re-run.
+    """
+    selected = {sim[1] for sim in phases}
+    pending = list(phases)
+    done = set()
+    results = {}
+    running = {}
+
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        while pending or running:
+            ready = ready_phases(pending, done, selected)
+            if not ready and not running:
+                cycle = ", ".join(sim[1] for sim in pending)
+                raise RuntimeError(f"Dependency cycle between phases: {cycle}")
+
+            if pool is None or (len(ready) == 1 and not running):
+                sim = ready[0]
+                title, path, func, _, _ = sim
+                pending.remove(sim)
+                print(f"\n▶ {title}")
+                if cache is None:
+                    results[path] = load_and_run(TWIN_DIR / path, func)
+                else:
+                    results[path] = load_and_run_cached(TWIN_DIR / path, func, cache)
+                done.add(path)
+                continue
+
+            for sim in ready:
+                pending.remove(sim)
+                running[pool.submit(run_phase, sim[1], sim[2], cache)] = sim
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                title, path, _, _, _ = running.pop(future)
+                result, output, elapsed = future.result()
+                print(f"\n▶ {title}  [{elapsed:.1f} s]")
+                print(output, end="")
+                results[path] = result
+                done.add(path)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return {sim[1]: results[sim[1]] for sim in phases}
+
+
 def main():
-    module_filter = "ALL"
-    for i, arg in enumerate(sys.argv):
-        if arg == "--module" and i + 1 < len(sys.argv):
-            module_filter = sys.argv[i + 1].upper()
+    module_filter = cli_option("--module", "ALL").upper()
+    jobs = cli_option("--jobs", 1)
+    use_cache = "--no-cache" not in sys.argv
+    cache_bytes = int(cli_option("--cache-size", DEFAULT_MAX_BYTES / 1024 ** 2) * 1024 ** 2)
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
 
     print("\n" + "█" * 70)
     print("  🏭  SYMBIOTIC FACTORY — DIGITAL TWIN ORCHESTRATOR  🏭")
     print("  In-silico validation of the WEFC Biorefinery")
     print("█" * 70 + "\n")
 
-    results = {}
-    for title, path, func, filters in SIMULATIONS:
+    phases = []
+    for sim in SIMULATIONS:
+        title, path, _, filters, _ = sim
         if module_filter in filters:
-            script = TWIN_DIR / path
-            if script.exists():
-                print(f"\n▶ {title}")
-                results[path] = load_and_run(script, func)
+            if (TWIN_DIR / path).exists():
+                phases.append(sim)
             else:
                 print(f"\n⏭ {title} — script not found, skipping")
 
+    cache = ResultCache(max_bytes=cache_bytes) if use_cache else None
+    start = time.perf_counter()
+    results = run_phases(phases, jobs=jobs, cache=cache)
+    if cache is not None:
+        cache.evict()
+
     print("\n" + "█" * 70)
     print("  ✅  DIGITAL TWIN RUN COMPLETE")
     print(f"  Modules executed: {len(results)}")
+    print(f"  Wall-clock time:  {time.perf_counter() - start:.1f} s ({jobs} job(s))")
     print("█" * 70 + "\n")
     return results
 